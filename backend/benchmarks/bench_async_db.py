@@ -0,0 +1,158 @@
+"""Benchmark - concurrent latency of sync vs async database sessions in async handlers
+
+Before: an ``async def`` handler calls the synchronous ``Session`` (blocks the event loop).
+After: the same handler awaits ``AsyncSession`` (aiosqlite runs the query off the loop).
+
+Every query sleeps inside SQLite for ``--query-ms`` to simulate a slow round-trip,
+while ``/ping`` requests measure how long unrelated requests wait behind it.
+
+Usage:
+    python benchmarks/bench_async_db.py --requests 400 --concurrency 20 --query-ms 50
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import event, func
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.models.client import Client
+
+
+def _sleep_ms(ms: int) -> int:
+    """SQLite function simulating a slow query"""
+    time.sleep(ms / 1000)
+    return ms
+
+
+def _register_sleep(dbapi_connection, connection_record):
+    dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+
+def build_app(database_path: Path, query_ms: int) -> FastAPI:
+    """Build an app exposing the same query through both session types"""
+    engine = create_engine(f"sqlite:///{database_path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}")
+    event.listen(engine, "connect", _register_sleep)
+    event.listen(async_engine.sync_engine, "connect", _register_sleep)
+
+    statement = select(func.sleep_ms(query_ms), func.count(Client.id))
+    app = FastAPI()
+
+    @app.get("/sync/clients")
+    async def sync_clients():
+        with Session(engine) as session:
+            _, total = session.exec(statement).one()
+        return {"total": total}
+
+    @app.get("/async/clients")
+    async def async_clients():
+        async with AsyncSession(async_engine) as session:
+            _, total = (await session.exec(statement)).one()
+        return {"total": total}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+
+def seed(database_path: Path, clients: int):
+    """Create tables and seed clients"""
+    engine = create_engine(f"sqlite:///{database_path}")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        for i in range(clients):
+            session.add(Client(name=f"Client {i}", code=f"client-{i}"))
+        session.commit()
+    engine.dispose()
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def start_server(app: FastAPI) -> tuple[uvicorn.Server, str]:
+    """Run the app on a single uvicorn worker in a background thread"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def run_mode(base_url: str, path: str, requests: int, concurrency: int):
+    """Fire query and ping requests concurrently, return latencies in ms"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = {path: [], "/ping": []}
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def hit(url: str):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(url)
+                response.raise_for_status()
+                latencies[url].append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(hit(path if i % 2 == 0 else "/ping") for i in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    return latencies, elapsed
+
+
+def report(label: str, latencies, elapsed: float):
+    for url, values in latencies.items():
+        print(
+            f"{label:<7} {url:<16} n={len(values):<5} "
+            f"p50={statistics.median(values):8.1f}ms  p99={percentile(values, 99):8.1f}ms"
+        )
+    print(f"{label:<7} throughput: {sum(len(v) for v in latencies.values()) / elapsed:.0f} req/s\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async database sessions")
+    parser.add_argument("--requests", type=int, default=400, help="Total requests per mode")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent requests in flight")
+    parser.add_argument("--query-ms", type=int, default=50, help="Simulated query time")
+    parser.add_argument("--clients", type=int, default=1000, help="Seeded client rows")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_path = Path(temp_dir) / "bench.db"
+        seed(database_path, args.clients)
+        server, base_url = start_server(build_app(database_path, args.query_ms))
+
+        for label, path in (("before", "/sync/clients"), ("after", "/async/clients")):
+            latencies, elapsed = asyncio.run(run_mode(base_url, path, args.requests, args.concurrency))
+            report(label, latencies, elapsed)
+
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Benchmark - fleet workflow generation throughput by number of worker processes
+
+Generates workflows for ``--clients`` synthetic clients into fresh per-client
+trees with 1, 2, 4, ... workers (up to ``--max-workers``, default CPU count)
+and reports the speedup over a single process.
+
+Usage:
+    python benchmarks/bench_fleet_generation.py --clients 1000 --max-workers 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from forgeerp.core.engine.github_generator.fleet import generate_fleet
+
+
+def synthetic_fleet(count: int) -> list:
+    """Fleet inputs without a database (every third client has hetzner)"""
+    return [
+        {
+            "client_id": i,
+            "client_code": f"client-{i:05d}",
+            "client_data": {"client_name": f"client-{i:05d}", "environments": ["dev", "hml", "prod"]},
+            "installed_modules": ["hetzner"] if i % 3 == 0 else [],
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fleet workflow generation")
+    parser.add_argument("--clients", type=int, default=1000, help="Synthetic clients")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1, help="Largest pool size")
+    args = parser.parse_args()
+
+    items = synthetic_fleet(args.clients)
+    counts = [1]
+    while counts[-1] * 2 <= args.max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != args.max_workers:
+        counts.append(args.max_workers)
+
+    baseline = None
+    for workers in counts:
+        with tempfile.TemporaryDirectory() as output_dir:
+            report = generate_fleet(items, output_dir, workers)
+        baseline = baseline or report.elapsed_seconds
+        print(
+            f"workers={workers:<3} clients={report.total:<6} {report.elapsed_seconds:8.2f}s  "
+            f"{report.total / report.elapsed_seconds:8.0f} clients/s  speedup={baseline / report.elapsed_seconds:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
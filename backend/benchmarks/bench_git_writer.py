@@ -0,0 +1,91 @@
+"""Benchmark - publishing generated workflows, per-client git add/commit vs one batched commit
+
+Before: a working tree checkout, then ``git add`` + ``git commit`` per client.
+After: ``GitBatchWriter.commit_trees`` writes every client's files into the
+object store with one ``git fast-import`` (no checkout, no index).
+
+Usage:
+    python benchmarks/bench_git_writer.py --clients 200
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from forgeerp.core.engine.github_generator.archive import render_tree
+from forgeerp.core.engine.github_generator.git_writer import GitBatchWriter
+
+IDENTITY = ["-c", "user.name=Bench", "-c", "user.email=bench@localhost"]
+
+
+def git(*args, cwd=None, input=None):
+    return subprocess.run(["git", *IDENTITY, *args], cwd=cwd, input=input, check=True, capture_output=True)
+
+
+def synthetic_trees(count: int) -> dict:
+    return {
+        f"client-{i:05d}/": render_tree(
+            {"client_name": f"client-{i:05d}", "environments": ["dev", "hml", "prod"]},
+            ["hetzner"] if i % 3 == 0 else []
+        )
+        for i in range(count)
+    }
+
+
+def make_origin(path: Path):
+    git("init", "--quiet", "-b", "main", str(path))
+    (path / "README.md").write_text("# Clients\n")
+    git("add", "README.md", cwd=path)
+    git("commit", "--quiet", "-m", "Initial", cwd=path)
+
+
+def run_before(origin: Path, work: Path, trees: dict) -> float:
+    started = time.perf_counter()
+    git("clone", "--quiet", str(origin), str(work))
+    git("checkout", "--quiet", "-b", "workflows", cwd=work)
+    for prefix, tree in trees.items():
+        for path, content in tree.items():
+            target = work / prefix / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(content)
+        git("add", prefix, cwd=work)
+        git("commit", "--quiet", "-m", f"Regenerate {prefix.rstrip('/')}", cwd=work)
+    return time.perf_counter() - started
+
+
+def run_after(origin: Path, mirror: Path, trees: dict) -> float:
+    started = time.perf_counter()
+    writer = GitBatchWriter(mirror)
+    writer.fetch(str(origin), "main")
+    writer.commit_trees(trees, "workflows", "Regenerate client workflows")
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark publishing generated workflows to git")
+    parser.add_argument("--clients", type=int, default=200, help="Synthetic clients")
+    args = parser.parse_args()
+
+    trees = synthetic_trees(args.clients)
+    files = sum(len(tree) for tree in trees.values())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        origin = Path(tmp) / "origin"
+        make_origin(origin)
+        before = run_before(origin, Path(tmp) / "work", trees)
+        print(f"before  clients={args.clients:<6} files={files:<7} {before * 1000:9.1f}ms  ({args.clients} commits)")
+        after = run_after(origin, Path(tmp) / "mirror.git", trees)
+        print(f"after   clients={args.clients:<6} files={files:<7} {after * 1000:9.1f}ms  (1 commit)")
+
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
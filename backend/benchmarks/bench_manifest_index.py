@@ -0,0 +1,96 @@
+"""Benchmark - addon manifest lookups, walk + yaml.safe_load per call vs the manifest index
+
+Before: ``get_available_modules`` walks the addons directory and stats each
+manifest.yaml on every call, and every manifest lookup re-opens and parses
+the file with the pure-Python SafeLoader.
+After: ``ManifestIndex`` parses each manifest once (libyaml's CSafeLoader when
+available) and answers from memory, revalidating at most every few seconds.
+
+Each round lists the addons and resolves every addon's dependencies, as
+workflow generation and dependency checks do.
+
+Usage:
+    python benchmarks/bench_manifest_index.py --addons 500 --rounds 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+import yaml
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from forgeerp.core.services.manifest_index import ManifestIndex
+
+
+def make_addons(addons_dir: Path, count: int):
+    for i in range(count):
+        path = addons_dir / f"addon_{i:04d}"
+        path.mkdir(parents=True)
+        (path / "manifest.yaml").write_text(yaml.safe_dump({
+            "name": f"Addon {i}",
+            "version": "1.0.0",
+            "category": "addon",
+            "description": "Synthetic addon " * 8,
+            "depends": [f"addon_{j:04d}" for j in range(max(0, i - 3), i)],
+            "ci": {"cache": ["pip", {"name": f"data-{i}", "paths": [f"~/.cache/addon-{i}"]}]},
+        }))
+
+
+def run_before(addons_dir: Path):
+    names = [
+        item.name for item in addons_dir.iterdir()
+        if item.is_dir() and not item.name.startswith("_") and (item / "manifest.yaml").exists()
+    ]
+    for name in names:
+        with open(addons_dir / name / "manifest.yaml") as f:
+            yaml.safe_load(f).get("depends", [])
+
+
+def run_after(index: ManifestIndex):
+    for name in index.names():
+        index.get(name).get("depends", [])
+
+
+def timed(label: str, fn, rounds: int, count: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    print(f"{label:<7} addons={count:<6} best={best * 1000:9.2f}ms  {best / count * 1e6:9.2f}us/lookup")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark addon manifest lookups")
+    parser.add_argument("--addons", type=int, default=500, help="Synthetic addons")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds (best is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        addons_dir = Path(tmp) / "addons"
+        make_addons(addons_dir, args.addons)
+
+        before = timed("before", lambda: run_before(addons_dir), args.rounds, args.addons)
+
+        index = ManifestIndex(addons_dir, check_seconds=3600)
+        started = time.perf_counter()
+        index.refresh()
+        print(f"build   addons={args.addons:<6} {(time.perf_counter() - started) * 1000:9.2f}ms  (c_loader={index.stats()['c_loader']})")
+        started = time.perf_counter()
+        index.refresh()
+        print(f"recheck addons={args.addons:<6} {(time.perf_counter() - started) * 1000:9.2f}ms  (stat only, nothing reparsed)")
+
+        after = timed("after", lambda: run_after(index), args.rounds, args.addons)
+
+    print(f"speedup: {before / after:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
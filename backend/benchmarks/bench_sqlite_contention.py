@@ -0,0 +1,128 @@
+"""Benchmark - SQLite write contention with the default vs tuned connection profile
+
+Writer threads insert and update clients (one commit per operation) while reader
+threads list them, all through the same engine, first with SQLite defaults
+(rollback journal, synchronous=FULL) and then with SQLITE_PRAGMAS (WAL, ...).
+
+Usage:
+    python benchmarks/bench_sqlite_contention.py --writers 4 --readers 8 --seconds 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, func, select
+from forgeerp.core.database.database import create_database_engine, get_pool_stats
+from forgeerp.core.database.models.client import Client
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_profile(database_path: Path, sqlite_pragmas, writers: int, readers: int, seconds: float):
+    """Run writers and readers for `seconds`, return per-operation stats"""
+    engine = create_database_engine(
+        f"sqlite:///{database_path}",
+        sqlite_pragmas=sqlite_pragmas,
+        pool_size=writers + readers,
+        connect_args={"check_same_thread": False, "timeout": 5},
+    )
+    SQLModel.metadata.create_all(engine)
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {"write": [], "read": [], "errors": 0}
+
+    def record(kind: str, started: float):
+        with lock:
+            results[kind].append((time.perf_counter() - started) * 1000)
+
+    def writer(worker: int):
+        i = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with Session(engine) as session:
+                    client = Client(name=f"Client {worker}-{i}", code=f"client-{worker}-{i}")
+                    session.add(client)
+                    session.commit()
+                    client.name = f"Client {worker}-{i} (updated)"
+                    session.add(client)
+                    session.commit()
+                record("write", started)
+            except OperationalError:
+                with lock:
+                    results["errors"] += 1
+            i += 1
+
+    def reader():
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                with Session(engine) as session:
+                    session.exec(select(func.count(Client.id)).where(Client.is_active == True)).one()
+                    session.exec(select(Client).order_by(Client.id.desc()).limit(50)).all()
+                record("read", started)
+            except OperationalError:
+                with lock:
+                    results["errors"] += 1
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    pool_stats = get_pool_stats(engine)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    results["pool"] = pool_stats
+    return results
+
+
+def report(label: str, results, seconds: float):
+    for kind in ("write", "read"):
+        values = results[kind]
+        median = statistics.median(values) if values else 0.0
+        print(
+            f"{label:<8} {kind:<6} ops/s={len(values) / seconds:8.1f}  "
+            f"p50={median:7.1f}ms  p99={percentile(values, 99):7.1f}ms"
+        )
+    print(f"{label:<8} locked errors: {results['errors']}")
+    print(f"{label:<8} pool: {results['pool']['status']}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite write contention")
+    parser.add_argument("--writers", type=int, default=4, help="Writer threads")
+    parser.add_argument("--readers", type=int, default=8, help="Reader threads")
+    parser.add_argument("--seconds", type=float, default=5, help="Duration per profile")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for label, pragmas in (("default", {}), ("tuned", None)):
+            database_path = Path(temp_dir) / f"{label}.db"
+            results = run_profile(database_path, pragmas, args.writers, args.readers, args.seconds)
+            report(label, results, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
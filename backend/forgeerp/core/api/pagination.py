@@ -0,0 +1,162 @@
+"""Pagination - SQL-side counts and keyset cursors for list endpoints"""
+
+import base64
+import binascii
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from fastapi import HTTPException, Query, status
+from sqlalchemy import DateTime, func, literal, text, tuple_
+from sqlalchemy.sql import Select
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+# Above this many planner-estimated rows, Postgres returns the estimate instead of COUNT(*)
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("PAGINATION_COUNT_ESTIMATE_THRESHOLD", "100000"))
+
+# Columns a list can be ordered by (always with "id" as tiebreaker; see models.base.keyset_indexes)
+KEYSET_FIELDS = ("id", "updated_at", "created_at")
+
+MAX_PAGE_SIZE = 1000
+
+
+@dataclass
+class PageParams:
+    """Pagination query parameters"""
+    skip: int = 0
+    limit: int = 100
+    cursor: Optional[str] = None
+    order_by: str = "id"
+
+
+@dataclass
+class Page:
+    """One page of results"""
+    items: List[Any]
+    total: int
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False
+
+
+def get_page_params(
+    skip: int = Query(0, ge=0, description="Offset (ignored when cursor is set)"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    order_by: str = Query("id", description="id, updated_at or created_at; prefix with '-' for descending"),
+) -> PageParams:
+    """FastAPI dependency for pagination query parameters"""
+    if order_by.lstrip("-") not in KEYSET_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"order_by must be one of: {', '.join(KEYSET_FIELDS)}"
+        )
+    return PageParams(skip=skip, limit=limit, cursor=cursor, order_by=order_by)
+
+
+def _keyset(model: type[SQLModel], order_by: str) -> Tuple[list, bool]:
+    """Columns used for ordering and whether the order is descending"""
+    descending = order_by.startswith("-")
+    field = order_by.lstrip("-")
+    columns = [getattr(model, field)]
+    if field != "id":
+        columns.append(model.id)
+    return columns, descending
+
+
+def encode_cursor(order_by: str, values: List[Any]) -> str:
+    """Encode the keyset position after a row as an opaque cursor"""
+    payload = {
+        "o": order_by,
+        "v": [value.isoformat() if isinstance(value, datetime) else value for value in values],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: str, columns: list) -> List[Any]:
+    """Decode a cursor into keyset values for the given columns"""
+    invalid = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["v"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise invalid
+
+    if payload.get("o") != order_by or not isinstance(values, list) or len(values) != len(columns):
+        raise invalid
+
+    decoded = []
+    for column, value in zip(columns, values):
+        try:
+            if isinstance(column.type, DateTime):
+                decoded.append(datetime.fromisoformat(value))
+            else:
+                decoded.append(int(value))
+        except (TypeError, ValueError):
+            raise invalid
+    return decoded
+
+
+async def _planner_estimate(session: AsyncSession, statement: Select) -> int:
+    """Row count estimated by the Postgres planner (no table scan)"""
+    compiled = statement.compile(
+        dialect=session.bind.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    plan = (await session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(session: AsyncSession, statement: Select) -> Tuple[int, bool]:
+    """Count the rows of a statement in SQL, returns (total, is_estimate)"""
+    if session.bind is not None and session.bind.dialect.name == "postgresql":
+        estimate = await _planner_estimate(session, statement)
+        if estimate >= COUNT_ESTIMATE_THRESHOLD:
+            return estimate, True
+
+    count_statement = statement.with_only_columns(
+        func.count(), maintain_column_froms=True
+    ).order_by(None)
+    return await session.scalar(count_statement), False
+
+
+async def paginate(
+    session: AsyncSession,
+    statement: Select,
+    model: type[SQLModel],
+    params: PageParams,
+) -> Page:
+    """Run a list statement with SQL-side COUNT and keyset (or offset) paging"""
+    total, estimated = await count_rows(session, statement)
+
+    columns, descending = _keyset(model, params.order_by)
+    page_statement = statement.order_by(*[c.desc() if descending else c.asc() for c in columns])
+
+    if params.cursor:
+        values = decode_cursor(params.cursor, params.order_by, columns)
+        position = tuple_(*columns)
+        boundary = tuple_(*[literal(value, column.type) for column, value in zip(columns, values)])
+        after = position < boundary if descending else position > boundary
+        page_statement = page_statement.where(after)
+    elif params.skip:
+        page_statement = page_statement.offset(params.skip)
+
+    # Fetch one extra row to know whether another page exists
+    rows = (await session.exec(page_statement.limit(params.limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(params.order_by, [getattr(last, c.key) for c in columns])
+
+    return Page(items=list(rows), total=total, next_cursor=next_cursor, total_estimated=estimated)
@@ -6,6 +6,7 @@ from .modules import router as modules_router
 from .configurations import router as configurations_router
 from .github import router as github_router
 from .environments import router as environments_router
+from .jobs import router as jobs_router
 
 __all__ = [
     "auth_router",
@@ -14,4 +15,5 @@ __all__ = [
     "configurations_router",
     "github_router",
     "environments_router",
+    "jobs_router",
 ]
@@ -1,18 +1,23 @@
 """Authentication routes"""
 
 from datetime import timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlmodel import Session
-from forgeerp.core.database.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.database import get_async_session
 from forgeerp.core.database.models.user import User
 from forgeerp.core.database.schemas.user import Token, LoginRequest, UserResponse
 from forgeerp.core.services.authentication import (
-    authenticate_user,
     create_access_token,
     get_user_by_username,
     decode_access_token,
+    is_user_locked,
+    record_login_attempt,
 )
+from forgeerp.core.services.password_hasher import password_hasher, PasswordHasherBusy
+from forgeerp.core.services.permissions import permission_engine
+from forgeerp.core.services.principal_cache import principal_cache
 import os
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -24,7 +29,7 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
 
 async def get_current_user_dependency(
     token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> User:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
@@ -41,9 +46,13 @@ async def get_current_user_dependency(
     if username is None:
         raise credentials_exception
     
-    user = get_user_by_username(session, username)
+    # Cache hit costs no database query
+    user = principal_cache.get(username)
     if user is None:
-        raise credentials_exception
+        user = await session.run_sync(get_user_by_username, username)
+        if user is None:
+            raise credentials_exception
+        principal_cache.set(username, user)
     
     if not user.is_active:
         raise HTTPException(
@@ -51,16 +60,40 @@ async def get_current_user_dependency(
             detail="User is inactive"
         )
     
+    # Compile the permission matrix through this session so check_permission stays in memory
+    await permission_engine.load_async(session, user)
+    
     return user
 
 
-@router.post("/login", response_model=Token)
-async def login(
-    login_data: LoginRequest,
-    session: Session = Depends(get_session),
-):
-    """Login endpoint"""
-    user = authenticate_user(session, login_data.username, login_data.password)
+async def authenticate_user_async(
+    session: AsyncSession,
+    username: str,
+    password: str,
+) -> Optional[User]:
+    """Authenticate a user with bcrypt running on the hasher pool"""
+    user = await session.run_sync(get_user_by_username, username)
+    
+    # Skip hashing entirely for unknown, inactive or locked accounts
+    if user is None or not user.is_active or is_user_locked(user):
+        return None
+    
+    try:
+        verified = await password_hasher.verify(password, user.password_hash)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many logins in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    
+    await session.run_sync(record_login_attempt, user, verified)
+    return user if verified else None
+
+
+async def _login(session: AsyncSession, username: str, password: str) -> dict:
+    """Authenticate and issue an access token"""
+    user = await authenticate_user_async(session, username, password)
     
     if not user:
         raise HTTPException(
@@ -78,28 +111,22 @@ async def login(
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+@router.post("/login", response_model=Token)
+async def login(
+    login_data: LoginRequest,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Login endpoint"""
+    return await _login(session, login_data.username, login_data.password)
+
+
 @router.post("/login/form", response_model=Token)
 async def login_form(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Login endpoint with OAuth2 form"""
-    user = authenticate_user(session, form_data.username, form_data.password)
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username, "user_id": user.id},
-        expires_delta=access_token_expires,
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await _login(session, form_data.username, form_data.password)
 
 
 @router.get("/me", response_model=UserResponse)
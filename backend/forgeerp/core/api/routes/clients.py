@@ -1,9 +1,10 @@
 """Client routes"""
 
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from forgeerp.core.database.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.database import get_async_session
 from forgeerp.core.database.models.client import Client
 from forgeerp.core.database.models.user import User
 from forgeerp.core.database.schemas.client import (
@@ -13,7 +14,9 @@ from forgeerp.core.database.schemas.client import (
     ClientListResponse,
 )
 from forgeerp.core.api.routes.auth import get_current_user_dependency as get_current_user
+from forgeerp.core.api.pagination import PageParams, get_page_params, paginate
 from forgeerp.core.services.authentication import check_permission
+from forgeerp.core.services.permissions import permission_engine
 from datetime import datetime
 
 router = APIRouter(prefix="/clients", tags=["clients"])
@@ -21,29 +24,34 @@ router = APIRouter(prefix="/clients", tags=["clients"])
 
 @router.get("", response_model=ClientListResponse)
 async def list_clients(
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    permission: Optional[str] = None,
+    page: PageParams = Depends(get_page_params),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
-    """List all clients"""
-    statement = select(Client).where(Client.is_active == True).offset(skip).limit(limit)
-    clients = session.exec(statement).all()
-    
-    count_statement = select(Client).where(Client.is_active == True)
-    total = len(session.exec(count_statement).all())
-    
-    return ClientListResponse(clients=clients, total=total)
+    """List all clients (only those the user holds `permission` on, when given)"""
+    statement = select(Client).where(Client.is_active == True)
+    if permission:
+        # Scope filter in SQL from the request's permission matrix
+        statement = statement.where(permission_engine.scope_clause(current_user, permission, Client.id))
+    result = await paginate(session, statement, Client, page)
+    
+    return ClientListResponse(
+        clients=result.items,
+        total=result.total,
+        total_estimated=result.total_estimated,
+        next_cursor=result.next_cursor
+    )
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
 async def get_client(
     client_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Get a client by ID"""
-    client = session.get(Client, client_id)
+    client = await session.get(Client, client_id)
     
     if not client:
         raise HTTPException(
@@ -57,7 +65,7 @@ async def get_client(
 @router.post("", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
 async def create_client(
     client_data: ClientCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new client"""
@@ -70,7 +78,7 @@ async def create_client(
     
     # Check if code already exists
     statement = select(Client).where(Client.code == client_data.code)
-    existing = session.exec(statement).first()
+    existing = (await session.exec(statement)).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -83,8 +91,8 @@ async def create_client(
     client.updated_by = current_user.id
     
     session.add(client)
-    session.commit()
-    session.refresh(client)
+    await session.commit()
+    await session.refresh(client)
     
     return client
 
@@ -93,7 +101,7 @@ async def create_client(
 async def update_client(
     client_id: int,
     client_data: ClientUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Update a client"""
@@ -104,7 +112,7 @@ async def update_client(
             detail="Not enough permissions"
         )
     
-    client = session.get(Client, client_id)
+    client = await session.get(Client, client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,8 +128,8 @@ async def update_client(
     client.updated_by = current_user.id
     
     session.add(client)
-    session.commit()
-    session.refresh(client)
+    await session.commit()
+    await session.refresh(client)
     
     return client
 
@@ -129,7 +137,7 @@ async def update_client(
 @router.delete("/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_client(
     client_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Delete a client (soft delete)"""
@@ -140,7 +148,7 @@ async def delete_client(
             detail="Not enough permissions"
         )
     
-    client = session.get(Client, client_id)
+    client = await session.get(Client, client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -153,7 +161,7 @@ async def delete_client(
     client.updated_by = current_user.id
     
     session.add(client)
-    session.commit()
+    await session.commit()
     
     return None
 
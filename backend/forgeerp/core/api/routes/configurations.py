@@ -2,11 +2,14 @@
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from forgeerp.core.database.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.database import get_async_session
 from forgeerp.core.database.models.configuration import Configuration
 from forgeerp.core.database.models.user import User
 from forgeerp.core.api.routes.auth import get_current_user_dependency as get_current_user
+from forgeerp.core.api.pagination import PageParams, get_page_params, paginate
+from forgeerp.core.engine.github_generator.concurrency import CONCURRENCY_CONFIG_PREFIX, validate_concurrency_setting
 from forgeerp.core.services.authentication import check_permission
 from datetime import datetime
 from pydantic import BaseModel
@@ -47,19 +50,29 @@ class ConfigurationUpdate(BaseModel):
     is_active: bool | None = None
 
 
+def _validate_value(key: str, value: str):
+    """Reject values the generators cannot use (400)"""
+    if key.startswith(CONCURRENCY_CONFIG_PREFIX):
+        try:
+            validate_concurrency_setting(key[len(CONCURRENCY_CONFIG_PREFIX):], value)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
 class ConfigurationListResponse(BaseModel):
     """Schema for configuration list response"""
     configurations: List[ConfigurationResponse]
     total: int
+    total_estimated: bool = False
+    next_cursor: str | None = None
 
 
 @router.get("", response_model=ConfigurationListResponse)
 async def list_configurations(
     client_id: Optional[int] = None,
     module_id: Optional[int] = None,
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(get_page_params),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """List configurations"""
@@ -70,30 +83,24 @@ async def list_configurations(
     if module_id:
         statement = statement.where(Configuration.module_id == module_id)
     
-    configurations = session.exec(statement.offset(skip).limit(limit)).all()
-    
-    count_statement = select(Configuration).where(Configuration.is_active == True)
-    if client_id:
-        count_statement = count_statement.where(Configuration.client_id == client_id)
-    if module_id:
-        count_statement = count_statement.where(Configuration.module_id == module_id)
-    
-    total = len(session.exec(count_statement).all())
+    result = await paginate(session, statement, Configuration, page)
     
     return ConfigurationListResponse(
-        configurations=[ConfigurationResponse.model_validate(c) for c in configurations],
-        total=total
+        configurations=[ConfigurationResponse.model_validate(c) for c in result.items],
+        total=result.total,
+        total_estimated=result.total_estimated,
+        next_cursor=result.next_cursor
     )
 
 
 @router.get("/{config_id}", response_model=ConfigurationResponse)
 async def get_configuration(
     config_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Get a configuration by ID"""
-    config = session.get(Configuration, config_id)
+    config = await session.get(Configuration, config_id)
     
     if not config:
         raise HTTPException(
@@ -107,7 +114,7 @@ async def get_configuration(
 @router.post("", response_model=ConfigurationResponse, status_code=status.HTTP_201_CREATED)
 async def create_configuration(
     config_data: ConfigurationCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new configuration"""
@@ -118,11 +125,13 @@ async def create_configuration(
             detail="Not enough permissions"
         )
     
+    _validate_value(config_data.key, config_data.value)
+    
     # Create configuration
     config = Configuration(**config_data.model_dump())
     session.add(config)
-    session.commit()
-    session.refresh(config)
+    await session.commit()
+    await session.refresh(config)
     
     return ConfigurationResponse.model_validate(config)
 
@@ -131,7 +140,7 @@ async def create_configuration(
 async def update_configuration(
     config_id: int,
     config_data: ConfigurationUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Update a configuration"""
@@ -142,7 +151,7 @@ async def update_configuration(
             detail="Not enough permissions"
         )
     
-    config = session.get(Configuration, config_id)
+    config = await session.get(Configuration, config_id)
     if not config:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -151,13 +160,15 @@ async def update_configuration(
     
     # Update fields
     update_data = config_data.model_dump(exclude_unset=True)
+    if update_data.get("value") is not None:
+        _validate_value(config.key, update_data["value"])
     for field, value in update_data.items():
         setattr(config, field, value)
     
     config.updated_at = datetime.utcnow()
     session.add(config)
-    session.commit()
-    session.refresh(config)
+    await session.commit()
+    await session.refresh(config)
     
     return ConfigurationResponse.model_validate(config)
 
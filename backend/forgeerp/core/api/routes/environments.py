@@ -2,11 +2,13 @@
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from forgeerp.core.database.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.database import get_async_session
 from forgeerp.core.database.models.client import Client, Environment
 from forgeerp.core.database.models.user import User
 from forgeerp.core.api.routes.auth import get_current_user_dependency as get_current_user
+from forgeerp.core.api.pagination import PageParams, get_page_params, paginate
 from forgeerp.core.services.authentication import check_permission
 from pydantic import BaseModel
 from datetime import datetime
@@ -48,14 +50,15 @@ class EnvironmentListResponse(BaseModel):
     """Schema for environment list response"""
     environments: List[EnvironmentResponse]
     total: int
+    total_estimated: bool = False
+    next_cursor: str | None = None
 
 
 @router.get("", response_model=EnvironmentListResponse)
 async def list_environments(
     client_id: int | None = None,
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(get_page_params),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """List environments"""
@@ -64,28 +67,24 @@ async def list_environments(
     if client_id:
         statement = statement.where(Environment.client_id == client_id)
     
-    environments = session.exec(statement.offset(skip).limit(limit)).all()
-    
-    count_statement = select(Environment).where(Environment.is_active == True)
-    if client_id:
-        count_statement = count_statement.where(Environment.client_id == client_id)
-    
-    total = len(session.exec(count_statement).all())
+    result = await paginate(session, statement, Environment, page)
     
     return EnvironmentListResponse(
-        environments=[EnvironmentResponse.model_validate(e) for e in environments],
-        total=total
+        environments=[EnvironmentResponse.model_validate(e) for e in result.items],
+        total=result.total,
+        total_estimated=result.total_estimated,
+        next_cursor=result.next_cursor
     )
 
 
 @router.get("/{env_id}", response_model=EnvironmentResponse)
 async def get_environment(
     env_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Get an environment by ID"""
-    env = session.get(Environment, env_id)
+    env = await session.get(Environment, env_id)
     
     if not env:
         raise HTTPException(
@@ -99,7 +98,7 @@ async def get_environment(
 @router.post("", response_model=EnvironmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_environment(
     env_data: EnvironmentCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new environment"""
@@ -111,7 +110,7 @@ async def create_environment(
         )
     
     # Verify client exists
-    client = session.get(Client, env_data.client_id)
+    client = await session.get(Client, env_data.client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,7 +119,7 @@ async def create_environment(
     
     # Check if namespace already exists
     statement = select(Environment).where(Environment.namespace == env_data.namespace)
-    existing = session.exec(statement).first()
+    existing = (await session.exec(statement)).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -130,8 +129,8 @@ async def create_environment(
     # Create environment
     env = Environment(**env_data.model_dump())
     session.add(env)
-    session.commit()
-    session.refresh(env)
+    await session.commit()
+    await session.refresh(env)
     
     return EnvironmentResponse.model_validate(env)
 
@@ -140,11 +139,11 @@ async def create_environment(
 async def update_environment(
     env_id: int,
     env_data: EnvironmentUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Update an environment"""
-    env = session.get(Environment, env_id)
+    env = await session.get(Environment, env_id)
     
     if not env:
         raise HTTPException(
@@ -166,8 +165,8 @@ async def update_environment(
     
     env.updated_at = datetime.utcnow()
     session.add(env)
-    session.commit()
-    session.refresh(env)
+    await session.commit()
+    await session.refresh(env)
     
     return EnvironmentResponse.model_validate(env)
 
@@ -175,11 +174,11 @@ async def update_environment(
 @router.delete("/{env_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_environment(
     env_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Delete an environment (soft delete)"""
-    env = session.get(Environment, env_id)
+    env = await session.get(Environment, env_id)
     
     if not env:
         raise HTTPException(
@@ -198,7 +197,7 @@ async def delete_environment(
     env.is_active = False
     env.updated_at = datetime.utcnow()
     session.add(env)
-    session.commit()
+    await session.commit()
     
     return None
 
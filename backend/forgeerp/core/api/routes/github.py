@@ -1,22 +1,62 @@
 """GitHub routes - PRs and workflow generation"""
 
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from forgeerp.core.database.database import get_session
+from typing import List, Optional
+from datetime import datetime, timedelta
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from github import GithubException
+from requests import RequestException
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.database import get_async_session
 from forgeerp.core.database.models.user import User
 from forgeerp.core.database.models.client import Client
 from forgeerp.core.database.models.module import Module, ClientModule
-from forgeerp.core.database.models.permission import PullRequest
+from forgeerp.core.database.models.permission import PullRequest, PullRequestApproval
 from forgeerp.core.api.routes.auth import get_current_user_dependency as get_current_user
+from forgeerp.core.api.pagination import PageParams, get_page_params, paginate
+from forgeerp.core.engine.github_generator.archive import (
+    ARCHIVE_MEDIA_TYPES,
+    MAX_ARCHIVE_BYTES,
+    STREAMERS,
+    ArchiveError,
+    diff_trees,
+    read_archive,
+    render_tree,
+)
+from forgeerp.core.engine.github_generator.concurrency import load_concurrency_settings
+from forgeerp.core.engine.github_generator.fleet import FLEET_OUTPUT_DIR
+from forgeerp.core.engine.github_generator.git_writer import GITHUB_GIT_URL, WORKFLOWS_GIT_LAYOUT, check_branch_name
 from forgeerp.core.services.authentication import check_permission
+from forgeerp.core.services.github_client import GitHubRateLimited, is_github_configured, require_github_service
+from forgeerp.core.services.github_permissions import PERMISSION_EVENTS, apply_permission_event
 from forgeerp.core.services.github_service import GitHubService
-from forgeerp.core.engine.github_generator.workflows import GitHubWorkflowGenerator
-from pydantic import BaseModel
+from forgeerp.core.services.github_webhooks import (
+    SUPPORTED_EVENTS,
+    get_webhook_secret,
+    is_tracked_repository,
+    record_delivery,
+    verify_signature,
+)
+from forgeerp.core.services.job_queue import job_queue
+from forgeerp.core.services import github_jobs  # noqa: F401 - registers the job handlers
+from pydantic import BaseModel, field_validator
+import json
+import math
 import os
+from pathlib import Path
 
 router = APIRouter(prefix="/github", tags=["github"])
 
+# Stored PR status younger than this is served without refreshing from GitHub
+PR_STATUS_MAX_AGE_SECONDS = int(os.getenv("PR_STATUS_MAX_AGE_SECONDS", "60"))
+
+# Opt-in: collaborator level (e.g. "write") a user needs on the repository for endpoints
+# that write to GitHub, on top of the app's own permissions. Only enable it where every
+# ForgeERP username is the user's GitHub login; superusers are exempt ("" = off)
+GITHUB_WRITE_PERMISSION = os.getenv("GITHUB_WRITE_PERMISSION", "")
+
 
 class GenerateWorkflowsRequest(BaseModel):
     """Schema for generating workflows"""
@@ -24,6 +64,28 @@ class GenerateWorkflowsRequest(BaseModel):
     repo_dir: Optional[str] = None
 
 
+class GenerateFleetRequest(BaseModel):
+    """Schema for generating workflows for many clients"""
+    client_codes: Optional[List[str]] = None  # None = every active client
+    module: Optional[str] = None  # Only clients with this module installed
+    include_inactive: bool = False
+    output_dir: Optional[str] = None  # Subdirectory of FLEET_OUTPUT_DIR
+    workers: Optional[int] = None
+
+
+class PublishWorkflowsRequest(BaseModel):
+    """Schema for committing generated workflows and opening one PR"""
+    client_codes: Optional[List[str]] = None  # None = every active client
+    module: Optional[str] = None  # Only clients with this module installed
+    include_inactive: bool = False
+    head: str = "forgeerp/workflows"
+    base: str = "main"
+    title: str = "Regenerate client workflows"
+    body: str = "Workflows regenerated by ForgeERP."
+    
+    _branches = field_validator("head", "base")(check_branch_name)
+
+
 class CreatePRRequest(BaseModel):
     """Schema for creating a PR"""
     title: str
@@ -33,69 +95,242 @@ class CreatePRRequest(BaseModel):
     change_type: str
     change_target: Optional[str] = None
     change_data: Optional[dict] = None
+    
+    _branches = field_validator("head", "base")(check_branch_name)
 
 
-@router.post("/workflows/generate")
-async def generate_workflows(
-    request: GenerateWorkflowsRequest,
-    session: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user),
-):
-    """Generate GitHub Actions workflows for a client"""
+async def _require_repository_access(github_service: GitHubService, current_user: User, owner: str, repo: str):
+    """403 unless the user can write to the repository on GitHub (cached collaborator check)"""
+    if not GITHUB_WRITE_PERMISSION or current_user.is_superuser:
+        return
+    try:
+        allowed = await run_in_threadpool(
+            github_service.check_user_permission, owner, repo, current_user.username, GITHUB_WRITE_PERMISSION
+        )
+    except GitHubRateLimited as exc:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="GitHub rate limit reached, try again later",
+            headers={"Retry-After": str(max(1, math.ceil(exc.delay_seconds)))},
+        )
+    except (GithubException, RequestException) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Could not check GitHub permissions: {exc}"
+        )
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"GitHub user {current_user.username} needs {GITHUB_WRITE_PERMISSION} access to {owner}/{repo}"
+        )
+
+
+async def _workflow_inputs(session: AsyncSession, client_id: int, current_user: User):
+    """Client, generator client data and installed modules, after the permission check"""
     # Check permission
-    if not check_permission(current_user, "workflow_generate", client_id=request.client_id):
+    if not check_permission(current_user, "workflow_generate", client_id=client_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
     
     # Get client
-    client = session.get(Client, request.client_id)
+    client = await session.get(Client, client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Client not found"
         )
     
-    # Get installed modules for client
-    statement = select(ClientModule).where(ClientModule.client_id == request.client_id)
-    client_modules = session.exec(statement).all()
-    
-    installed_modules = []
-    for cm in client_modules:
-        module = session.get(Module, cm.module_id)
-        if module:
-            installed_modules.append(module.name)
-    
-    # Generate workflows
-    repo_dir = request.repo_dir or os.getenv("GITHUB_REPO_DIR", "/tmp/test-repo")
-    generator = GitHubWorkflowGenerator(repo_dir)
-    
+    # Get installed modules for client (single JOIN)
+    statement = (
+        select(Module.name)
+        .join(Module.client_modules)
+        .where(
+            ClientModule.client_id == client_id,
+            ClientModule.is_active == True
+        )
+    )
+    installed_modules = list((await session.exec(statement)).all())
     client_data = {
         "client_name": client.code,
         "environments": ["dev", "hml", "prod"]
     }
+    return client, client_data, installed_modules
+
+
+async def _with_settings(session: AsyncSession, client_id: int, client_data: dict) -> dict:
+    """Client data with the client's workflow settings (Configuration) for in-request rendering"""
+    concurrency = await session.run_sync(load_concurrency_settings, [client_id])
+    return {**client_data, "concurrency": concurrency[client_id]}
+
+
+@router.post("/workflows/generate", status_code=status.HTTP_202_ACCEPTED)
+async def generate_workflows(
+    request: GenerateWorkflowsRequest,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Generate GitHub Actions workflows for a client"""
+    client, client_data, installed_modules = await _workflow_inputs(session, request.client_id, current_user)
     
-    generator.generate_workflows_for_client(client_data, installed_modules)
+    # Write the files in the background
+    repo_dir = request.repo_dir or os.getenv("GITHUB_REPO_DIR", "/tmp/test-repo")
+    payload = {
+        "client_id": request.client_id,
+        "repo_dir": repo_dir,
+        "client_data": client_data,
+        "installed_modules": installed_modules,
+    }
+    job = await session.run_sync(job_queue.enqueue, "workflows.generate", payload, current_user.id)
     
     return {
-        "message": "Workflows generated successfully",
+        "message": "Workflow generation queued",
+        "job_id": job.id,
+        "status_url": f"/api/v1/jobs/{job.id}",
         "client_id": request.client_id,
         "installed_modules": installed_modules,
-        "workflows": [
-            "setup-client.yml",
-            "deploy-client.yml",
-            "diagnose-services.yml",
-            "fix-common-issues.yml"
-        ]
     }
 
 
-@router.post("/prs/create")
+@router.get("/workflows/{client_id}/archive")
+async def download_workflows(
+    client_id: int,
+    format: str = Query("zip", pattern="^(zip|tar\\.gz)$"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Render a client's workflow tree in memory and stream it as zip or tar.gz"""
+    client, client_data, installed_modules = await _workflow_inputs(session, client_id, current_user)
+    tree = render_tree(await _with_settings(session, client_id, client_data), installed_modules)
+    
+    return StreamingResponse(
+        STREAMERS[format](tree),
+        media_type=ARCHIVE_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{client.code}-workflows.{format}"'}
+    )
+
+
+@router.post("/workflows/{client_id}/diff", response_class=PlainTextResponse)
+async def diff_workflows(
+    client_id: int,
+    existing: Optional[UploadFile] = File(None),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Unified diff from an uploaded tree (zip or tar.gz) to the freshly rendered workflows"""
+    _, client_data, installed_modules = await _workflow_inputs(session, client_id, current_user)
+    
+    existing_files = {}
+    if existing is not None:
+        try:
+            existing_files = read_archive(await existing.read(MAX_ARCHIVE_BYTES + 1))
+        except ArchiveError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    
+    client_data = await _with_settings(session, client_id, client_data)
+    diff = diff_trees(existing_files, render_tree(client_data, installed_modules))
+    return PlainTextResponse(diff, media_type="text/x-diff")
+
+
+@router.post("/workflows/generate-fleet", status_code=status.HTTP_202_ACCEPTED)
+async def generate_fleet_workflows(
+    request: GenerateFleetRequest,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Generate workflows for all active clients (or a filter) in parallel"""
+    # Fleet-wide: requires the permission without a client scope
+    if not check_permission(current_user, "workflow_generate"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    # The server decides where to write: only paths inside FLEET_OUTPUT_DIR
+    base_dir = Path(FLEET_OUTPUT_DIR).resolve()
+    output_dir = (base_dir / (request.output_dir or "")).resolve()
+    if output_dir != base_dir and base_dir not in output_dir.parents:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="output_dir must be inside the fleet output directory"
+        )
+    
+    payload = {
+        **request.model_dump(),
+        "output_dir": str(output_dir),
+    }
+    job = await session.run_sync(
+        job_queue.enqueue,
+        "workflows.generate_fleet",
+        payload,
+        current_user.id,
+        max_attempts=1,
+    )
+    
+    return {
+        "message": "Fleet workflow generation queued",
+        "job_id": job.id,
+        "status_url": f"/api/v1/jobs/{job.id}",
+    }
+
+
+@router.post("/workflows/publish", status_code=status.HTTP_202_ACCEPTED)
+async def publish_workflows(
+    request: PublishWorkflowsRequest,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+    github_service: GitHubService = Depends(require_github_service),
+):
+    """Commit regenerated workflows for many clients in one commit and open a PR"""
+    # Fleet-wide generation plus a PR
+    if not (check_permission(current_user, "workflow_generate") and check_permission(current_user, "pr_create")):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    # Without a per-client directory every client would write the same repository root
+    if "{client_code}" not in WORKFLOWS_GIT_LAYOUT and len(set(request.client_codes or [])) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The repository layout holds one client: pass exactly one client code"
+        )
+    
+    owner = os.getenv("GITHUB_OWNER", "forgeerp")
+    repo = os.getenv("GITHUB_REPO", "forgeerp")
+    await _require_repository_access(github_service, current_user, owner, repo)
+    payload = {
+        "owner": owner,
+        "repo": repo,
+        "remote_url": GITHUB_GIT_URL.format(owner=owner, repo=repo),
+        "layout": WORKFLOWS_GIT_LAYOUT,
+        **request.model_dump(),
+    }
+    job = await session.run_sync(
+        job_queue.enqueue,
+        "workflows.publish",
+        payload,
+        current_user.id,
+        dedupe_key=f"workflows.publish:{owner}/{repo}:{request.head}",
+    )
+    
+    return {
+        "message": "Workflow publication queued",
+        "job_id": job.id,
+        "status_url": f"/api/v1/jobs/{job.id}",
+    }
+
+
+@router.post("/prs/create", status_code=status.HTTP_202_ACCEPTED)
 async def create_pull_request(
     request: CreatePRRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
+    github_service: GitHubService = Depends(require_github_service),
 ):
     """Create a pull request for a grave change"""
     # Check permission
@@ -105,62 +340,64 @@ async def create_pull_request(
             detail="Not enough permissions"
         )
     
-    # Get GitHub service
-    github_service = GitHubService()
-    
     owner = os.getenv("GITHUB_OWNER", "forgeerp")
     repo = os.getenv("GITHUB_REPO", "forgeerp")
+    await _require_repository_access(github_service, current_user, owner, repo)
+    payload = {"owner": owner, "repo": repo, **request.model_dump()}
+    job = await session.run_sync(job_queue.enqueue, "prs.create", payload, current_user.id)
     
-    try:
-        # Create PR
-        pr = github_service.create_pull_request(
-            owner=owner,
-            repo=repo,
-            title=request.title,
-            body=request.body,
-            head=request.head,
-            base=request.base
-        )
-        
-        # Save PR to database
-        pr_model = PullRequest(
-            github_pr_number=pr.number,
-            github_pr_url=pr.html_url,
-            title=request.title,
-            description=request.body,
-            status="open",
-            change_type=request.change_type,
-            change_target=request.change_target,
-            change_data=str(request.change_data) if request.change_data else None
-        )
-        
-        session.add(pr_model)
-        session.commit()
-        session.refresh(pr_model)
-        
-        return {
-            "message": "Pull request created successfully",
-            "pr_number": pr.number,
-            "pr_url": pr.html_url,
-            "id": pr_model.id
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to create pull request: {str(e)}"
+    return {
+        "message": "Pull request creation queued",
+        "job_id": job.id,
+        "status_url": f"/api/v1/jobs/{job.id}",
+    }
+
+
+@router.post("/prs/sync", status_code=status.HTTP_202_ACCEPTED)
+async def sync_pull_requests(
+    full: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+    github_service: GitHubService = Depends(require_github_service),
+):
+    """Queue a bulk reconciliation of pull requests changed since the last sync"""
+    # Check permission
+    if not check_permission(current_user, "pr_create"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
         )
+    
+    owner = os.getenv("GITHUB_OWNER", "forgeerp")
+    repo = os.getenv("GITHUB_REPO", "forgeerp")
+    await _require_repository_access(github_service, current_user, owner, repo)
+    job = await session.run_sync(
+        job_queue.enqueue,
+        "prs.sync_all",
+        {"owner": owner, "repo": repo, "full": full},
+        current_user.id,
+        dedupe_key=f"prs.sync_all:{owner}/{repo}",
+    )
+    
+    return {
+        "message": "Pull request sync queued",
+        "job_id": job.id,
+        "status_url": f"/api/v1/jobs/{job.id}",
+    }
 
 
 @router.get("/prs/{pr_number}/status")
 async def get_pr_status(
     pr_number: int,
-    session: Session = Depends(get_session),
+    response: Response,
+    refresh: bool = False,
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
-    """Get pull request status and approvals"""
+    """Get pull request status and approvals (from the database, refreshed in the background)"""
     # Get PR from database
     statement = select(PullRequest).where(PullRequest.github_pr_number == pr_number)
-    pr_model = session.exec(statement).first()
+    pr_model = (await session.exec(statement)).first()
     
     if not pr_model:
         raise HTTPException(
@@ -168,45 +405,59 @@ async def get_pr_status(
             detail="Pull request not found"
         )
     
-    # Sync with GitHub
-    github_service = GitHubService()
-    owner = os.getenv("GITHUB_OWNER", "forgeerp")
-    repo = os.getenv("GITHUB_REPO", "forgeerp")
+    statement = (
+        select(PullRequestApproval)
+        .where(PullRequestApproval.pull_request_id == pr_model.id)
+        .order_by(PullRequestApproval.submitted_at, PullRequestApproval.id)
+    )
+    approvals = (await session.exec(statement)).all()
     
-    try:
-        # Sync PR from GitHub
-        pr_model = github_service.sync_pull_request_to_database(
-            session,
-            owner,
-            repo,
-            pr_number
-        )
-        
-        # Get reviews
-        reviews = github_service.get_pull_request_reviews(owner, repo, pr_number)
-        
-        return {
-            "pr_number": pr_model.github_pr_number,
-            "status": pr_model.status,
-            "is_approved": pr_model.is_approved,
-            "is_merged": pr_model.is_merged,
-            "reviews": reviews,
-            "change_type": pr_model.change_type,
-            "change_target": pr_model.change_target
-        }
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get PR status: {str(e)}"
+    result = {
+        "pr_number": pr_model.github_pr_number,
+        "status": pr_model.status,
+        "is_approved": pr_model.is_approved,
+        "is_merged": pr_model.is_merged,
+        "reviews": [
+            {
+                "id": approval.github_review_id,
+                "user": approval.reviewer_login,
+                "state": approval.state,
+                "body": approval.comment,
+                "submitted_at": approval.submitted_at.isoformat() if approval.submitted_at else None
+            }
+            for approval in approvals
+        ],
+        "change_type": pr_model.change_type,
+        "change_target": pr_model.change_target,
+        "synced_at": pr_model.synced_at,
+    }
+    
+    # With webhooks the stored state is kept current; otherwise refresh it when stale
+    stale_before = datetime.utcnow() - timedelta(seconds=PR_STATUS_MAX_AGE_SECONDS)
+    stale = pr_model.synced_at is None or pr_model.synced_at < stale_before
+    if is_github_configured() and (refresh or (stale and get_webhook_secret() is None)):
+        owner = os.getenv("GITHUB_OWNER", "forgeerp")
+        repo = os.getenv("GITHUB_REPO", "forgeerp")
+        payload = {"owner": owner, "repo": repo, "pr_number": pr_number}
+        job = await session.run_sync(
+            job_queue.enqueue,
+            "prs.sync",
+            payload,
+            current_user.id,
+            dedupe_key=f"prs.sync:{owner}/{repo}#{pr_number}",
         )
+        response.status_code = status.HTTP_202_ACCEPTED
+        result["job_id"] = job.id
+        result["status_url"] = f"/api/v1/jobs/{job.id}"
+    
+    return result
 
 
 @router.get("/prs")
 async def list_pull_requests(
     status: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(get_page_params),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """List pull requests"""
@@ -215,7 +466,7 @@ async def list_pull_requests(
     if status:
         statement = statement.where(PullRequest.status == status)
     
-    prs = session.exec(statement.offset(skip).limit(limit)).all()
+    result = await paginate(session, statement, PullRequest, page)
     
     return {
         "prs": [
@@ -229,8 +480,74 @@ async def list_pull_requests(
                 "is_merged": pr.is_merged,
                 "change_type": pr.change_type
             }
-            for pr in prs
+            for pr in result.items
         ],
-        "total": len(prs)
+        "total": result.total,
+        "total_estimated": result.total_estimated,
+        "next_cursor": result.next_cursor
     }
 
+
+@router.post("/webhooks", status_code=status.HTTP_202_ACCEPTED)
+async def receive_webhook(
+    request: Request,
+    response: Response,
+    x_github_event: Optional[str] = Header(None),
+    x_github_delivery: Optional[str] = Header(None),
+    x_hub_signature_256: Optional[str] = Header(None),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """Receive GitHub webhook deliveries (pull_request, pull_request_review, member, team)"""
+    secret = get_webhook_secret()
+    if not secret:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="GitHub webhooks are not configured"
+        )
+    
+    body = await request.body()
+    if not verify_signature(secret, body, x_hub_signature_256):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid signature"
+        )
+    
+    if x_github_event == "ping":
+        response.status_code = status.HTTP_200_OK
+        return {"message": "pong"}
+    
+    if x_github_event not in SUPPORTED_EVENTS + PERMISSION_EVENTS:
+        response.status_code = status.HTTP_200_OK
+        return {"message": "Event ignored", "event": x_github_event}
+    
+    if not x_github_delivery:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Missing X-GitHub-Delivery header"
+        )
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid JSON payload"
+        )
+    
+    # Collaborator changes only invalidate cached permission checks
+    if x_github_event in PERMISSION_EVENTS:
+        response.status_code = status.HTTP_200_OK
+        invalidated = apply_permission_event(x_github_event, payload)
+        return {"message": "Permissions invalidated", "event": x_github_event, "invalidated": invalidated}
+    
+    if not is_tracked_repository(payload):
+        response.status_code = status.HTTP_200_OK
+        return {"message": "Repository ignored", "event": x_github_event}
+    
+    # Store and queue; applying the event happens in the job runner
+    delivery = await session.run_sync(record_delivery, x_github_delivery, x_github_event, payload)
+    if delivery is None:
+        response.status_code = status.HTTP_200_OK
+        return {"message": "Duplicate delivery", "delivery_id": x_github_delivery, "duplicate": True}
+    
+    return {"message": "Delivery queued", "delivery_id": delivery.delivery_id, "duplicate": False}
@@ -0,0 +1,83 @@
+"""Job routes - status of background jobs"""
+
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.database import get_async_session
+from forgeerp.core.database.models.job import Job
+from forgeerp.core.database.models.user import User
+from forgeerp.core.api.routes.auth import get_current_user_dependency as get_current_user
+from forgeerp.core.api.pagination import PageParams, get_page_params, paginate
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_to_dict(job: Job) -> dict:
+    """Serialize a job for API responses"""
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "progress": json.loads(job.progress) if job.progress else None,
+        "created_by": job.created_by,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "status_url": f"/api/v1/jobs/{job.id}",
+    }
+
+
+def _can_view_all(user: User) -> bool:
+    return user.is_superuser or user.role == "admin"
+
+
+@router.get("")
+async def list_jobs(
+    status: Optional[str] = None,
+    job_type: Optional[str] = None,
+    page: PageParams = Depends(get_page_params),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """List background jobs (own jobs unless admin)"""
+    statement = select(Job)
+
+    if not _can_view_all(current_user):
+        statement = statement.where(Job.created_by == current_user.id)
+    if status:
+        statement = statement.where(Job.status == status)
+    if job_type:
+        statement = statement.where(Job.job_type == job_type)
+
+    result = await paginate(session, statement, Job, page)
+
+    return {
+        "jobs": [job_to_dict(job) for job in result.items],
+        "total": result.total,
+        "total_estimated": result.total_estimated,
+        "next_cursor": result.next_cursor
+    }
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: int,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Get a background job by ID"""
+    job = await session.get(Job, job_id)
+
+    if not job or (not _can_view_all(current_user) and job.created_by != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+
+    return job_to_dict(job)
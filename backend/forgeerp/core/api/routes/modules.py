@@ -2,13 +2,18 @@
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from forgeerp.core.database.database import get_session
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.database import get_async_session
 from forgeerp.core.database.models.module import Module, ClientModule
 from forgeerp.core.database.models.user import User
 from forgeerp.core.database.models.client import Client
 from forgeerp.core.api.routes.auth import get_current_user_dependency as get_current_user
+from forgeerp.core.api.pagination import PageParams, get_page_params, paginate
 from forgeerp.core.services.authentication import check_permission
+from forgeerp.core.services.module_dependencies import clients_depending_on, missing_dependencies
+from forgeerp.core.services.module_graph import DependencyError, UnknownModuleError
+from forgeerp.core.services.module_loader import module_loader
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -42,6 +47,14 @@ class ModuleListResponse(BaseModel):
     """Schema for module list response"""
     modules: List[ModuleResponse]
     total: int
+    total_estimated: bool = False
+    next_cursor: str | None = None
+
+
+class InstallPlanRequest(BaseModel):
+    """Schema for resolving (and optionally applying) an install plan"""
+    modules: List[str]
+    apply: bool = False
 
 
 class ClientModuleCreate(BaseModel):
@@ -51,14 +64,40 @@ class ClientModuleCreate(BaseModel):
     config: str | None = None
 
 
+@router.get("/missing-dependencies")
+async def list_missing_dependencies(
+    client_id: int | None = None,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Active installs (fleet-wide, or of one client) whose dependencies are not installed"""
+    installs = await session.run_sync(missing_dependencies, client_id)
+    return {"installs": installs, "total": len(installs)}
+
+
+@router.post("/dependencies/sync")
+async def sync_module_dependency_edges(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Rebuild the stored dependency edges of every module from the addon manifests"""
+    if not check_permission(current_user, "module_create"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return await session.run_sync(module_loader.sync_dependencies)
+
+
 @router.get("/{module_id}", response_model=ModuleResponse)
 async def get_module(
     module_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Get a module by ID"""
-    module = session.get(Module, module_id)
+    module = await session.get(Module, module_id)
     
     if not module:
         raise HTTPException(
@@ -72,7 +111,7 @@ async def get_module(
 @router.post("", response_model=ModuleResponse, status_code=status.HTTP_201_CREATED)
 async def create_module(
     module_data: ModuleCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Create a new module"""
@@ -85,7 +124,7 @@ async def create_module(
     
     # Check if module already exists
     statement = select(Module).where(Module.name == module_data.name)
-    existing = session.exec(statement).first()
+    existing = (await session.exec(statement)).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -95,8 +134,8 @@ async def create_module(
     # Create module
     module = Module(**module_data.model_dump())
     session.add(module)
-    session.commit()
-    session.refresh(module)
+    await session.commit()
+    await session.refresh(module)
     
     return ModuleResponse.model_validate(module)
 
@@ -104,42 +143,49 @@ async def create_module(
 @router.get("/clients/{client_id}", response_model=ModuleListResponse)
 async def list_client_modules(
     client_id: int,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(get_page_params),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """List modules installed for a client"""
     # Verify client exists
-    client = session.get(Client, client_id)
+    client = await session.get(Client, client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Client not found"
         )
     
-    # Get installed modules for client
-    statement = select(ClientModule).where(
-        ClientModule.client_id == client_id,
-        ClientModule.is_active == True
+    # Get installed modules for client (single JOIN)
+    statement = (
+        select(Module)
+        .join(Module.client_modules)
+        .where(
+            ClientModule.client_id == client_id,
+            ClientModule.is_active == True
+        )
     )
-    client_modules = session.exec(statement).all()
+    result = await paginate(session, statement, Module, page)
     
-    # Get module details
     modules = []
-    for cm in client_modules:
-        module = session.get(Module, cm.module_id)
-        if module:
-            module_response = ModuleResponse.model_validate(module)
-            module_response.is_installed = True
-            modules.append(module_response)
+    for module in result.items:
+        module_response = ModuleResponse.model_validate(module)
+        module_response.is_installed = True
+        modules.append(module_response)
     
-    return ModuleListResponse(modules=modules, total=len(modules))
+    return ModuleListResponse(
+        modules=modules,
+        total=result.total,
+        total_estimated=result.total_estimated,
+        next_cursor=result.next_cursor
+    )
 
 
 @router.post("/clients/{client_id}/install", status_code=status.HTTP_201_CREATED)
 async def install_module_for_client(
     client_id: int,
     module_data: ClientModuleCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Install a module for a client"""
@@ -151,7 +197,7 @@ async def install_module_for_client(
         )
     
     # Verify client exists
-    client = session.get(Client, client_id)
+    client = await session.get(Client, client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -159,7 +205,7 @@ async def install_module_for_client(
         )
     
     # Verify module exists
-    module = session.get(Module, module_data.module_id)
+    module = await session.get(Module, module_data.module_id)
     if not module:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -171,7 +217,7 @@ async def install_module_for_client(
         ClientModule.client_id == client_id,
         ClientModule.module_id == module_data.module_id
     )
-    existing = session.exec(statement).first()
+    existing = (await session.exec(statement)).first()
     if existing:
         if existing.is_active:
             raise HTTPException(
@@ -183,8 +229,8 @@ async def install_module_for_client(
             existing.is_active = True
             existing.config = module_data.config
             session.add(existing)
-            session.commit()
-            session.refresh(existing)
+            await session.commit()
+            await session.refresh(existing)
             return {"message": "Module reactivated successfully", "id": existing.id}
     
     # Install module
@@ -194,8 +240,8 @@ async def install_module_for_client(
         config=module_data.config
     )
     session.add(client_module)
-    session.commit()
-    session.refresh(client_module)
+    await session.commit()
+    await session.refresh(client_module)
     
     return {"message": "Module installed successfully", "id": client_module.id}
 
@@ -204,7 +250,7 @@ async def install_module_for_client(
 async def uninstall_module_from_client(
     client_id: int,
     module_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """Uninstall a module from a client (soft delete)"""
@@ -216,7 +262,7 @@ async def uninstall_module_from_client(
         )
     
     # Verify client exists
-    client = session.get(Client, client_id)
+    client = await session.get(Client, client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -224,7 +270,7 @@ async def uninstall_module_from_client(
         )
     
     # Verify module exists
-    module = session.get(Module, module_id)
+    module = await session.get(Module, module_id)
     if not module:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -236,7 +282,7 @@ async def uninstall_module_from_client(
         ClientModule.client_id == client_id,
         ClientModule.module_id == module_id
     )
-    client_module = session.exec(statement).first()
+    client_module = (await session.exec(statement)).first()
     
     if not client_module:
         raise HTTPException(
@@ -247,54 +293,137 @@ async def uninstall_module_from_client(
     # Soft delete
     client_module.is_active = False
     session.add(client_module)
-    session.commit()
+    await session.commit()
     
     return None
 
 
+def _dependency_http_error(exc: DependencyError) -> HTTPException:
+    """HTTP error for a dependency resolution failure"""
+    if isinstance(exc, UnknownModuleError):
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(exc))
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+
+
+@router.get("/graph/{module_name}")
+async def get_module_graph(
+    module_name: str,
+    current_user: User = Depends(get_current_user),
+):
+    """Direct and transitive dependencies of a module, and the modules that need it"""
+    graph = module_loader.dependency_graph()
+    try:
+        return {
+            "module": module_name,
+            "depends": graph.dependencies(module_name, transitive=False),
+            "dependencies": graph.dependencies(module_name),
+            "dependents": sorted(graph.dependents(module_name)),
+        }
+    except DependencyError as exc:
+        raise _dependency_http_error(exc)
+
+
+@router.get("/graph/{module_name}/clients")
+async def list_clients_depending_on(
+    module_name: str,
+    direct_only: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Clients with installed modules that depend on `module_name` (fleet-wide)"""
+    clients = await session.run_sync(clients_depending_on, module_name, direct_only)
+    return {"module": module_name, "clients": clients, "total": len(clients)}
+
+
+@router.post("/clients/{client_id}/install-plan")
+async def client_install_plan(
+    client_id: int,
+    request: InstallPlanRequest,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Modules (dependencies first) a client needs for `modules`; installs them in one transaction with apply"""
+    if not check_permission(current_user, "module_install", client_id=client_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    client = await session.get(Client, client_id)
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    
+    try:
+        plan = await session.run_sync(module_loader.install_plan, request.modules, client_id)
+        if request.apply and plan:
+            await session.run_sync(module_loader.install_modules, plan, client_id)
+    except DependencyError as exc:
+        raise _dependency_http_error(exc)
+    
+    return {"client_id": client_id, "plan": plan, "applied": request.apply and bool(plan)}
+
+
+@router.get("/clients/{client_id}/uninstall-impact/{module_name}")
+async def client_uninstall_impact(
+    client_id: int,
+    module_name: str,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """Installed modules of a client that break if `module_name` is uninstalled"""
+    client = await session.get(Client, client_id)
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found"
+        )
+    
+    installed = await session.run_sync(module_loader.installed_module_names, client_id)
+    try:
+        breaks = module_loader.dependency_graph().uninstall_impact(module_name, installed)
+    except DependencyError as exc:
+        raise _dependency_http_error(exc)
+    
+    return {"client_id": client_id, "module": module_name, "breaks": breaks}
+
+
 @router.get("", response_model=ModuleListResponse)
 async def list_modules(
     client_id: int | None = None,
-    skip: int = 0,
-    limit: int = 100,
-    session: Session = Depends(get_session),
+    page: PageParams = Depends(get_page_params),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     """List all modules (optionally filter by client_id to show installation status)"""
-    statement = select(Module).where(Module.is_active == True).offset(skip).limit(limit)
-    modules = session.exec(statement).all()
-    
-    # If client_id provided, mark which modules are installed
     if client_id:
-        client = session.get(Client, client_id)
+        client = await session.get(Client, client_id)
         if not client:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Client not found"
             )
-        
-        # Get installed modules for client
-        client_modules_stmt = select(ClientModule).where(
+    
+    statement = select(Module).where(Module.is_active == True)
+    result = await paginate(session, statement, Module, page)
+    module_responses = [ModuleResponse.model_validate(m) for m in result.items]
+    
+    # If client_id provided, mark which modules of this page are installed
+    if client_id:
+        installed_stmt = select(ClientModule.module_id).where(
             ClientModule.client_id == client_id,
-            ClientModule.is_active == True
+            ClientModule.is_active == True,
+            ClientModule.module_id.in_([m.id for m in result.items])
         )
-        client_modules = session.exec(client_modules_stmt).all()
-        installed_module_ids = {cm.module_id for cm in client_modules}
-        
-        # Mark modules as installed
-        module_responses = []
-        for m in modules:
-            mr = ModuleResponse.model_validate(m)
-            mr.is_installed = m.id in installed_module_ids
-            module_responses.append(mr)
-    else:
-        module_responses = [ModuleResponse.model_validate(m) for m in modules]
-    
-    count_statement = select(Module).where(Module.is_active == True)
-    total = len(session.exec(count_statement).all())
+        installed_module_ids = set((await session.exec(installed_stmt)).all())
+        for mr in module_responses:
+            mr.is_installed = mr.id in installed_module_ids
     
     return ModuleListResponse(
         modules=module_responses,
-        total=total
+        total=result.total,
+        total_estimated=result.total_estimated,
+        next_cursor=result.next_cursor
     )
-
@@ -1,24 +1,169 @@
 """Database configuration"""
 
 from sqlmodel import SQLModel, create_engine, Session
-from typing import Generator
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from typing import Any, AsyncGenerator, Dict, Generator, Optional, Union
 import os
 
 
 # Database URL
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///app/data/forgeerp.db")
 
+# Async drivers used for each sync URL scheme
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Map a sync database URL to the same database on its async driver"""
+    scheme, separator, rest = database_url.partition("://")
+    if not separator:
+        return database_url
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}://{rest}"
+
+
+# Async database URL (derived from DATABASE_URL unless set explicitly)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", get_async_database_url(DATABASE_URL))
+
+# SQLite profile, applied to every new connection
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),  # Readers don't block behind writers
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),  # Safe with WAL, fsync only at checkpoints
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),  # Wait for locks instead of failing
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),  # 256 MiB memory-mapped reads
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # Negative = KiB, 64 MiB page cache
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# Postgres pool profile
+POSTGRES_POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),  # Seconds, below typical idle timeouts
+    "pool_pre_ping": True,  # Drop connections closed by the server/PgBouncer
+}
+
+
+def is_sqlite(database_url: str) -> bool:
+    """Whether a database URL points at SQLite"""
+    return database_url.startswith("sqlite")
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, Any]):
+    """Run PRAGMA statements on a raw SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def get_engine_options(database_url: str) -> Dict[str, Any]:
+    """Engine keyword arguments for the database profile"""
+    if is_sqlite(database_url):
+        if not database_url.startswith("sqlite+aiosqlite"):
+            return {"connect_args": {"check_same_thread": False}}
+        if ":memory:" in database_url or "mode=memory" in database_url:
+            return {}
+        # Keep file connections open so the pragmas run once per connection, not per session
+        return {"poolclass": AsyncAdaptedQueuePool}
+    if database_url.startswith("postgres"):
+        return dict(POSTGRES_POOL_OPTIONS)
+    return {}
+
+
+def _install_sqlite_profile(sync_engine: Engine, sqlite_pragmas: Optional[Dict[str, Any]]):
+    pragmas = SQLITE_PRAGMAS if sqlite_pragmas is None else sqlite_pragmas
+    if not pragmas:
+        return
+    
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+
+def create_database_engine(
+    database_url: str,
+    sqlite_pragmas: Optional[Dict[str, Any]] = None,
+    **engine_kwargs,
+) -> Engine:
+    """Create an engine with the SQLite or Postgres profile applied
+    
+    sqlite_pragmas overrides SQLITE_PRAGMAS ({} disables the profile);
+    engine_kwargs override the profile's engine options.
+    """
+    options = get_engine_options(database_url)
+    options.update(engine_kwargs)
+    new_engine = create_engine(database_url, **options)
+    if is_sqlite(database_url):
+        _install_sqlite_profile(new_engine, sqlite_pragmas)
+    return new_engine
+
+
+def create_async_database_engine(
+    database_url: str,
+    sqlite_pragmas: Optional[Dict[str, Any]] = None,
+    **engine_kwargs,
+) -> AsyncEngine:
+    """Async counterpart of create_database_engine"""
+    options = get_engine_options(database_url)
+    options.update(engine_kwargs)
+    new_engine = create_async_engine(database_url, **options)
+    if is_sqlite(database_url):
+        _install_sqlite_profile(new_engine.sync_engine, sqlite_pragmas)
+    return new_engine
+
+
+def get_pool_stats(target: Union[Engine, AsyncEngine]) -> Dict[str, Any]:
+    """Connection pool statistics for an engine"""
+    pool = target.pool
+    stats: Dict[str, Any] = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+    }
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
 # Create engine
-engine = create_engine(
+engine = create_database_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
     echo=False,  # Set to True for SQL debugging
 )
 
+# Create async engine (used by the API routes)
+async_engine = create_async_database_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,  # Set to True for SQL debugging
+)
+
+# Objects stay usable after commit; attribute access must never trigger lazy IO
+async_session_maker = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
 
 def create_db_and_tables():
-    """Create database and tables"""
+    """Create database and tables, then upgrade tables created by older versions"""
+    from forgeerp.core.database.migrations import upgrade_schema
     SQLModel.metadata.create_all(engine)
+    upgrade_schema(engine)
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -26,3 +171,21 @@ def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
 
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session"""
+    async with async_session_maker() as session:
+        yield session
+
+
+def get_database_pool_stats() -> Dict[str, Any]:
+    """Pool statistics for the application engines"""
+    return {
+        "engine": get_pool_stats(engine),
+        "async_engine": get_pool_stats(async_engine),
+    }
+
+
+async def dispose_async_engine():
+    """Close pooled async connections"""
+    await async_engine.dispose()
@@ -0,0 +1,31 @@
+"""Session events - work deferred until a transaction commits"""
+
+from typing import Any, Callable, Hashable, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_PENDING_KEY = "after_commit"
+
+
+def after_commit(session: Session, callback: Callable[..., Any], *keys: Hashable):
+    """Run `callback(*keys)` once the session's transaction commits (dropped on rollback)
+
+    Keys registered for the same callback during one transaction are merged
+    into a single call. Cache invalidations go here instead of flush-time
+    mapper events, so a concurrent reader cannot re-cache the old row
+    between the flush and the commit.
+    """
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    keys_for_callback: Set[Hashable] = pending.setdefault(callback, set())
+    keys_for_callback.update(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session):
+    for callback, keys in session.info.pop(_PENDING_KEY, {}).items():
+        callback(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session: Session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,121 @@
+"""Schema upgrades - columns and indexes added to existing tables after they were first created
+
+`SQLModel.metadata.create_all` creates missing tables but never alters
+existing ones. Every column or index added to a model whose table may already
+exist is listed here and applied at startup; each step is a no-op once applied.
+"""
+
+import logging
+from typing import Dict, List
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+from forgeerp.core.database import models  # noqa: F401  Registers every table on the metadata
+
+logger = logging.getLogger(__name__)
+
+
+# Table -> columns added after the table existed (added as nullable, without default)
+ADDED_COLUMNS: Dict[str, List[str]] = {
+    "clients": ["created_by", "updated_by"],
+    "pull_requests": ["synced_at", "github_updated_at"],
+    "pull_request_approvals": ["github_review_id", "reviewer_login", "state", "submitted_at"],
+}
+
+# Table -> indexes added after the table existed (keyset pagination on updated_at / created_at)
+ADDED_INDEXES: Dict[str, List[str]] = {
+    table: [f"ix_{table}_updated_at_id", f"ix_{table}_created_at_id"]
+    for table in ("clients", "environments", "configurations", "modules", "jobs", "pull_requests")
+}
+
+# Table -> columns that were NOT NULL and became nullable
+NULLABLE_COLUMNS: Dict[str, List[str]] = {
+    "pull_request_approvals": ["approver_id"],
+}
+
+
+def _add_columns(connection: Connection, table_name: str, names: List[str]) -> List[str]:
+    table = SQLModel.metadata.tables[table_name]
+    existing = {column["name"] for column in inspect(connection).get_columns(table_name)}
+    added = [name for name in names if name not in existing]
+    preparer = connection.dialect.identifier_preparer
+    for name in added:
+        column = table.columns[name]
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.exec_driver_sql(
+            f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+        )
+    # Indexes (and unique indexes) of the new columns
+    for index in table.indexes:
+        if any(column.name in added for column in index.columns):
+            index.create(connection, checkfirst=True)
+    return added
+
+
+def _add_indexes(connection: Connection, table_name: str, names: List[str]) -> List[str]:
+    table = SQLModel.metadata.tables[table_name]
+    existing = {index["name"] for index in inspect(connection).get_indexes(table_name)}
+    added = []
+    for index in table.indexes:
+        if index.name in names and index.name not in existing:
+            index.create(connection)
+            added.append(index.name)
+    return added
+
+
+def _rebuild_sqlite_table(connection: Connection, table_name: str):
+    # SQLite cannot alter a column's constraints: copy the rows into a table created from the model
+    table = SQLModel.metadata.tables[table_name]
+    inspector = inspect(connection)
+    columns = [column["name"] for column in inspector.get_columns(table_name) if column["name"] in table.columns]
+    old_name = f"{table_name}__old"
+    for index in inspector.get_indexes(table_name):
+        connection.exec_driver_sql(f'DROP INDEX "{index["name"]}"')
+    connection.exec_driver_sql(f'ALTER TABLE "{table_name}" RENAME TO "{old_name}"')
+    table.create(connection)
+    column_list = ", ".join(f'"{name}"' for name in columns)
+    connection.exec_driver_sql(f'INSERT INTO "{table_name}" ({column_list}) SELECT {column_list} FROM "{old_name}"')
+    connection.exec_driver_sql(f'DROP TABLE "{old_name}"')
+
+
+def _drop_not_null(connection: Connection, table_name: str, names: List[str]) -> List[str]:
+    required = [
+        column["name"] for column in inspect(connection).get_columns(table_name)
+        if column["name"] in names and not column["nullable"]
+    ]
+    if not required:
+        return []
+    if connection.dialect.name == "sqlite":
+        _rebuild_sqlite_table(connection, table_name)
+    else:
+        preparer = connection.dialect.identifier_preparer
+        for name in required:
+            connection.exec_driver_sql(
+                f"ALTER TABLE {preparer.quote(table_name)} ALTER COLUMN {preparer.quote(name)} DROP NOT NULL"
+            )
+    return required
+
+
+def upgrade_schema(engine: Engine) -> Dict[str, List[str]]:
+    """Apply pending column and index changes to existing tables, in one transaction"""
+    applied: Dict[str, List[str]] = {}
+    with engine.begin() as connection:
+        tables = set(inspect(connection).get_table_names())
+        for table_name, names in ADDED_COLUMNS.items():
+            if table_name in tables:
+                added = _add_columns(connection, table_name, names)
+                if added:
+                    applied[f"{table_name}.added"] = added
+        for table_name, names in ADDED_INDEXES.items():
+            if table_name in tables:
+                indexed = _add_indexes(connection, table_name, names)
+                if indexed:
+                    applied[f"{table_name}.indexes"] = indexed
+        for table_name, names in NULLABLE_COLUMNS.items():
+            if table_name in tables:
+                relaxed = _drop_not_null(connection, table_name, names)
+                if relaxed:
+                    applied[f"{table_name}.nullable"] = relaxed
+    for step, columns in applied.items():
+        logger.info("Schema upgrade %s: %s", step, ", ".join(columns))
+    return applied
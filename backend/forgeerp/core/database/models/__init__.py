@@ -3,9 +3,10 @@
 from .base import BaseModel, AuditMixin
 from .client import Client, Environment
 from .user import User, Session
-from .module import Module, ClientModule
+from .module import Module, ClientModule, ModuleDependency
 from .configuration import Configuration
-from .permission import Permission, PullRequest, PullRequestApproval
+from .permission import Permission, PullRequest, PullRequestApproval, GitHubWebhookDelivery
+from .job import Job
 
 __all__ = [
     "BaseModel",
@@ -16,8 +17,11 @@ __all__ = [
     "Session",
     "Module",
     "ClientModule",
+    "ModuleDependency",
     "Configuration",
     "Permission",
     "PullRequest",
     "PullRequestApproval",
+    "GitHubWebhookDelivery",
+    "Job",
 ]
@@ -1,7 +1,8 @@
 """Base models"""
 
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
@@ -19,3 +20,10 @@ class AuditMixin(SQLModel):
     created_by: Optional[int] = Field(default=None, foreign_key="users.id")
     updated_by: Optional[int] = Field(default=None, foreign_key="users.id")
 
+
+def keyset_indexes(table_name: str) -> Tuple[Index, Index]:
+    """(updated_at, id) and (created_at, id) indexes backing keyset pagination"""
+    return (
+        Index(f"ix_{table_name}_updated_at_id", "updated_at", "id"),
+        Index(f"ix_{table_name}_created_at_id", "created_at", "id"),
+    )
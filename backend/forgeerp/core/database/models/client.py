@@ -1,12 +1,16 @@
 """Client model - Clientes finais do parceiro Odoo"""
 
 from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
 from sqlmodel import SQLModel, Field, Relationship
-from .base import BaseModel
+from .base import AuditMixin, BaseModel, keyset_indexes
 
+if TYPE_CHECKING:
+    from .configuration import Configuration
+    from .module import ClientModule
 
-class Client(BaseModel, table=True):
+
+class Client(BaseModel, AuditMixin, table=True):
     """
     Cliente final do parceiro Odoo
     
@@ -17,6 +21,7 @@ class Client(BaseModel, table=True):
     """
     
     __tablename__ = "clients"
+    __table_args__ = keyset_indexes("clients")
     
     # Informações do Cliente
     name: str = Field(index=True)  # Nome da empresa/cliente
@@ -31,8 +36,10 @@ class Client(BaseModel, table=True):
     is_active: bool = Field(default=True, index=True)
     onboarding_completed: bool = Field(default=False)
     
-    # Relacionamentos (usando sa_relationship_kwargs para evitar import circular)
-    # environments, modules e configurations serão definidos nos modelos respectivos
+    # Relacionamentos (carregar explicitamente com selectinload/joinedload nas queries)
+    environments: List["Environment"] = Relationship(back_populates="client")
+    client_modules: List["ClientModule"] = Relationship(back_populates="client")
+    configurations: List["Configuration"] = Relationship(back_populates="client")
     
     # Timestamps
     last_sync_at: Optional[datetime] = Field(default=None)  # Última sincronização com GitHub
@@ -42,6 +49,7 @@ class Environment(BaseModel, table=True):
     """Ambientes de deploy (dev, hml, prod)"""
     
     __tablename__ = "environments"
+    __table_args__ = keyset_indexes("environments")
     
     client_id: int = Field(foreign_key="clients.id", index=True)
     name: str = Field(index=True)  # dev, hml, prod
@@ -55,5 +63,5 @@ class Environment(BaseModel, table=True):
     is_active: bool = Field(default=True)
     
     # Relacionamento com Client
-    # client será definido via ForeignKey
+    client: Optional[Client] = Relationship(back_populates="environments")
 
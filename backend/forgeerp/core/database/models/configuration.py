@@ -1,14 +1,19 @@
 """Configuration model - Configurações do sistema"""
 
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from sqlmodel import SQLModel, Field, Relationship
-from .base import BaseModel
+from .base import BaseModel, keyset_indexes
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .module import Module
 
 
 class Configuration(BaseModel, table=True):
     """Configuração do sistema ou de módulo"""
     
     __tablename__ = "configurations"
+    __table_args__ = keyset_indexes("configurations")
     
     # Escopo da configuração
     client_id: Optional[int] = Field(default=None, foreign_key="clients.id", index=True)
@@ -27,5 +32,7 @@ class Configuration(BaseModel, table=True):
     # Status
     is_active: bool = Field(default=True)
     
-    # Relacionamento (usando ForeignKey apenas)
+    # Relacionamentos
+    client: Optional["Client"] = Relationship(back_populates="configurations")
+    module: Optional["Module"] = Relationship(back_populates="configurations")
 
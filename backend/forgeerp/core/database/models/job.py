@@ -0,0 +1,37 @@
+"""Job model - Fila persistente de tarefas em background"""
+
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field
+from .base import BaseModel, keyset_indexes
+
+
+class Job(BaseModel, table=True):
+    """Tarefa executada pelo job runner (geração de workflows, chamadas ao GitHub, etc.)"""
+    
+    __tablename__ = "jobs"
+    __table_args__ = keyset_indexes("jobs")
+    
+    job_type: str = Field(index=True)  # workflows.generate, prs.create, prs.sync, etc.
+    status: str = Field(default="queued", index=True)  # queued, running, succeeded, failed
+    dedupe_key: Optional[str] = Field(default=None, index=True)  # Evita jobs duplicados pendentes
+    
+    # Dados (JSON)
+    payload: str = Field(default="{}")
+    result: Optional[str] = Field(default=None)
+    error: Optional[str] = Field(default=None)
+    progress: Optional[str] = Field(default=None)  # Último progresso reportado pelo handler
+    
+    # Tentativas
+    attempts: int = Field(default=0)
+    max_attempts: int = Field(default=3)
+    run_after: datetime = Field(default_factory=datetime.utcnow, index=True)  # Backoff entre tentativas
+    
+    # Lease (worker que está executando)
+    leased_by: Optional[str] = Field(default=None)
+    lease_expires_at: Optional[datetime] = Field(default=None)
+    
+    # Autor e timestamps
+    created_by: Optional[int] = Field(default=None, foreign_key="users.id", index=True)
+    started_at: Optional[datetime] = Field(default=None)
+    finished_at: Optional[datetime] = Field(default=None)
@@ -1,14 +1,20 @@
 """Module model - Módulos instalados"""
 
-from typing import Optional
+from typing import TYPE_CHECKING, List, Optional
+from sqlalchemy import Index, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
-from .base import BaseModel
+from .base import BaseModel, keyset_indexes
+
+if TYPE_CHECKING:
+    from .client import Client
+    from .configuration import Configuration
 
 
 class Module(BaseModel, table=True):
     """Módulo disponível no sistema"""
     
     __tablename__ = "modules"
+    __table_args__ = keyset_indexes("modules")
     
     # Informações do Módulo
     name: str = Field(unique=True, index=True)  # Nome do módulo (ex: "hetzner", "postgresql")
@@ -17,13 +23,15 @@ class Module(BaseModel, table=True):
     category: str = Field(default="addon", index=True)  # core, addon
     
     # Dependências
-    depends_on: Optional[str] = Field(default=None)  # Módulos dependentes (JSON array)
+    depends_on: Optional[str] = Field(default=None)  # Dependências diretas (JSON array); consultas usam module_dependencies
     
     # Status
     is_active: bool = Field(default=True)
     is_installed: bool = Field(default=False, index=True)
     
-    # Relacionamento (usando sa_relationship_kwargs para evitar import circular)
+    # Relacionamentos
+    client_modules: List["ClientModule"] = Relationship(back_populates="module")
+    configurations: List["Configuration"] = Relationship(back_populates="module")
 
 
 class ClientModule(BaseModel, table=True):
@@ -40,5 +48,21 @@ class ClientModule(BaseModel, table=True):
     # Status
     is_active: bool = Field(default=True)
     
-    # Relacionamentos (usando ForeignKey apenas)
+    # Relacionamentos
+    client: Optional["Client"] = Relationship(back_populates="client_modules")
+    module: Optional[Module] = Relationship(back_populates="client_modules")
+
 
+class ModuleDependency(BaseModel, table=True):
+    """Aresta do grafo de dependências (fecho transitivo, gerado a partir dos manifests)"""
+    
+    __tablename__ = "module_dependencies"
+    __table_args__ = (
+        UniqueConstraint("module_id", "depends_on", name="uq_module_dependencies_edge"),
+        # Consulta reversa ("quem depende de X") sem tocar na tabela
+        Index("ix_module_dependencies_depends_on_module", "depends_on", "module_id"),
+    )
+    
+    module_id: int = Field(foreign_key="modules.id", index=True)
+    depends_on: str  # Nome do módulo exigido (pode não ter manifest nem linha em modules)
+    is_direct: bool = Field(default=True)  # Declarado no manifest (False = exigido através de outro módulo)
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional
 from sqlmodel import SQLModel, Field, Relationship
-from .base import BaseModel
+from .base import BaseModel, keyset_indexes
 
 
 class Permission(BaseModel, table=True):
@@ -30,6 +30,7 @@ class PullRequest(BaseModel, table=True):
     """Pull Request do GitHub para mudanças graves"""
     
     __tablename__ = "pull_requests"
+    __table_args__ = keyset_indexes("pull_requests")
     
     # Informações do PR
     github_pr_number: int = Field(unique=True, index=True)  # Número do PR no GitHub
@@ -52,6 +53,8 @@ class PullRequest(BaseModel, table=True):
     # Timestamps
     merged_at: Optional[datetime] = Field(default=None)
     closed_at: Optional[datetime] = Field(default=None)
+    synced_at: Optional[datetime] = Field(default=None)  # Última sincronização com o GitHub
+    github_updated_at: Optional[datetime] = Field(default=None)  # updated_at do GitHub (ordena webhooks fora de ordem)
 
 
 class PullRequestApproval(BaseModel, table=True):
@@ -60,7 +63,13 @@ class PullRequestApproval(BaseModel, table=True):
     __tablename__ = "pull_request_approvals"
     
     pull_request_id: int = Field(foreign_key="pull_requests.id", index=True)
-    approver_id: int = Field(foreign_key="users.id", index=True)
+    approver_id: Optional[int] = Field(default=None, foreign_key="users.id", index=True)  # Usuário local com o mesmo login, se existir
+    
+    # Review do GitHub
+    github_review_id: Optional[int] = Field(default=None, unique=True, index=True)
+    reviewer_login: Optional[str] = Field(default=None, index=True)
+    state: Optional[str] = Field(default=None)  # APPROVED, CHANGES_REQUESTED, COMMENTED, DISMISSED
+    submitted_at: Optional[datetime] = Field(default=None)
     
     # Status da aprovação
     approved: bool = Field(default=True)
@@ -68,3 +77,16 @@ class PullRequestApproval(BaseModel, table=True):
     
     # Relacionamentos (usando ForeignKey apenas)
 
+
+
+class GitHubWebhookDelivery(BaseModel, table=True):
+    """Entrega de webhook do GitHub (deduplicação e reprocessamento)"""
+    
+    __tablename__ = "github_webhook_deliveries"
+    
+    delivery_id: str = Field(unique=True, index=True)  # Header X-GitHub-Delivery
+    event: str = Field(index=True)  # pull_request, pull_request_review
+    action: Optional[str] = Field(default=None)
+    payload: str  # JSON recebido
+    
+    processed_at: Optional[datetime] = Field(default=None)
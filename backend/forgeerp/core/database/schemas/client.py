@@ -45,4 +45,6 @@ class ClientListResponse(BaseModel):
     """Schema for client list response"""
     clients: List[ClientResponse]
     total: int
+    total_estimated: bool = False
+    next_cursor: Optional[str] = None
 
@@ -1,5 +1,12 @@
 """GitHub generator engine"""
 
-from .workflows import GitHubWorkflowGenerator, GitHubActionGenerator
+from .registry import TemplateRegistry, template_registry
+from .workflows import GenerationReport, GitHubWorkflowGenerator, GitHubActionGenerator
 
-__all__ = ["GitHubWorkflowGenerator", "GitHubActionGenerator"]
+__all__ = [
+    "GenerationReport",
+    "GitHubWorkflowGenerator",
+    "GitHubActionGenerator",
+    "TemplateRegistry",
+    "template_registry",
+]
@@ -0,0 +1,198 @@
+"""In-memory workflow trees - streamed archives and diffs without touching disk"""
+
+import difflib
+import io
+import json
+import tarfile
+import time
+import zipfile
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional
+from forgeerp.core.engine.github_generator.registry import TemplateRegistry, template_registry
+from forgeerp.core.engine.github_generator.workflows import MANIFEST_NAME, GitHubWorkflowGenerator, generation_manifest
+
+
+WORKFLOWS_PREFIX = ".github/workflows/"
+MANIFEST_PATH = f".github/{MANIFEST_NAME}"
+
+# Largest uploaded tree accepted for a diff (compressed and uncompressed)
+MAX_ARCHIVE_BYTES = 20 * 1024 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+
+ARCHIVE_MEDIA_TYPES = {
+    "zip": "application/zip",
+    "tar.gz": "application/gzip",
+}
+
+
+class ArchiveError(ValueError):
+    """Raised for unreadable or oversized uploaded trees"""
+
+
+def render_tree(
+    client_data: Dict[str, Any],
+    installed_modules: Optional[List[str]] = None,
+    registry: TemplateRegistry = template_registry,
+) -> Dict[str, str]:
+    """Generated repository files (path -> content), including the generation manifest"""
+    installed_modules = installed_modules or []
+    generator = GitHubWorkflowGenerator(registry=registry)
+    outputs = generator.render_workflows_for_client(client_data, installed_modules)
+
+    files = generator.deploy_policy_files(client_data)
+    tree = {f"{WORKFLOWS_PREFIX}{name}": content for name, content in sorted(outputs.items())}
+    tree.update(files)
+    tree[MANIFEST_PATH] = generation_manifest(generator.inputs_hash(client_data, installed_modules), outputs, files)
+    return tree
+
+
+def generated_paths(manifest_content: str) -> List[str]:
+    """Repository paths a generation manifest records (workflows and other files)"""
+    try:
+        manifest = json.loads(manifest_content)
+    except ValueError:
+        return []
+    if not isinstance(manifest, dict):
+        return []
+    return [f"{WORKFLOWS_PREFIX}{name}" for name in manifest.get("outputs", {})] + list(manifest.get("files", {}))
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable stream whose bytes are drained between files"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile records offsets with tell() even on unseekable streams
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(tree: Dict[str, str]) -> Iterator[bytes]:
+    """Yield a zip of the tree file by file"""
+    buffer = _ChunkBuffer()
+    now = time.localtime()[:6]
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, content in sorted(tree.items()):
+            info = zipfile.ZipInfo(path, date_time=now)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, content.encode())
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def stream_tar_gz(tree: Dict[str, str]) -> Iterator[bytes]:
+    """Yield a gzipped tar of the tree file by file"""
+    buffer = _ChunkBuffer()
+    now = time.time()
+    with tarfile.open(fileobj=buffer, mode="w|gz") as archive:
+        for path, content in sorted(tree.items()):
+            data = content.encode()
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = now
+            archive.addfile(info, io.BytesIO(data))
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+STREAMERS = {
+    "zip": stream_zip,
+    "tar.gz": stream_tar_gz,
+}
+
+
+def read_archive(data: bytes) -> Dict[str, str]:
+    """Text files of an uploaded zip or tar(.gz) tree (path -> content)
+
+    Entries are rejected by their declared size before being read, then read
+    in chunks, so a decompression bomb stops at MAX_ARCHIVE_BYTES.
+    """
+    if len(data) > MAX_ARCHIVE_BYTES:
+        raise ArchiveError("Archive too large")
+
+    files: Dict[str, str] = {}
+    total = 0
+
+    def add(path: str, size: int, open_entry: Callable[[], IO[bytes]]):
+        nonlocal total
+        if total + size > MAX_ARCHIVE_BYTES:
+            raise ArchiveError("Archive too large once extracted")
+        chunks: List[bytes] = []
+        with open_entry() as entry:
+            while True:
+                chunk = entry.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > MAX_ARCHIVE_BYTES:
+                    raise ArchiveError("Archive too large once extracted")
+                chunks.append(chunk)
+        files[path[2:] if path.startswith("./") else path] = b"".join(chunks).decode("utf-8", errors="replace")
+
+    try:
+        if zipfile.is_zipfile(io.BytesIO(data)):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        add(info.filename, info.file_size, lambda: archive.open(info))
+        else:
+            with tarfile.open(fileobj=io.BytesIO(data), mode="r:*") as archive:
+                for member in archive:
+                    if member.isfile():
+                        add(member.name, member.size, lambda: archive.extractfile(member))
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as exc:
+        raise ArchiveError(f"Unreadable archive: {exc}") from exc
+    return _strip_common_root(files)
+
+
+def _strip_common_root(files: Dict[str, str]) -> Dict[str, str]:
+    """Drop a single top-level directory (e.g. "repo-main/" in GitHub's archives)"""
+    roots = {path.split("/", 1)[0] for path in files}
+    if len(roots) != 1 or any("/" not in path for path in files) or roots == {".github"}:
+        return files
+    return {path.split("/", 1)[1]: content for path, content in files.items()}
+
+
+def diff_trees(existing: Dict[str, str], generated: Dict[str, str]) -> str:
+    """Unified diff turning the existing tree's generated files into the new ones
+
+    Only generated paths are compared; other files in the existing tree are
+    left alone, except files the existing manifest says were generated
+    and are no longer produced, which show up as deletions.
+    """
+    removed = {
+        path for path in generated_paths(existing.get(MANIFEST_PATH, "{}"))
+        if path not in generated and path in existing
+    }
+
+    lines: List[str] = []
+    for path in sorted(set(generated) | removed):
+        old = existing.get(path)
+        new = generated.get(path)
+        if old == new:
+            continue
+        for line in difflib.unified_diff(
+            old.splitlines(keepends=True) if old is not None else [],
+            new.splitlines(keepends=True) if new is not None else [],
+            fromfile=f"a/{path}" if old is not None else "/dev/null",
+            tofile=f"b/{path}" if new is not None else "/dev/null",
+        ):
+            # Same marker as git/patch for a last line without newline
+            lines.append(line if line.endswith("\n") else line + "\n\\ No newline at end of file\n")
+    return "".join(lines)
@@ -0,0 +1,164 @@
+"""Workflow caching - restore/save cache steps contributed by installed modules
+
+An addon declares its caches in manifest.yaml:
+
+    ci:
+      cache:
+        - helm                      # a preset by name
+        - preset: pip               # a preset with overrides
+          key_files: ["addons/my_addon/requirements.txt"]
+        - name: terraform-plugins   # a cache of its own
+          paths: ["~/.terraform.d/plugin-cache"]
+          key_files: ["**/.terraform.lock.hcl"]
+          env: {TF_PLUGIN_CACHE_DIR: "$HOME/.terraform.d/plugin-cache"}
+          create_dirs: true         # mkdir -p every env value
+          workflows: ["deploy-client"]
+
+Modules without a `ci.cache` section add no caches. Caches with the same
+name are generated once. A manifest or entry that cannot be read is logged
+and skipped, so one bad addon never fails generation.
+"""
+
+import logging
+from typing import Any, Callable, Dict, List, Tuple
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_WORKFLOWS = ("setup-client", "deploy-client")
+
+# Bump to drop every generated cache at once
+CACHE_KEY_VERSION = "v1"
+
+CACHE_PRESETS: Dict[str, Dict[str, Any]] = {
+    "pip": {
+        "paths": ["~/.cache/pip"],
+        "key_files": ["**/requirements*.txt"],
+    },
+    "helm": {
+        "paths": ["~/.cache/helm", "~/.config/helm", "~/.local/share/helm"],
+        "key_files": ["**/Chart.lock", "**/Chart.yaml"],
+    },
+    "terraform": {
+        "paths": ["~/.terraform.d/plugin-cache"],
+        "key_files": ["**/.terraform.lock.hcl"],
+        "env": {"TF_PLUGIN_CACHE_DIR": "$HOME/.terraform.d/plugin-cache"},
+        "create_dirs": True,
+    },
+    # Docker layers in the GitHub Actions cache backend, used by `docker buildx build`
+    "buildx": {"type": "buildx"},
+}
+
+ManifestLoader = Callable[[str], Dict[str, Any]]
+
+
+def _normalize(entry: Any, module_name: str) -> Dict[str, Any]:
+    if isinstance(entry, str):
+        entry = {"preset": entry}
+    if not isinstance(entry, dict):
+        raise ValueError(f"Invalid cache entry in module {module_name}: {entry!r}")
+    preset_name = entry.get("preset")
+    if preset_name is not None and preset_name not in CACHE_PRESETS:
+        raise ValueError(f"Unknown cache preset in module {module_name}: {preset_name!r}")
+
+    spec = {**CACHE_PRESETS.get(preset_name, {}), **{k: v for k, v in entry.items() if k != "preset"}}
+    spec.setdefault("name", preset_name)
+    spec.setdefault("type", "files")
+    spec["workflows"] = list(spec.get("workflows", CACHE_WORKFLOWS))
+    if not spec["name"]:
+        raise ValueError(f"Cache entry without a name in module {module_name}")
+    if spec["type"] == "files" and not spec.get("paths"):
+        raise ValueError(f"Cache {spec['name']} in module {module_name} has no paths")
+    return spec
+
+
+def _cache_entries(module_name: str, load_manifest: ManifestLoader) -> List[Any]:
+    try:
+        manifest = load_manifest(module_name)
+    except FileNotFoundError:
+        return []
+    if not isinstance(manifest, dict):
+        raise ValueError(f"Manifest of module {module_name} is not a mapping")
+    ci = manifest.get("ci") or {}
+    entries = ci.get("cache") if isinstance(ci, dict) else None
+    if entries is not None and not isinstance(entries, list):
+        raise ValueError(f"ci.cache of module {module_name} is not a list")
+    return entries or []
+
+
+def module_cache_specs(installed_modules: List[str], load_manifest: ManifestLoader) -> List[Dict[str, Any]]:
+    """Cache specs of the installed modules, one per cache name, sorted by name"""
+    specs: Dict[str, Dict[str, Any]] = {}
+    for module_name in sorted(installed_modules):
+        try:
+            entries = _cache_entries(module_name, load_manifest)
+        except (yaml.YAMLError, OSError, ValueError) as exc:
+            logger.warning("Skipping caches of module %s: %s", module_name, exc)
+            continue
+        for entry in entries:
+            try:
+                spec = _normalize(entry, module_name)
+            except ValueError as exc:
+                logger.warning("Skipping cache entry: %s", exc)
+                continue
+            specs.setdefault(spec["name"], spec)
+    return [specs[name] for name in sorted(specs)]
+
+
+def _step_id(name: str) -> str:
+    return "cache-" + "".join(c if c.isalnum() else "-" for c in name.lower())
+
+
+def cache_steps(specs: List[Dict[str, Any]], workflow: str, scope: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """(steps after checkout, steps at the end) of one workflow's job
+
+    File caches are restored up front and saved at the end only on a miss
+    of a successful run, so a key is written once and never overwritten.
+    Cache environment variables are exported through $GITHUB_ENV so values
+    like $HOME expand on the runner.
+    """
+    restore: List[Dict[str, Any]] = []
+    save: List[Dict[str, Any]] = []
+    exports: List[str] = []
+
+    for spec in specs:
+        if workflow not in spec["workflows"]:
+            continue
+        env = dict(spec.get("env", {}))
+
+        if spec["type"] == "buildx":
+            buildx_scope = f"{scope}-{workflow}"
+            restore.append({"name": "Set up Docker Buildx", "uses": "docker/setup-buildx-action@v3"})
+            # Exposes the cache service token to `docker buildx build` in run steps
+            restore.append({"name": "Expose GitHub Actions cache to buildx", "uses": "crazy-max/ghaction-github-runtime@v3"})
+            env["BUILDX_CACHE_FROM"] = f"type=gha,scope={buildx_scope}"
+            env["BUILDX_CACHE_TO"] = f"type=gha,scope={buildx_scope},mode=max"
+        else:
+            step_id = _step_id(spec["name"])
+            prefix = f"{spec['name']}-{CACHE_KEY_VERSION}-${{{{ runner.os }}}}-"
+            key_files = spec.get("key_files") or []
+            hashed = ", ".join(f"'{pattern}'" for pattern in key_files)
+            key = prefix + (f"${{{{ hashFiles({hashed}) }}}}" if key_files else "static")
+            paths = "\n".join(spec["paths"])
+            restore.append({
+                "name": f"Restore {spec['name']} cache",
+                "id": step_id,
+                "uses": "actions/cache/restore@v4",
+                "with": {"path": paths, "key": key, "restore-keys": prefix},
+            })
+            save.append({
+                "name": f"Save {spec['name']} cache",
+                "if": f"success() && steps.{step_id}.outputs.cache-hit != 'true'",
+                "uses": "actions/cache/save@v4",
+                "with": {"path": paths, "key": key},
+            })
+
+        for name, value in env.items():
+            exports.append(f'echo "{name}={value}" >> "$GITHUB_ENV"')
+            if spec.get("create_dirs"):
+                exports.append(f'mkdir -p "{value}"')
+
+    if exports:
+        restore.insert(0, {"name": "Configure caches", "run": "\n".join(exports) + "\n"})
+    return restore, save
@@ -0,0 +1,134 @@
+"""Workflow concurrency - per-client policies for the `concurrency:` of generated workflows"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from sqlmodel import Session, select
+from forgeerp.core.database.models.configuration import Configuration
+
+logger = logging.getLogger(__name__)
+
+
+# Configuration keys: workflows.concurrency.<workflow>[.<environment>] = cancel | queue | exclusive | none
+CONCURRENCY_CONFIG_PREFIX = "workflows.concurrency."
+
+# cancel:    a newer run cancels the running one (same client/environment)
+# queue:     runs wait for each other (GitHub keeps only the newest pending run)
+# exclusive: one run per client at a time, whatever the inputs; never cancelled
+# none:      no concurrency group
+CONCURRENCY_POLICIES = ("cancel", "queue", "exclusive", "none")
+
+# Deploy groups are per matrix client/environment, chosen at run time
+DEPLOY_POLICIES = ("cancel", "queue")
+
+# Each client's deploy policy, next to its values-<environment>.yaml files
+DEPLOY_POLICY_PATH = "clients/{client}/deploy-concurrency.json"
+
+DEFAULT_CONCURRENCY = {
+    "deploy-client.dev": "cancel",
+    "deploy-client.hml": "cancel",
+    "deploy-client.prod": "queue",
+    "deploy-client": "queue",  # Any other environment
+    "setup-client": "queue",
+    "disaster-recovery": "exclusive",
+    "diagnose-services": "cancel",
+    "fix-common-issues": "queue",
+}
+
+
+def _allowed_policies(workflow: str):
+    return DEPLOY_POLICIES if workflow == "deploy-client" else CONCURRENCY_POLICIES
+
+
+def validate_concurrency_setting(name: str, policy: str):
+    """Raise ValueError when a `<workflow>[.<environment>]` setting names an unsupported policy"""
+    allowed = _allowed_policies(name.split(".", 1)[0])
+    if policy.strip().lower() not in allowed:
+        raise ValueError(f"Invalid concurrency policy for {name}: {policy!r} (expected one of {', '.join(allowed)})")
+
+
+def concurrency_policy(client_data: Dict[str, Any], workflow: str, environment: Optional[str] = None) -> str:
+    """Policy for a workflow (and environment): client setting, then default
+
+    An invalid client setting is logged and the default used instead, so a
+    bad Configuration row never fails generation.
+    """
+    settings = client_data.get("concurrency", {})
+    allowed = _allowed_policies(workflow)
+    keys = [f"{workflow}.{environment}", workflow] if environment else [workflow]
+    for key in keys:
+        policy = settings.get(key)
+        if policy is not None and policy not in allowed:
+            logger.warning("Ignoring invalid concurrency policy for %s: %r", key, policy)
+            policy = None
+        policy = policy or DEFAULT_CONCURRENCY.get(key)
+        if policy:
+            return policy
+    return "queue"
+
+
+def concurrency_block(policy: str, group: str, scope: str = "") -> Optional[Dict[str, Any]]:
+    """`concurrency:` mapping for a policy; `scope` narrows the group except when exclusive"""
+    if policy == "none":
+        return None
+    if policy != "exclusive" and scope:
+        group = f"{group}-{scope}"
+    return {"group": group, "cancel-in-progress": policy == "cancel"}
+
+
+def deploy_policy(client_data: Dict[str, Any]) -> Dict[str, Any]:
+    """A client's deploy cancel policy, read by the deploy matrix for each of its entries
+
+    `cancel`/`queue` list the known environments; any other environment
+    cancels when `default` is true.
+    """
+    settings = {**DEFAULT_CONCURRENCY, **client_data.get("concurrency", {})}
+    environments = set(client_data.get("environments", [])) | {
+        key.split(".", 1)[1] for key in settings if key.startswith("deploy-client.")
+    }
+    cancelled = sorted(
+        environment for environment in environments
+        if concurrency_policy(client_data, "deploy-client", environment) == "cancel"
+    )
+    return {
+        "cancel": cancelled,
+        "queue": sorted(environments - set(cancelled)),
+        "default": concurrency_policy(client_data, "deploy-client") == "cancel",
+    }
+
+
+def deploy_concurrency() -> Dict[str, Any]:
+    """Job-level `concurrency:` of the deploy matrix (one group per client/environment)
+
+    The workflow is shared by every client, so whether a run cancels the
+    previous one comes from the matrix entry, not from the workflow.
+    """
+    return {
+        "group": "deploy-${{ matrix.client }}-${{ matrix.environment }}",
+        "cancel-in-progress": "${{ matrix.cancel }}",
+    }
+
+
+def load_concurrency_settings(session: Session, client_ids: Iterable[int]) -> Dict[int, Dict[str, str]]:
+    """Concurrency settings per client (global rows, then client rows) in one query"""
+    client_ids = list(client_ids)
+    settings: Dict[int, Dict[str, str]] = {client_id: {} for client_id in client_ids}
+    if not client_ids:
+        return settings
+
+    statement = (
+        select(Configuration.client_id, Configuration.key, Configuration.value)
+        .where(
+            Configuration.key.startswith(CONCURRENCY_CONFIG_PREFIX),
+            Configuration.module_id == None,
+            Configuration.is_active == True,
+            (Configuration.client_id == None) | Configuration.client_id.in_(client_ids)
+        )
+        # Global rows first so client rows override them
+        .order_by(Configuration.client_id.is_not(None), Configuration.id)
+    )
+    for client_id, key, value in session.exec(statement).all():
+        name = key[len(CONCURRENCY_CONFIG_PREFIX):]
+        targets: List[int] = client_ids if client_id is None else [client_id]
+        for target in targets:
+            settings[target][name] = value.strip().lower()
+    return settings
@@ -0,0 +1,179 @@
+"""Fleet generation - workflows for many clients in parallel across processes"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from sqlmodel import Session, select
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.module import ClientModule, Module
+from forgeerp.core.engine.github_generator.concurrency import load_concurrency_settings
+from forgeerp.core.engine.github_generator.workflows import GitHubWorkflowGenerator, contained_path
+
+
+# Fleet settings
+FLEET_OUTPUT_DIR = os.getenv("FLEET_OUTPUT_DIR", "/tmp/forgeerp-fleet")
+FLEET_WORKERS = int(os.getenv("FLEET_WORKERS", "0"))  # 0 = one process per CPU
+# spawn: workers never inherit the API's threads and locks (fork would)
+FLEET_START_METHOD = os.getenv("FLEET_START_METHOD", "spawn")
+# Chunks per worker: enough to balance uneven clients, few enough to keep IPC cheap
+FLEET_CHUNKS_PER_WORKER = 4
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+@dataclass
+class FleetReport:
+    """Summary of a fleet generation"""
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    up_to_date: int = 0
+    written: int = 0
+    skipped: int = 0
+    removed: int = 0
+    workers: int = 0
+    elapsed_seconds: float = 0.0
+    output_dir: str = ""
+    errors: Dict[str, str] = field(default_factory=dict)
+    clients: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add(self, result: Dict[str, Any]):
+        """Count one client's result"""
+        self.clients.append(result)
+        if result.get("error"):
+            self.failed += 1
+            self.errors[result["client_code"]] = result["error"]
+            return
+        self.succeeded += 1
+        self.up_to_date += int(result["up_to_date"])
+        self.written += len(result["written"])
+        self.skipped += len(result["skipped"])
+        self.removed += len(result["removed"])
+
+    def to_dict(self, include_clients: bool = False) -> Dict[str, Any]:
+        data = asdict(self)
+        if not include_clients:
+            del data["clients"]
+        return data
+
+
+def load_fleet(
+    session: Session,
+    client_codes: Optional[List[str]] = None,
+    module: Optional[str] = None,
+    include_inactive: bool = False,
+) -> List[Dict[str, Any]]:
+    """Generation inputs for every matching client (three queries for the whole fleet)"""
+    statement = select(Client).order_by(Client.code)
+    if not include_inactive:
+        statement = statement.where(Client.is_active == True)
+    if client_codes:
+        statement = statement.where(Client.code.in_(client_codes))
+    if module:
+        statement = statement.where(
+            Client.id.in_(
+                select(ClientModule.client_id)
+                .join(Module, Module.id == ClientModule.module_id)
+                .where(Module.name == module, ClientModule.is_active == True)
+            )
+        )
+    clients = session.exec(statement).all()
+
+    installed: Dict[int, List[str]] = {client.id: [] for client in clients}
+    if clients:
+        statement = (
+            select(ClientModule.client_id, Module.name)
+            .join(Module, Module.id == ClientModule.module_id)
+            .where(ClientModule.client_id.in_(list(installed)), ClientModule.is_active == True)
+            .order_by(Module.name)
+        )
+        for client_id, module_name in session.exec(statement).all():
+            installed[client_id].append(module_name)
+    concurrency = load_concurrency_settings(session, list(installed))
+
+    return [
+        {
+            "client_id": client.id,
+            "client_code": client.code,
+            "client_data": {
+                "client_name": client.code,
+                "environments": ["dev", "hml", "prod"],
+                "concurrency": concurrency[client.id]
+            },
+            "installed_modules": installed[client.id],
+        }
+        for client in clients
+    ]
+
+
+def generate_client(output_dir: str, item: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate one client's workflows into <output_dir>/<client_code>"""
+    result = {"client_id": item["client_id"], "client_code": item["client_code"]}
+    try:
+        # Client codes come from the database: never let one leave output_dir
+        generator = GitHubWorkflowGenerator(contained_path(Path(output_dir), item["client_code"]))
+        report = generator.generate_workflows_for_client(item["client_data"], item["installed_modules"])
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+        return result
+    result.update(report.to_dict())
+    return result
+
+
+def _generate_chunk(output_dir: str, chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Runs in a worker process; module-level so it can be pickled
+    return [generate_client(output_dir, item) for item in chunk]
+
+
+def _chunks(items: List[Dict[str, Any]], workers: int) -> List[List[Dict[str, Any]]]:
+    size = max(1, -(-len(items) // (workers * FLEET_CHUNKS_PER_WORKER)))
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def generate_fleet(
+    items: List[Dict[str, Any]],
+    output_dir: str = FLEET_OUTPUT_DIR,
+    workers: int = FLEET_WORKERS,
+    progress: Optional[ProgressCallback] = None,
+) -> FleetReport:
+    """Generate workflows for many clients, each into its own tree, on a process pool
+
+    `progress` is called in the calling process after every finished chunk
+    with done/total counts and the chunk's results. workers=1 runs inline.
+    """
+    workers = max(1, min(workers or os.cpu_count() or 1, len(items) or 1))
+    report = FleetReport(total=len(items), workers=workers, output_dir=str(output_dir))
+    started = time.perf_counter()
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    def collect(results: List[Dict[str, Any]]):
+        for result in results:
+            report.add(result)
+        if progress is not None:
+            progress({
+                "done": len(report.clients),
+                "total": report.total,
+                "failed": report.failed,
+                "results": results,
+            })
+
+    if workers == 1:
+        for chunk in _chunks(items, 1):
+            collect(_generate_chunk(str(output_dir), chunk))
+    else:
+        context = multiprocessing.get_context(FLEET_START_METHOD)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(_generate_chunk, str(output_dir), chunk)
+                for chunk in _chunks(items, workers)
+            ]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    return report
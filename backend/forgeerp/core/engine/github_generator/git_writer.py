@@ -0,0 +1,269 @@
+"""Batched git writer - generated trees committed with git plumbing, no working tree"""
+
+import base64
+import hashlib
+import os
+import re
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from forgeerp.core.engine.github_generator.archive import MANIFEST_PATH, generated_paths
+
+
+# Writer settings
+GIT_BINARY = os.getenv("GIT_BINARY", "git")
+GITHUB_GIT_URL = os.getenv("GITHUB_GIT_URL", "https://github.com/{owner}/{repo}.git")
+GIT_MIRROR_DIR = os.getenv("GIT_MIRROR_DIR", "/tmp/forgeerp-mirrors")  # Bare clones, one per repository
+GIT_COMMITTER_NAME = os.getenv("GIT_COMMITTER_NAME", "ForgeERP")
+GIT_COMMITTER_EMAIL = os.getenv("GIT_COMMITTER_EMAIL", "forgeerp@localhost")
+GIT_TIMEOUT_SECONDS = int(os.getenv("GIT_TIMEOUT_SECONDS", "300"))
+# Where each client's tree goes in the repository: "" = repository root (one repo per client,
+# the only place GitHub Actions runs workflows from); "{client_code}/" = one directory per client
+WORKFLOWS_GIT_LAYOUT = os.getenv("WORKFLOWS_GIT_LAYOUT", "")
+
+FILE_MODE = "100644"
+
+# One component of a branch name: no leading "-"/".", no "..", no ".lock"/"." ending, nothing git quotes
+BRANCH_COMPONENT = re.compile(r"[A-Za-z0-9_][A-Za-z0-9._-]*")
+MAX_BRANCH_LENGTH = 255
+
+
+class GitWriterError(RuntimeError):
+    """Raised when a git command fails"""
+
+
+@dataclass
+class CommitResult:
+    """Outcome of a batched commit"""
+
+    branch: str
+    base: str
+    commit: Optional[str] = None  # None = nothing changed, no commit made
+    written: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return self.commit is not None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {**asdict(self), "changed": self.changed}
+
+
+def blob_sha(content: bytes) -> str:
+    """Object id git gives a blob with this content"""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def layout_prefix(client_code: str, layout: str = WORKFLOWS_GIT_LAYOUT) -> str:
+    """Repository directory of a client's tree"""
+    return layout.format(client_code=client_code)
+
+
+def check_branch_name(name: str) -> str:
+    """Return a branch name unchanged, raise ValueError unless it is a plain one
+
+    Branch names end up in refspecs and in the fast-import stream, so only a
+    strict subset of what `git check-ref-format --branch` accepts is allowed.
+    """
+    valid = isinstance(name, str) and 0 < len(name) <= MAX_BRANCH_LENGTH and all(
+        BRANCH_COMPONENT.fullmatch(part) and ".." not in part and not part.endswith((".", ".lock"))
+        for part in name.split("/")
+    )
+    if not valid:
+        raise ValueError(f"Invalid branch name: {name!r}")
+    return name
+
+
+def _check_path(path: str):
+    # fast-import takes paths unquoted; refuse anything that would need quoting or escape the tree
+    parts = path.split("/")
+    if not path or path.startswith(("/", '"')) or "\n" in path or any(part in ("", ".", "..") for part in parts):
+        raise ValueError(f"Invalid repository path: {path!r}")
+
+
+class GitBatchWriter:
+    """Commits many generated files to a branch of a bare repository in one commit
+
+    Blobs and trees are written by `git fast-import` straight into the object
+    store on top of the base commit's tree, so there is no checkout, index or
+    per-file process: one client or the whole fleet is a single commit and a
+    handful of git invocations. Files already identical in the base are left
+    out, and files the old generation manifest lists but the new one no
+    longer produces are deleted.
+    """
+
+    def __init__(self, repo_path: Path, git_binary: str = GIT_BINARY, timeout: int = GIT_TIMEOUT_SECONDS):
+        self.repo_path = Path(repo_path)
+        self.git_binary = git_binary
+        self.timeout = timeout
+
+    def _git(
+        self,
+        *args: str,
+        input: Optional[bytes] = None,
+        env: Optional[Dict[str, str]] = None,
+        check: bool = True,
+    ) -> subprocess.CompletedProcess:
+        result = subprocess.run(
+            [self.git_binary, "--git-dir", str(self.repo_path), *args],
+            input=input,
+            capture_output=True,
+            timeout=self.timeout,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0", **(env or {})},
+        )
+        if check and result.returncode != 0:
+            raise GitWriterError(f"git {args[0]} failed: {result.stderr.decode(errors='replace').strip()}")
+        return result
+
+    @staticmethod
+    def auth_env(token: Optional[str]) -> Dict[str, str]:
+        """Environment passing a GitHub token as an HTTP header (kept out of argv and remotes)"""
+        if not token:
+            return {}
+        credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        return {
+            "GIT_CONFIG_COUNT": "1",
+            "GIT_CONFIG_KEY_0": "http.extraHeader",
+            "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+        }
+
+    def init(self):
+        """Create an empty bare repository if there is none"""
+        if not (self.repo_path / "HEAD").exists():
+            self.repo_path.mkdir(parents=True, exist_ok=True)
+            self._git("init", "--bare", "--quiet")
+
+    def fetch(self, remote_url: str, branch: str, token: Optional[str] = None):
+        """Bring the bare mirror's branch up to date (blobs are fetched, never checked out)"""
+        check_branch_name(branch)
+        self.init()
+        self._git(
+            "fetch", "--quiet", "--no-tags", remote_url, f"+refs/heads/{branch}:refs/heads/{branch}",
+            env=self.auth_env(token)
+        )
+
+    def push(self, remote_url: str, branch: str, token: Optional[str] = None):
+        """Push a branch (regenerated branches are replaced)"""
+        check_branch_name(branch)
+        self._git(
+            "push", "--quiet", "--force", remote_url, f"refs/heads/{branch}:refs/heads/{branch}",
+            env=self.auth_env(token)
+        )
+
+    def resolve(self, ref: str) -> Optional[str]:
+        """Commit id of a ref, None when it does not exist"""
+        result = self._git("rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}", check=False)
+        return result.stdout.decode().strip() if result.returncode == 0 else None
+
+    def _base_blobs(self, base: str, prefixes: List[str]) -> Dict[str, str]:
+        # path -> blob id for everything under the touched directories, in one ls-tree
+        pathspecs = sorted({prefix.rstrip("/") for prefix in prefixes if prefix}) if all(prefixes) else []
+        output = self._git("ls-tree", "-r", "-z", "--full-tree", base, "--", *pathspecs).stdout
+        blobs = {}
+        for entry in output.split(b"\0"):
+            if entry:
+                meta, path = entry.split(b"\t", 1)
+                _, kind, sha = meta.split()
+                if kind == b"blob":
+                    blobs[path.decode()] = sha.decode()
+        return blobs
+
+    def _read_blobs(self, shas: List[str]) -> List[bytes]:
+        # Contents of several blobs from one cat-file process
+        if not shas:
+            return []
+        output = self._git("cat-file", "--batch", input="".join(f"{sha}\n" for sha in shas).encode()).stdout
+        contents, position = [], 0
+        for _ in shas:
+            header_end = output.index(b"\n", position)
+            size = int(output[position:header_end].split()[2])
+            contents.append(output[header_end + 1:header_end + 1 + size])
+            position = header_end + 1 + size + 1
+        return contents
+
+    def _stale_files(self, base_blobs: Dict[str, str], trees: Dict[str, Dict[str, str]]) -> List[str]:
+        # Files the base's manifests list that the new trees no longer generate
+        manifests = [
+            (prefix, f"{prefix}{MANIFEST_PATH}") for prefix in trees
+            if f"{prefix}{MANIFEST_PATH}" in base_blobs
+        ]
+        contents = self._read_blobs([base_blobs[path] for _, path in manifests])
+        stale = []
+        for (prefix, _), content in zip(manifests, contents):
+            for relative in generated_paths(content.decode("utf-8", errors="replace")):
+                path = f"{prefix}{relative}"
+                if path in base_blobs and relative not in trees[prefix]:
+                    try:
+                        _check_path(path)
+                    except ValueError:
+                        continue
+                    stale.append(path)
+        return sorted(stale)
+
+    def commit_trees(
+        self,
+        trees: Dict[str, Dict[str, str]],
+        branch: str,
+        message: str,
+        base: str = "main",
+        author: Optional[Tuple[str, str]] = None,
+    ) -> CommitResult:
+        """Commit generated trees (prefix -> path -> content) as one commit on `branch`
+
+        The branch is (re)created from `base`. When no file differs from the
+        base nothing is committed and the result has no commit id.
+        """
+        check_branch_name(branch)
+        check_branch_name(base)
+        for prefix, tree in trees.items():
+            for path in tree:
+                _check_path(f"{prefix}{path}")
+        base_commit = self.resolve(base)
+        if base_commit is None:
+            raise GitWriterError(f"Base ref not found: {base}")
+        result = CommitResult(branch=branch, base=base_commit)
+
+        base_blobs = self._base_blobs(base_commit, list(trees))
+        changes: List[Tuple[str, bytes]] = []
+        for prefix, tree in sorted(trees.items()):
+            for path, content in sorted(tree.items()):
+                full_path = f"{prefix}{path}"
+                data = content.encode()
+                if base_blobs.get(full_path) == blob_sha(data):
+                    result.unchanged += 1
+                    continue
+                changes.append((full_path, data))
+        result.removed = self._stale_files(base_blobs, trees)
+        result.written = [path for path, _ in changes]
+        if not changes and not result.removed:
+            return result
+
+        name, email = author or (GIT_COMMITTER_NAME, GIT_COMMITTER_EMAIL)
+        identity = f"{name} <{email}> {int(time.time())} +0000"
+        message_bytes = message.encode()
+        stream = [
+            f"commit refs/heads/{branch}\n".encode(),
+            f"author {identity}\ncommitter {identity}\n".encode(),
+            b"data %d\n" % len(message_bytes), message_bytes, b"\n",
+            f"from {base_commit}\n".encode(),
+        ]
+        for path in result.removed:
+            stream.append(f"D {path}\n".encode())
+        for path, data in changes:
+            stream.append(f"M {FILE_MODE} inline {path}\n".encode())
+            stream.extend((b"data %d\n" % len(data), data, b"\n"))
+        stream.append(b"done\n")
+
+        # --force: a regenerated branch replaces the previous one
+        self._git("fast-import", "--quiet", "--force", "--done", input=b"".join(stream))
+        result.commit = self.resolve(f"refs/heads/{branch}")
+        return result
+
+
+def mirror_path(owner: str, repo: str, mirrors_dir: str = GIT_MIRROR_DIR) -> Path:
+    """Bare mirror directory of a GitHub repository"""
+    return Path(mirrors_dir) / owner / f"{repo}.git"
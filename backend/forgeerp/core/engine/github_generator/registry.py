@@ -0,0 +1,153 @@
+"""Template registry - one jinja2 Environment with compiled and bytecode caches"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from jinja2 import (
+    BaseLoader,
+    ChoiceLoader,
+    DictLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    PrefixLoader,
+    Template,
+)
+from forgeerp.core.engine.github_generator.templates import BUILTIN_TEMPLATES
+
+
+# Registry settings
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "400"))  # Compiled templates kept in memory
+TEMPLATE_BYTECODE_CACHE_DIR = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR") or None  # None = per-user temp dir
+TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"  # Dev only: recheck files
+WORKFLOW_TEMPLATES_DIR = os.getenv("WORKFLOW_TEMPLATES_DIR") or None  # Files here override the built-ins
+
+ADDONS_DIR = Path(__file__).resolve().parents[4] / "addons"
+
+# Templates shipped by an addon live in addons/<addon>/templates and are named "<addon>/<file>"
+ADDON_TEMPLATES_DIR = "templates"
+
+
+class TemplateRegistry:
+    """Workflow templates compiled once per process
+
+    Templates are looked up in WORKFLOW_TEMPLATES_DIR, then in addon template
+    directories ("<addon>/<file>"), then in the built-in strings of
+    templates.py. Compiled templates stay in the Environment's cache and their
+    bytecode is stored on disk, so a new worker process skips compilation too.
+    Source files are only checked for changes with auto_reload (development).
+    """
+
+    def __init__(
+        self,
+        templates_dir: Optional[str] = WORKFLOW_TEMPLATES_DIR,
+        addons_dir: Optional[Path] = ADDONS_DIR,
+        bytecode_cache_dir: Optional[str] = TEMPLATE_BYTECODE_CACHE_DIR,
+        auto_reload: bool = TEMPLATE_AUTO_RELOAD,
+        cache_size: int = TEMPLATE_CACHE_SIZE,
+    ):
+        self.templates_dir = Path(templates_dir) if templates_dir else None
+        self.addons_dir = Path(addons_dir) if addons_dir else None
+        self.auto_reload = auto_reload
+        self.cache_size = cache_size
+        if bytecode_cache_dir:
+            Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+        self.environment = Environment(
+            loader=self._build_loader(),
+            bytecode_cache=FileSystemBytecodeCache(bytecode_cache_dir),
+            auto_reload=auto_reload,
+            cache_size=cache_size,
+            autoescape=False,  # YAML, not HTML
+        )
+        self._strings: "OrderedDict[str, Template]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._digest: Optional[str] = None
+        self.string_hits = 0
+        self.string_misses = 0
+
+    def _addon_template_dirs(self) -> Dict[str, Path]:
+        if self.addons_dir is None or not self.addons_dir.is_dir():
+            return {}
+        return {
+            item.name: item / ADDON_TEMPLATES_DIR
+            for item in sorted(self.addons_dir.iterdir())
+            if (item / ADDON_TEMPLATES_DIR).is_dir()
+        }
+
+    def _build_loader(self) -> BaseLoader:
+        loaders: List[BaseLoader] = []
+        if self.templates_dir is not None:
+            loaders.append(FileSystemLoader(str(self.templates_dir)))
+        addons = self._addon_template_dirs()
+        if addons:
+            loaders.append(PrefixLoader({name: FileSystemLoader(str(path)) for name, path in addons.items()}))
+        loaders.append(DictLoader(BUILTIN_TEMPLATES))
+        return ChoiceLoader(loaders)
+
+    def get_template(self, name: str) -> Template:
+        """Compiled template by name (raises jinja2.TemplateNotFound)"""
+        return self.environment.get_template(name)
+
+    def render(self, name: str, **context: Any) -> str:
+        """Render a registered template"""
+        return self.get_template(name).render(**context)
+
+    def render_string(self, source: str, **context: Any) -> str:
+        """Render an ad-hoc template source, compiled once per distinct source"""
+        key = hashlib.sha256(source.encode()).hexdigest()
+        with self._lock:
+            template = self._strings.get(key)
+            if template is not None:
+                self._strings.move_to_end(key)
+                self.string_hits += 1
+        if template is None:
+            template = self.environment.from_string(source)
+            with self._lock:
+                self.string_misses += 1
+                self._strings[key] = template
+                while len(self._strings) > self.cache_size:
+                    self._strings.popitem(last=False)
+        return template.render(**context)
+
+    def list_templates(self) -> List[str]:
+        """Names of every template the registry can load"""
+        return self.environment.list_templates()
+
+    def digest(self) -> str:
+        """Hash of every template source (changes when any template changes)"""
+        if self._digest is not None and not self.auto_reload:
+            return self._digest
+        sha = hashlib.sha256()
+        for name in self.list_templates():
+            source, _, _ = self.environment.loader.get_source(self.environment, name)
+            sha.update(name.encode() + b"\0" + source.encode() + b"\0")
+        self._digest = sha.hexdigest()
+        return self._digest
+
+    def clear(self):
+        """Drop compiled templates (the bytecode cache on disk is kept)"""
+        self.environment.cache.clear()
+        with self._lock:
+            self._strings.clear()
+            self._digest = None
+            self.string_hits = self.string_misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Compiled template counts and ad-hoc template hit rate"""
+        with self._lock:
+            lookups = self.string_hits + self.string_misses
+            return {
+                "compiled": len(self.environment.cache),
+                "strings_compiled": len(self._strings),
+                "string_hits": self.string_hits,
+                "string_misses": self.string_misses,
+                "string_hit_rate": self.string_hits / lookups if lookups else 0.0,
+                "auto_reload": self.auto_reload,
+                "cache_size": self.cache_size,
+            }
+
+
+template_registry = TemplateRegistry()
@@ -30,8 +30,8 @@ jobs:
       
       - name: Setup Client
         run: |
-          echo "Setting up client ${{ inputs.client_name }}"
-          echo "Environment: ${{ inputs.environment }}"
+          echo "Setting up client {% raw %}${{ inputs.client_name }}{% endraw %}"
+          echo "Environment: {% raw %}${{ inputs.environment }}{% endraw %}"
           # TODO: Add actual setup steps based on installed modules
 """
 
@@ -68,8 +68,8 @@ jobs:
       
       - name: Deploy
         run: |
-          echo "Deploying client ${{ inputs.client_name }}"
-          echo "Environment: ${{ inputs.environment }}"
+          echo "Deploying client {% raw %}${{ inputs.client_name }}{% endraw %}"
+          echo "Environment: {% raw %}${{ inputs.environment }}{% endraw %}"
           # TODO: Add actual deploy steps based on installed modules
 """
 
@@ -89,7 +89,11 @@ on:
           - restore
           - rebuild
 
-jobs:
+{% if concurrency %}concurrency:
+  group: {{ concurrency.group | tojson }}
+  cancel-in-progress: {{ concurrency["cancel-in-progress"] | lower }}
+
+{% endif %}jobs:
   disaster-recovery:
     runs-on: ubuntu-latest
     steps:
@@ -98,7 +102,7 @@ jobs:
       
       - name: Disaster Recovery
         run: |
-          echo "Executing disaster recovery: ${{ inputs.action }}"
+          echo "Executing disaster recovery: {% raw %}${{ inputs.action }}{% endraw %}"
           # TODO: Add actual disaster recovery steps
 """
 
@@ -111,7 +115,11 @@ on:
     - cron: '0 2 * * *'  # Daily at 2 AM
   workflow_dispatch:
 
-jobs:
+{% if concurrency %}concurrency:
+  group: {{ concurrency.group | tojson }}
+  cancel-in-progress: {{ concurrency["cancel-in-progress"] | lower }}
+
+{% endif %}jobs:
   diagnose:
     runs-on: ubuntu-latest
     steps:
@@ -137,7 +145,11 @@ on:
         type: boolean
         default: false
 
-jobs:
+{% if concurrency %}concurrency:
+  group: {{ concurrency.group | tojson }}
+  cancel-in-progress: {{ concurrency["cancel-in-progress"] | lower }}
+
+{% endif %}jobs:
   fix:
     runs-on: ubuntu-latest
     steps:
@@ -150,3 +162,12 @@ jobs:
           # TODO: Add actual fix steps
 """
 
+
+# Templates embutidos, por nome no registro (podem ser sobrescritos por arquivos)
+BUILTIN_TEMPLATES = {
+    "setup-client.yml.j2": SETUP_CLIENT_WORKFLOW_TEMPLATE,
+    "deploy-client.yml.j2": DEPLOY_CLIENT_WORKFLOW_TEMPLATE,
+    "disaster-recovery.yml.j2": DISASTER_RECOVERY_WORKFLOW_TEMPLATE,
+    "diagnose-services.yml.j2": DIAGNOSE_SERVICES_WORKFLOW_TEMPLATE,
+    "fix-common-issues.yml.j2": FIX_COMMON_ISSUES_WORKFLOW_TEMPLATE,
+}
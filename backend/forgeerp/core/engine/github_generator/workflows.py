@@ -1,49 +1,337 @@
 """GitHub Workflows generator"""
 
+import hashlib
+import os
+import re
+import tempfile
 import yaml
 import json
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-from jinja2 import Template
-from forgeerp.core.engine.github_generator.templates import (
-    SETUP_CLIENT_WORKFLOW_TEMPLATE,
-    DEPLOY_CLIENT_WORKFLOW_TEMPLATE,
-    DISASTER_RECOVERY_WORKFLOW_TEMPLATE,
-    DIAGNOSE_SERVICES_WORKFLOW_TEMPLATE,
-    FIX_COMMON_ISSUES_WORKFLOW_TEMPLATE,
+from forgeerp.core.engine.github_generator.caching import cache_steps, module_cache_specs
+from forgeerp.core.engine.github_generator.concurrency import (
+    DEPLOY_POLICY_PATH,
+    concurrency_block,
+    concurrency_policy,
+    deploy_concurrency,
+    deploy_policy,
 )
+from forgeerp.core.engine.github_generator.registry import TemplateRegistry, template_registry
+from forgeerp.core.services.module_loader import ModuleLoader
+
+
+# Generation manifest (inputs hash -> output hashes), kept next to the workflows directory
+MANIFEST_NAME = ".forgeerp-workflows.json"
+
+# A client's directory under clients/ (one path component, nothing to resolve)
+CLIENT_DIR_NAME = re.compile(r"[A-Za-z0-9_][A-Za-z0-9._-]*")
+
+# The generator source is part of the inputs: editing it invalidates every manifest
+GENERATOR_DIGEST = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+# Deploy matrix defaults (overridable per client through client_data)
+DEPLOY_MAX_PARALLEL = int(os.getenv("DEPLOY_MAX_PARALLEL", "4"))
+DEPLOY_FAIL_FAST = os.getenv("DEPLOY_FAIL_FAST", "false").lower() == "true"
+
+# Changed clients/<client>/values-<environment>.yaml -> {"include": [{client, environment, cancel}, ...]}
+# `cancel` comes from clients/<client>/deploy-concurrency.json, DEFAULT_POLICY when it is missing
+DEPLOY_CHANGES_SCRIPT = """set -euo pipefail
+if [ "$EVENT_NAME" = "workflow_dispatch" ]; then
+  files=$(git ls-files "clients/${INPUT_CLIENT:-*}/values-${INPUT_ENVIRONMENT:-*}.yaml")
+elif [ -z "$BEFORE" ] || [ -z "${BEFORE//0/}" ]; then
+  files=$(git diff-tree --no-commit-id --name-only -r "$SHA")
+else
+  git fetch --quiet --depth=1 origin "$BEFORE"
+  files=$(git diff --name-only "$BEFORE" "$SHA")
+fi
+pairs=$(printf '%s\\n' "$files" | sed -nE 's#^clients/([^/]+)/values-([^/]+)\\.yaml$#\\1 \\2#p' | sort -u)
+matrix=$(while read -r client environment; do
+  [ -n "$client" ] || continue
+  policy=$(cat "clients/$client/deploy-concurrency.json" 2>/dev/null || printf '%s' "$DEFAULT_POLICY")
+  jq -nc --arg client "$client" --arg environment "$environment" --argjson policy "$policy" \\
+    '{client: $client, environment: $environment, cancel: (
+      if ($policy.cancel | index($environment)) then true
+      elif ($policy.queue | index($environment)) then false
+      else $policy.default end)}'
+done <<< "$pairs" | jq -sc '{include: .}')
+echo "matrix=$matrix" >> "$GITHUB_OUTPUT"
+echo "any=$(jq -r '.include | length > 0' <<< "$matrix")" >> "$GITHUB_OUTPUT"
+"""
+
+
+class WorkflowDumper(yaml.Dumper):
+    """YAML dumper writing multi-line strings (scripts) as literal blocks"""
+
+
+def _represent_str(dumper: yaml.Dumper, value: str):
+    style = "|" if "\n" in value else None
+    return dumper.represent_scalar("tag:yaml.org,2002:str", value, style=style)
+
+
+WorkflowDumper.add_representer(str, _represent_str)
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of a workflow's text"""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def inputs_hash(
+    client_data: Dict[str, Any],
+    installed_modules: List[str],
+    registry: TemplateRegistry = template_registry,
+    modules: Optional[Dict[str, Any]] = None
+) -> str:
+    """Hash of everything a client's generated workflows depend on
+    
+    `modules` carries what the installed modules' manifests contribute
+    (cache specs), so a manifest edit regenerates the workflows.
+    """
+    inputs = {
+        "client_data": client_data,
+        "installed_modules": sorted(installed_modules),
+        "modules": modules or {},
+        "generator": GENERATOR_DIGEST,
+        "templates": registry.digest(),
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def generation_manifest(digest: str, outputs: Dict[str, str], files: Dict[str, str]) -> str:
+    """Manifest content: inputs hash, workflow hashes and other generated files' hashes"""
+    return json.dumps({
+        "inputs_hash": digest,
+        "outputs": {name: content_hash(content) for name, content in sorted(outputs.items())},
+        "files": {path: content_hash(content) for path, content in sorted(files.items())},
+    }, indent=2) + "\n"
+
+
+def contained_path(base: Path, relative: str) -> Path:
+    """`base / relative` resolved, refusing anything that is not strictly inside base"""
+    base = Path(base).resolve()
+    path = (base / relative).resolve()
+    if base not in path.parents:
+        raise ValueError(f"Path escapes {base}: {relative!r}")
+    return path
+
+
+def write_atomic(path: Path, content: str):
+    """Write through a temporary file in the same directory and rename it into place"""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@dataclass
+class GenerationReport:
+    """Files written, left untouched and removed by one generation"""
+    
+    workflows: List[str] = field(default_factory=list)
+    written: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    up_to_date: bool = False  # Inputs unchanged, nothing was rendered
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
 
 
 class GitHubWorkflowGenerator:
-    """Generator for GitHub Actions workflows"""
+    """Generator for GitHub Actions workflows
     
-    def __init__(self, repo_dir: Path):
-        self.repo_dir = Path(repo_dir)
-        self.workflows_dir = self.repo_dir / ".github" / "workflows"
-        self.workflows_dir.mkdir(parents=True, exist_ok=True)
+    Files are only rewritten when their content changes (atomically), and a
+    manifest of the last generation turns an unchanged regeneration into a
+    no-op. Without a repo_dir the generator only renders (see archive.py).
+    """
     
-    def generate_workflow(self, workflow_name: str, workflow_data: Dict[str, Any]):
-        """Generate a workflow from data dictionary"""
-        workflow_path = self.workflows_dir / workflow_name
+    def __init__(
+        self,
+        repo_dir: Optional[Path] = None,
+        registry: TemplateRegistry = template_registry,
+        module_loader: Optional[ModuleLoader] = None
+    ):
+        self.registry = registry
+        self.module_loader = module_loader or ModuleLoader()
+        self.repo_dir = Path(repo_dir) if repo_dir is not None else None
+        if self.repo_dir is not None:
+            self.workflows_dir = self.repo_dir / ".github" / "workflows"
+            self.manifest_path = self.repo_dir / ".github" / MANIFEST_NAME
+            self.workflows_dir.mkdir(parents=True, exist_ok=True)
+    
+    def write_workflow(self, workflow_name: str, content: str) -> bool:
+        """Write a workflow file unless it already has this content, returns whether it was written"""
+        if self.repo_dir is None:
+            raise ValueError("Generator has no repo_dir (render-only)")
+        return self._write_if_changed(self.workflows_dir / workflow_name, content)
+    
+    @staticmethod
+    def _write_if_changed(path: Path, content: str) -> bool:
+        try:
+            if content_hash(path.read_text()) == content_hash(content):
+                return False
+        except FileNotFoundError:
+            path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(workflow_path, "w") as f:
-            yaml.dump(workflow_data, f, default_flow_style=False, sort_keys=False)
+        write_atomic(path, content)
+        return True
     
-    def generate_workflow_from_template(self, workflow_name: str, template: str, context: Dict[str, Any]):
+    @staticmethod
+    def render_workflow(workflow_data: Dict[str, Any]) -> str:
+        """Render a workflow data dictionary as YAML"""
+        # No line wrapping: long ${{ }} expressions stay on one line
+        return yaml.dump(workflow_data, Dumper=WorkflowDumper, default_flow_style=False, sort_keys=False, width=4096)
+    
+    def generate_workflow(self, workflow_name: str, workflow_data: Dict[str, Any]) -> bool:
+        """Generate a workflow from data dictionary"""
+        return self.write_workflow(workflow_name, self.render_workflow(workflow_data))
+    
+    def generate_workflow_from_template(self, workflow_name: str, template: str, context: Dict[str, Any]) -> bool:
         """Generate a workflow from Jinja2 template"""
-        workflow_path = self.workflows_dir / workflow_name
+        return self.write_workflow(workflow_name, self.registry.render_string(template, **context))
+    
+    def render_workflows_for_client(
+        self,
+        client_data: Dict[str, Any],
+        installed_modules: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """Render all workflows for a client based on installed modules (file name -> content)"""
+        installed_modules = installed_modules or []
+        
+        # Always generate setup and deploy workflows
+        outputs = {
+            "setup-client.yml": self.render_workflow(self.setup_client_workflow_data(client_data, installed_modules)),
+            "deploy-client.yml": self.render_workflow(self.deploy_client_workflow_data(client_data, installed_modules)),
+        }
         
-        jinja_template = Template(template)
-        workflow_content = jinja_template.render(**context)
+        # Generate workflows based on installed modules
+        if "hetzner" in installed_modules:
+            outputs["disaster-recovery.yml"] = self.render_disaster_recovery_workflow(client_data)
         
-        with open(workflow_path, "w") as f:
-            f.write(workflow_content)
+        # Always generate diagnosis and fix workflows
+        outputs["diagnose-services.yml"] = self.render_diagnose_services_workflow(client_data)
+        outputs["fix-common-issues.yml"] = self.render_fix_common_issues_workflow(client_data)
+        return outputs
     
-    def generate_setup_client_workflow(self, client_data: Dict[str, Any]):
-        """Generate setup-client.yml workflow"""
-        workflow_name = "setup-client.yml"
+    @staticmethod
+    def deploy_policy_files(client_data: Dict[str, Any]) -> Dict[str, str]:
+        """Client files read by the shared deploy workflow (repository path -> content)"""
+        client = client_data.get("client_name", "client")
+        if not isinstance(client, str) or not CLIENT_DIR_NAME.fullmatch(client):
+            raise ValueError(f"Invalid client directory name: {client!r}")
+        path = DEPLOY_POLICY_PATH.format(client=client)
+        return {path: json.dumps(deploy_policy(client_data), indent=2) + "\n"}
+    
+    def cache_specs(self, installed_modules: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Cache specs contributed by the installed modules' manifests"""
+        return module_cache_specs(installed_modules or [], self.module_loader.load_module_manifest)
+    
+    def inputs_hash(self, client_data: Dict[str, Any], installed_modules: Optional[List[str]] = None) -> str:
+        """Hash of this generator's inputs for a client (see inputs_hash)"""
+        installed_modules = installed_modules or []
+        modules = {"caches": self.cache_specs(installed_modules)}
+        return inputs_hash(client_data, installed_modules, self.registry, modules)
+    
+    def _with_caches(
+        self,
+        steps: List[Dict[str, Any]],
+        workflow: str,
+        client_data: Dict[str, Any],
+        installed_modules: Optional[List[str]]
+    ) -> List[Dict[str, Any]]:
+        # checkout, cache restores, the job's own steps, cache saves
+        restore, save = cache_steps(self.cache_specs(installed_modules), workflow, client_data.get("client_name", "client"))
+        return steps[:1] + restore + steps[1:] + save
+    
+    def load_manifest(self) -> Dict[str, Any]:
+        """Manifest of the last generation ({} if missing or unreadable)"""
+        try:
+            return json.loads(self.manifest_path.read_text())
+        except (FileNotFoundError, ValueError):
+            return {}
+    
+    def _outputs_match(self, outputs: Dict[str, str], files: Dict[str, str]) -> bool:
+        paths = [(self.workflows_dir / name, digest) for name, digest in outputs.items()]
+        paths += [(contained_path(self.repo_dir, path), digest) for path, digest in files.items()]
+        for path, digest in paths:
+            try:
+                if content_hash(path.read_text()) != digest:
+                    return False
+            except FileNotFoundError:
+                return False
+        return True
+    
+    def generate_workflows_for_client(
+        self,
+        client_data: Dict[str, Any],
+        installed_modules: Optional[List[str]] = None
+    ) -> GenerationReport:
+        """Generate all workflows for a client, touching only files whose content changed"""
+        if self.repo_dir is None:
+            raise ValueError("Generator has no repo_dir (render-only)")
+        installed_modules = installed_modules or []
+        digest = self.inputs_hash(client_data, installed_modules)
+        manifest = self.load_manifest()
+        previous = manifest.get("outputs", {})
+        previous_files = manifest.get("files", {})
+        
+        # Same inputs and the files on disk are still ours: nothing to render
+        if manifest.get("inputs_hash") == digest and self._outputs_match(previous, previous_files):
+            return GenerationReport(workflows=sorted(previous), skipped=sorted(previous), up_to_date=True)
         
-        workflow_data = {
+        report = GenerationReport()
+        outputs = self.render_workflows_for_client(client_data, installed_modules)
+        for workflow_name, content in outputs.items():
+            if self.write_workflow(workflow_name, content):
+                report.written.append(workflow_name)
+            else:
+                report.skipped.append(workflow_name)
+        
+        files = self.deploy_policy_files(client_data)
+        for path, content in files.items():
+            self._write_if_changed(contained_path(self.repo_dir, path), content)
+        
+        # Only files recorded by a previous generation are ours to remove
+        for workflow_name in sorted(set(previous) - set(outputs)):
+            try:
+                (self.workflows_dir / workflow_name).unlink()
+                report.removed.append(workflow_name)
+            except FileNotFoundError:
+                pass
+        for path in sorted(set(previous_files) - set(files)):
+            try:
+                contained_path(self.repo_dir, path).unlink()
+            except (FileNotFoundError, ValueError):
+                pass
+        
+        report.workflows = sorted(outputs)
+        write_atomic(self.manifest_path, generation_manifest(digest, outputs, files))
+        return report
+    
+    @staticmethod
+    def workflow_concurrency(
+        client_data: Dict[str, Any],
+        workflow: str,
+        scope: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        """`concurrency:` of a client's workflow from its policy (None = no group)"""
+        policy = concurrency_policy(client_data, workflow)
+        return concurrency_block(policy, f"{workflow}-{client_data.get('client_name', 'client')}", scope)
+    
+    def setup_client_workflow_data(
+        self,
+        client_data: Dict[str, Any],
+        installed_modules: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Workflow data for setup-client.yml"""
+        workflow = {
             "name": "Setup Client",
             "on": {
                 "workflow_dispatch": {
@@ -65,91 +353,143 @@ class GitHubWorkflowGenerator:
             "jobs": {
                 "setup": {
                     "runs-on": "ubuntu-latest",
-                    "steps": [
+                    "steps": self._with_caches([
                         {"uses": "actions/checkout@v4"},
                         {"name": "Setup Client", "run": "echo 'Setting up client'"}
-                    ]
+                    ], "setup-client", client_data, installed_modules)
                 }
             }
         }
-        
-        self.generate_workflow(workflow_name, workflow_data)
+        concurrency = self.workflow_concurrency(client_data, "setup-client", "${{ inputs.environment }}")
+        if concurrency:
+            workflow = {"name": workflow["name"], "on": workflow["on"], "concurrency": concurrency, "jobs": workflow["jobs"]}
+        return workflow
     
-    def generate_deploy_client_workflow(self, client_data: Dict[str, Any]):
-        """Generate deploy-client.yml workflow"""
-        workflow_name = "deploy-client.yml"
+    def generate_setup_client_workflow(
+        self,
+        client_data: Dict[str, Any],
+        installed_modules: Optional[List[str]] = None
+    ) -> bool:
+        """Generate setup-client.yml workflow"""
+        return self.generate_workflow("setup-client.yml", self.setup_client_workflow_data(client_data, installed_modules))
+    
+    def deploy_client_workflow_data(
+        self,
+        client_data: Dict[str, Any],
+        installed_modules: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Workflow data for deploy-client.yml
         
-        workflow_data = {
+        A `changes` job turns the pushed values-*.yaml files (or the dispatch
+        inputs) into client/environment pairs and `deploy` fans out over only
+        those, so one values change deploys one client/environment.
+        """
+        return {
             "name": "Deploy Client",
             "on": {
                 "push": {
                     "paths": ["clients/**/values-*.yaml"]
                 },
-                "workflow_dispatch": {}
+                "workflow_dispatch": {
+                    "inputs": {
+                        "client": {
+                            "description": "Client (empty = all)",
+                            "required": False,
+                            "type": "string"
+                        },
+                        "environment": {
+                            "description": "Environment (empty = all)",
+                            "required": False,
+                            "type": "string"
+                        }
+                    }
+                }
             },
             "jobs": {
-                "deploy": {
+                "changes": {
                     "runs-on": "ubuntu-latest",
+                    "outputs": {
+                        "matrix": "${{ steps.matrix.outputs.matrix }}",
+                        "any": "${{ steps.matrix.outputs.any }}"
+                    },
                     "steps": [
-                        {"uses": "actions/checkout@v4"},
-                        {"name": "Deploy", "run": "echo 'Deploying client'"}
+                        {"uses": "actions/checkout@v4", "with": {"fetch-depth": 2}},
+                        {
+                            "name": "Changed clients and environments",
+                            "id": "matrix",
+                            "env": {
+                                "EVENT_NAME": "${{ github.event_name }}",
+                                "BEFORE": "${{ github.event.before }}",
+                                "SHA": "${{ github.sha }}",
+                                "INPUT_CLIENT": "${{ inputs.client }}",
+                                "INPUT_ENVIRONMENT": "${{ inputs.environment }}",
+                                "DEFAULT_POLICY": json.dumps(deploy_policy({}), separators=(",", ":"))
+                            },
+                            "run": DEPLOY_CHANGES_SCRIPT
+                        }
                     ]
+                },
+                "deploy": {
+                    "needs": "changes",
+                    "if": "needs.changes.outputs.any == 'true'",
+                    "name": "deploy ${{ matrix.client }}/${{ matrix.environment }}",
+                    "runs-on": "ubuntu-latest",
+                    "environment": "${{ matrix.environment }}",
+                    "concurrency": deploy_concurrency(),
+                    "strategy": {
+                        "matrix": "${{ fromJSON(needs.changes.outputs.matrix) }}",
+                        "max-parallel": int(client_data.get("deploy_max_parallel", DEPLOY_MAX_PARALLEL)),
+                        "fail-fast": bool(client_data.get("deploy_fail_fast", DEPLOY_FAIL_FAST))
+                    },
+                    "steps": self._with_caches([
+                        {"uses": "actions/checkout@v4"},
+                        {
+                            "name": "Deploy",
+                            "env": {
+                                "CLIENT": "${{ matrix.client }}",
+                                "ENVIRONMENT": "${{ matrix.environment }}"
+                            },
+                            "run": "echo \"Deploying $CLIENT to $ENVIRONMENT (clients/$CLIENT/values-$ENVIRONMENT.yaml)\""
+                        }
+                    ], "deploy-client", client_data, installed_modules)
                 }
             }
         }
-        
-        self.generate_workflow(workflow_name, workflow_data)
     
-    def generate_workflows_for_client(
+    def generate_deploy_client_workflow(
         self,
         client_data: Dict[str, Any],
         installed_modules: Optional[List[str]] = None
-    ):
-        """Generate all workflows for a client based on installed modules"""
-        installed_modules = installed_modules or []
-        
-        # Always generate setup and deploy workflows
-        self.generate_setup_client_workflow(client_data)
-        self.generate_deploy_client_workflow(client_data)
-        
-        # Generate workflows based on installed modules
-        if "hetzner" in installed_modules:
-            self.generate_disaster_recovery_workflow()
-        
-        # Always generate diagnosis and fix workflows
-        self.generate_diagnose_services_workflow()
-        self.generate_fix_common_issues_workflow()
+    ) -> bool:
+        """Generate deploy-client.yml workflow"""
+        return self.generate_workflow("deploy-client.yml", self.deploy_client_workflow_data(client_data, installed_modules))
     
-    def generate_disaster_recovery_workflow(self):
+    def render_disaster_recovery_workflow(self, client_data: Optional[Dict[str, Any]] = None) -> str:
+        """Render disaster-recovery.yml"""
+        concurrency = self.workflow_concurrency(client_data or {}, "disaster-recovery", "${{ inputs.action }}")
+        return self.registry.render("disaster-recovery.yml.j2", concurrency=concurrency)
+    
+    def render_diagnose_services_workflow(self, client_data: Optional[Dict[str, Any]] = None) -> str:
+        """Render diagnose-services.yml"""
+        concurrency = self.workflow_concurrency(client_data or {}, "diagnose-services")
+        return self.registry.render("diagnose-services.yml.j2", concurrency=concurrency)
+    
+    def render_fix_common_issues_workflow(self, client_data: Optional[Dict[str, Any]] = None) -> str:
+        """Render fix-common-issues.yml"""
+        concurrency = self.workflow_concurrency(client_data or {}, "fix-common-issues")
+        return self.registry.render("fix-common-issues.yml.j2", concurrency=concurrency)
+    
+    def generate_disaster_recovery_workflow(self, client_data: Optional[Dict[str, Any]] = None) -> bool:
         """Generate disaster-recovery.yml workflow"""
-        workflow_name = "disaster-recovery.yml"
-        template = Template(DISASTER_RECOVERY_WORKFLOW_TEMPLATE)
-        workflow_content = template.render()
-        
-        workflow_path = self.workflows_dir / workflow_name
-        with open(workflow_path, "w") as f:
-            f.write(workflow_content)
+        return self.write_workflow("disaster-recovery.yml", self.render_disaster_recovery_workflow(client_data))
     
-    def generate_diagnose_services_workflow(self):
+    def generate_diagnose_services_workflow(self, client_data: Optional[Dict[str, Any]] = None) -> bool:
         """Generate diagnose-services.yml workflow"""
-        workflow_name = "diagnose-services.yml"
-        template = Template(DIAGNOSE_SERVICES_WORKFLOW_TEMPLATE)
-        workflow_content = template.render()
-        
-        workflow_path = self.workflows_dir / workflow_name
-        with open(workflow_path, "w") as f:
-            f.write(workflow_content)
+        return self.write_workflow("diagnose-services.yml", self.render_diagnose_services_workflow(client_data))
     
-    def generate_fix_common_issues_workflow(self):
+    def generate_fix_common_issues_workflow(self, client_data: Optional[Dict[str, Any]] = None) -> bool:
         """Generate fix-common-issues.yml workflow"""
-        workflow_name = "fix-common-issues.yml"
-        template = Template(FIX_COMMON_ISSUES_WORKFLOW_TEMPLATE)
-        workflow_content = template.render()
-        
-        workflow_path = self.workflows_dir / workflow_name
-        with open(workflow_path, "w") as f:
-            f.write(workflow_content)
-
+        return self.write_workflow("fix-common-issues.yml", self.render_fix_common_issues_workflow(client_data))
 
 class GitHubActionGenerator:
     """Generator for GitHub Actions reusable actions"""
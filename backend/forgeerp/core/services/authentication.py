@@ -6,6 +6,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlmodel import Session, select
 from forgeerp.core.database.models.user import User
+from forgeerp.core.services.permissions import permission_engine
 import os
 
 # Password hashing
@@ -16,6 +17,10 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Lockout settings
+MAX_FAILED_LOGIN_ATTEMPTS = int(os.getenv("MAX_FAILED_LOGIN_ATTEMPTS", "5"))
+LOGIN_LOCKOUT_MINUTES = int(os.getenv("LOGIN_LOCKOUT_MINUTES", "15"))
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -48,6 +53,30 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
+def is_user_locked(user: User, now: Optional[datetime] = None) -> bool:
+    """Check if a user is temporarily locked after failed logins"""
+    now = now or datetime.utcnow()
+    return user.locked_until is not None and user.locked_until > now
+
+
+def record_login_attempt(session: Session, user: User, success: bool) -> User:
+    """Update login counters, locking the user after too many failures"""
+    now = datetime.utcnow()
+    if success:
+        user.last_login_at = now
+        user.failed_login_attempts = 0
+        user.locked_until = None
+    else:
+        user.failed_login_attempts += 1
+        if user.failed_login_attempts >= MAX_FAILED_LOGIN_ATTEMPTS:
+            user.locked_until = now + timedelta(minutes=LOGIN_LOCKOUT_MINUTES)
+            user.failed_login_attempts = 0
+    
+    session.add(user)
+    session.commit()
+    return user
+
+
 def authenticate_user(session: Session, username: str, password: str) -> Optional[User]:
     """Authenticate a user"""
     statement = select(User).where(User.username == username)
@@ -56,18 +85,15 @@ def authenticate_user(session: Session, username: str, password: str) -> Optiona
     if not user:
         return None
     
-    if not verify_password(password, user.password_hash):
+    # Skip hashing entirely for inactive or locked accounts
+    if not user.is_active or is_user_locked(user):
         return None
     
-    if not user.is_active:
+    if not verify_password(password, user.password_hash):
+        record_login_attempt(session, user, success=False)
         return None
     
-    # Update last login
-    user.last_login_at = datetime.utcnow()
-    user.failed_login_attempts = 0
-    session.add(user)
-    session.commit()
-    
+    record_login_attempt(session, user, success=True)
     return user
 
 
@@ -97,7 +123,5 @@ def check_permission(user: User, permission_type: str, client_id: Optional[int]
     if user.role == "viewer":
         return False
     
-    # User role - check specific permissions
-    # TODO: Implement permission checking from Permission table
-    return user.role == "user"
-
+    # User role - check the compiled Permission rows (cached per user)
+    return permission_engine.matrix_for(user).allows(permission_type, client_id, environment)
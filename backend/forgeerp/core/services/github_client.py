@@ -0,0 +1,431 @@
+"""GitHub client - application-scoped GitHubService over a shared, rate-limit-aware pool"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+import requests
+from requests.structures import CaseInsensitiveDict
+from fastapi import HTTPException, status
+from github.Requester import Requester, RequestsResponse
+from forgeerp.core.services.github_service import GitHubService
+from forgeerp.core.services.job_queue import RetryLater
+
+
+# Pool settings
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_POOL_SIZE = int(os.getenv("GITHUB_POOL_SIZE", "10"))
+GITHUB_TIMEOUT_SECONDS = int(os.getenv("GITHUB_TIMEOUT_SECONDS", "15"))
+GITHUB_RETRIES = int(os.getenv("GITHUB_RETRIES", "3"))
+
+# Scheduling
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "4"))  # GitHub discourages many concurrent requests
+GITHUB_BACKGROUND_RESERVE = int(os.getenv("GITHUB_BACKGROUND_RESERVE", "500"))  # Requests kept for interactive calls
+GITHUB_INTERACTIVE_MAX_WAIT_SECONDS = float(os.getenv("GITHUB_INTERACTIVE_MAX_WAIT_SECONDS", "5"))
+GITHUB_SECONDARY_LIMIT_BACKOFF_SECONDS = float(os.getenv("GITHUB_SECONDARY_LIMIT_BACKOFF_SECONDS", "60"))
+GITHUB_ETAG_CACHE_SIZE = int(os.getenv("GITHUB_ETAG_CACHE_SIZE", "2048"))
+
+# Number of recent calls kept for latency percentiles
+LATENCY_WINDOW = 1024
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_priority: ContextVar[str] = ContextVar("github_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def github_priority(priority: str):
+    """Run the GitHub calls made inside the block with the given priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class GitHubRateLimited(RetryLater):
+    """Raised instead of sending a request that would exceed the rate limit"""
+
+
+def _percentile(ordered: list, pct: float) -> float:
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _rate_limit_resource(url: str) -> str:
+    path = urlsplit(url).path
+    if path.endswith("/graphql"):
+        return "graphql"
+    if "/search/" in path:
+        return "search"
+    return "core"
+
+
+class PriorityGate:
+    """Bounded concurrency where waiting interactive calls go before background ones"""
+
+    def __init__(self, slots: int):
+        self._condition = threading.Condition()
+        self._free = slots
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+
+    @contextmanager
+    def slot(self, priority: str):
+        with self._condition:
+            self._waiting[priority] += 1
+            while self._free == 0 or (priority == BACKGROUND and self._waiting[INTERACTIVE]):
+                self._condition.wait()
+            self._waiting[priority] -= 1
+            self._free -= 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._free += 1
+                self._condition.notify_all()
+
+    def waiting(self) -> Dict[str, int]:
+        with self._condition:
+            return dict(self._waiting)
+
+
+class GitHubTransport:
+    """One requests.Session (urllib3 keep-alive pool) shared by every GitHub call
+
+    PyGithub normally gives each Github instance its own session and stores
+    request state on a single connection object, which is not safe to share
+    between threads. The connection classes below keep per-thread request
+    state and send everything through this session, so TLS connections are
+    reused across requests, jobs and threads.
+
+    Every request also goes through the scheduler: GETs are made conditional
+    with cached ETags (a 304 is replayed from the cache and costs no quota),
+    X-RateLimit-* headers are tracked per resource, background calls stop
+    while the budget is within GITHUB_BACKGROUND_RESERVE, and secondary
+    limits (403/429 with Retry-After) pause everyone until they expire.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = GITHUB_POOL_SIZE,
+        retries: int = GITHUB_RETRIES,
+        max_concurrency: int = GITHUB_MAX_CONCURRENCY,
+        background_reserve: int = GITHUB_BACKGROUND_RESERVE,
+        etag_cache_size: int = GITHUB_ETAG_CACHE_SIZE,
+    ):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.background_reserve = background_reserve
+        self.etag_cache_size = etag_cache_size
+        self._gate = PriorityGate(max_concurrency)
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._etags: "OrderedDict[Tuple[str, str, str], Tuple[str, Dict[str, str], bytes]]" = OrderedDict()
+        self._budget: Dict[str, Dict[str, int]] = {}
+        self._blocked_until = 0.0
+        self._reset_counters()
+        self.session = self._new_session()
+
+    def _reset_counters(self):
+        self.calls = 0
+        self.errors = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+        self.secondary_limits = 0
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        # Disables the .netrc fallback, PyGithub sends its own Authorization header
+        session.auth = Requester.noopAuth
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=self.retries,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _cache_key(self, url: str, headers: Dict[str, str]) -> Tuple[str, str, str]:
+        # Different tokens can see different data
+        authorization = headers.get("Authorization") or ""
+        return (url, hashlib.sha256(authorization.encode()).hexdigest()[:16], headers.get("Accept") or "")
+
+    def _check_budget(self, url: str, priority: str):
+        """Raise GitHubRateLimited, or wait briefly, when a call must not be sent now"""
+        now = time.time()
+        with self._lock:
+            blocked_for = self._blocked_until - now
+            budget = self._budget.get(_rate_limit_resource(url))
+
+        if blocked_for > 0:
+            if priority == BACKGROUND or blocked_for > GITHUB_INTERACTIVE_MAX_WAIT_SECONDS:
+                self._count("rate_limited")
+                raise GitHubRateLimited(blocked_for, "GitHub secondary rate limit")
+            time.sleep(blocked_for)
+            return
+
+        if budget is None or budget["reset"] <= now:
+            return
+        reserve = self.background_reserve if priority == BACKGROUND else 0
+        if budget["remaining"] <= reserve:
+            self._count("rate_limited")
+            raise GitHubRateLimited(
+                budget["reset"] - now,
+                f"GitHub rate limit budget low ({budget['remaining']} left, {priority})"
+            )
+
+    def _record_rate_limit(self, url: str, response: requests.Response) -> Optional[float]:
+        """Update the budget from the response headers, returns the secondary limit delay if hit"""
+        headers = response.headers
+        if "X-RateLimit-Remaining" in headers:
+            resource = headers.get("X-RateLimit-Resource") or _rate_limit_resource(url)
+            with self._lock:
+                self._budget[resource] = {
+                    "limit": int(headers.get("X-RateLimit-Limit", 0)),
+                    "remaining": int(headers["X-RateLimit-Remaining"]),
+                    "reset": int(headers.get("X-RateLimit-Reset", 0)),
+                }
+
+        if response.status_code in (403, 429) and (
+            "Retry-After" in headers or "secondary rate limit" in response.text.lower()
+        ):
+            delay = float(headers.get("Retry-After") or GITHUB_SECONDARY_LIMIT_BACKOFF_SECONDS)
+            with self._lock:
+                self._blocked_until = max(self._blocked_until, time.time() + delay)
+                self.secondary_limits += 1
+            return delay
+        return None
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def send(self, verb: str, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+        """Send a request through the scheduler and shared pool"""
+        priority = _priority.get()
+        headers = dict(headers or {})
+        self._check_budget(url, priority)
+
+        cache_key = None
+        if verb == "GET" and not kwargs.get("data"):
+            cache_key = self._cache_key(url, headers)
+            with self._lock:
+                cached = self._etags.get(cache_key)
+            if cached is not None:
+                headers["If-None-Match"] = cached[0]
+
+        with self._gate.slot(priority):
+            response = self._send(verb, url, headers, **kwargs)
+        delay = self._record_rate_limit(url, response)
+
+        if delay is not None:
+            if priority == BACKGROUND:
+                raise GitHubRateLimited(delay, "GitHub secondary rate limit")
+            if delay <= GITHUB_INTERACTIVE_MAX_WAIT_SECONDS:
+                # One retry once the limit expires, otherwise the 403/429 goes back to the caller
+                time.sleep(delay)
+                with self._gate.slot(priority):
+                    response = self._send(verb, url, headers, **kwargs)
+                self._record_rate_limit(url, response)
+
+        if cache_key is None:
+            return response
+        if response.status_code == 304 and cached is not None:
+            self._count("not_modified")
+            return self._replay(cached, response)
+        if response.status_code == 200 and response.headers.get("ETag"):
+            with self._lock:
+                self._etags[cache_key] = (response.headers["ETag"], dict(response.headers), response.content)
+                self._etags.move_to_end(cache_key)
+                while len(self._etags) > self.etag_cache_size:
+                    self._etags.popitem(last=False)
+        return response
+
+    def _send(self, verb: str, url: str, headers: Dict[str, str], **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        try:
+            return self.session.request(verb, url, headers=headers, allow_redirects=False, **kwargs)
+        except Exception:
+            self._count("errors")
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.calls += 1
+                self._latencies.append(elapsed_ms)
+
+    @staticmethod
+    def _replay(cached: Tuple[str, Dict[str, str], bytes], not_modified: requests.Response) -> requests.Response:
+        """Cached 200 response, with the fresh rate limit headers of the 304"""
+        _, headers, content = cached
+        response = requests.Response()
+        response.status_code = 200
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers.update(
+            {name: value for name, value in not_modified.headers.items() if name.lower().startswith("x-ratelimit")}
+        )
+        response._content = content
+        response.encoding = not_modified.encoding or "utf-8"
+        response.url = not_modified.url
+        return response
+
+    def _pool_counters(self) -> Dict[str, int]:
+        opened = requests_sent = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    requests_sent += pool.num_requests
+        return {"connections_opened": opened, "requests_sent": requests_sent}
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection reuse, per-call latency, conditional requests and rate limit budget"""
+        counters = self._pool_counters()
+        with self._lock:
+            latencies = sorted(self._latencies)
+            calls, errors = self.calls, self.errors
+            scheduler = {
+                "not_modified": self.not_modified,
+                "etag_cache_size": len(self._etags),
+                "rate_limited": self.rate_limited,
+                "secondary_limits": self.secondary_limits,
+                "blocked_for_seconds": max(self._blocked_until - time.time(), 0.0),
+                "budget": {resource: dict(budget) for resource, budget in self._budget.items()},
+            }
+
+        reused = max(counters["requests_sent"] - counters["connections_opened"], 0)
+        return {
+            "pool_size": self.pool_size,
+            "calls": calls,
+            "errors": errors,
+            **counters,
+            "connections_reused": reused,
+            "reuse_rate": reused / counters["requests_sent"] if counters["requests_sent"] else 0.0,
+            "latency_ms": {
+                "p50": _percentile(latencies, 50) if latencies else 0.0,
+                "p95": _percentile(latencies, 95) if latencies else 0.0,
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "waiting": self._gate.waiting(),
+            **scheduler,
+        }
+
+    def close(self):
+        """Close pooled connections and reset state (a later call opens a fresh pool)"""
+        self.session.close()
+        self.session = self._new_session()
+        with self._lock:
+            self._latencies.clear()
+            self._etags.clear()
+            self._budget.clear()
+            self._blocked_until = 0.0
+            self._reset_counters()
+
+
+github_transport = GitHubTransport()
+
+
+class PooledHTTPSConnection:
+    """httplib-style connection PyGithub drives, backed by github_transport"""
+
+    protocol = "https"
+    default_port = 443
+
+    def __init__(
+        self,
+        host: str,
+        port: Optional[int] = None,
+        strict: bool = False,
+        timeout: Optional[int] = None,
+        retry: Any = None,
+        pool_size: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        self.host = host
+        self.port = port if port else self.default_port
+        self.timeout = timeout
+        self.verify = kwargs.get("verify", True)
+        self._request = threading.local()
+
+    def request(self, verb: str, url: str, input: Any, headers: Dict[str, str]):
+        self._request.args = (verb, url, input, headers)
+
+    def getresponse(self) -> RequestsResponse:
+        verb, url, input, headers = self._request.args
+        response = github_transport.send(
+            verb,
+            f"{self.protocol}://{self.host}:{self.port}{url}",
+            headers=headers,
+            data=input,
+            timeout=self.timeout,
+            verify=self.verify,
+        )
+        return RequestsResponse(response)
+
+    def close(self):
+        # Connections belong to the shared pool
+        pass
+
+
+class PooledHTTPConnection(PooledHTTPSConnection):
+    """Plain HTTP variant (GitHub Enterprise behind a proxy, local fakes)"""
+
+    protocol = "http"
+    default_port = 80
+
+
+_service: Optional[GitHubService] = None
+_service_lock = threading.Lock()
+
+
+def get_github_service() -> GitHubService:
+    """Shared GitHubService, created on first use (raises ValueError without a token)"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                Requester.injectConnectionClasses(PooledHTTPConnection, PooledHTTPSConnection)
+                _service = GitHubService(base_url=GITHUB_API_URL, timeout=GITHUB_TIMEOUT_SECONDS)
+    return _service
+
+
+def is_github_configured() -> bool:
+    """Whether GitHub calls can be made"""
+    return _service is not None or bool(os.getenv("GITHUB_TOKEN"))
+
+
+def require_github_service() -> GitHubService:
+    """FastAPI dependency for the shared GitHubService (503 when not configured)"""
+    try:
+        return get_github_service()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"GitHub integration is not configured: {str(e)}"
+        )
+
+
+def start_github_client():
+    """Create the shared client at startup when a token is configured"""
+    if os.getenv("GITHUB_TOKEN"):
+        get_github_service()
+
+
+def close_github_client():
+    """Drop the shared client and close its pooled connections"""
+    global _service
+    with _service_lock:
+        if _service is not None:
+            _service.close()
+            _service = None
+        Requester.resetConnectionClasses()
+    github_transport.close()
@@ -0,0 +1,180 @@
+"""GitHub jobs - background handlers for workflow generation and PR calls"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from forgeerp.core.database.models.permission import PullRequest
+from forgeerp.core.engine.github_generator.archive import render_tree
+from forgeerp.core.engine.github_generator.concurrency import load_concurrency_settings
+from forgeerp.core.engine.github_generator.fleet import generate_fleet, load_fleet
+from forgeerp.core.engine.github_generator.git_writer import GitBatchWriter, layout_prefix, mirror_path
+from forgeerp.core.engine.github_generator.workflows import GitHubWorkflowGenerator
+from forgeerp.core.services.github_client import BACKGROUND, get_github_service, github_priority
+from forgeerp.core.services.job_queue import job_queue
+
+
+@job_queue.register("workflows.generate")
+def generate_workflows_job(session: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Write a client's workflow files to the repository directory"""
+    # Workflow settings are read when the job runs, not when it was queued
+    settings = load_concurrency_settings(session, [payload["client_id"]])
+    client_data = {**payload["client_data"], "concurrency": settings[payload["client_id"]]}
+    generator = GitHubWorkflowGenerator(payload["repo_dir"])
+    report = generator.generate_workflows_for_client(client_data, payload["installed_modules"])
+
+    return {
+        "client_id": payload["client_id"],
+        "installed_modules": payload["installed_modules"],
+        **report.to_dict()
+    }
+
+
+@job_queue.register("workflows.generate_fleet")
+def generate_fleet_job(session: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Write workflow trees for every matching client on a process pool"""
+    items = load_fleet(
+        session,
+        client_codes=payload.get("client_codes"),
+        module=payload.get("module"),
+        include_inactive=payload.get("include_inactive", False)
+    )
+    
+    def progress(update: Dict[str, Any]):
+        job_queue.report_progress(session, {key: update[key] for key in ("done", "total", "failed")})
+    
+    report = generate_fleet(items, payload["output_dir"], payload.get("workers") or 0, progress)
+    return report.to_dict()
+
+
+@job_queue.register("prs.create")
+def create_pull_request_job(session: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Open a pull request on GitHub and record it"""
+    github_service = get_github_service()
+    with github_priority(BACKGROUND):
+        pr = github_service.create_pull_request(
+            owner=payload["owner"],
+            repo=payload["repo"],
+            title=payload["title"],
+            body=payload["body"],
+            head=payload["head"],
+            base=payload["base"]
+        )
+
+    pr_model = _record_pull_request(session, pr, payload)
+    return {"pr_number": pr.number, "pr_url": pr.html_url, "id": pr_model.id}
+
+
+def _record_pull_request(session: Session, pr, payload: Dict[str, Any]) -> PullRequest:
+    """Store an opened pull request (upsert: its webhook may have recorded it first)"""
+    change_data = payload.get("change_data")
+    for attempt in range(2):
+        statement = select(PullRequest).where(PullRequest.github_pr_number == pr.number)
+        pr_model = session.exec(statement).first()
+        if pr_model is None:
+            pr_model = PullRequest(
+                github_pr_number=pr.number,
+                title=payload["title"],
+                description=payload["body"],
+                status="open",
+                change_type=payload["change_type"]
+            )
+        pr_model.github_pr_url = pr.html_url
+        pr_model.change_type = payload["change_type"]
+        pr_model.change_target = payload.get("change_target")
+        pr_model.change_data = json.dumps(change_data) if change_data else None
+        pr_model.updated_at = datetime.utcnow()
+        session.add(pr_model)
+        try:
+            session.commit()
+        except IntegrityError:
+            # The webhook inserted the row between our lookup and commit
+            session.rollback()
+            if attempt:
+                raise
+            continue
+        session.refresh(pr_model)
+        return pr_model
+
+
+@job_queue.register("workflows.publish")
+def publish_workflows_job(session: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Commit the workflow trees of every matching client in one commit and open (or reuse) a PR"""
+    items = load_fleet(
+        session,
+        client_codes=payload.get("client_codes"),
+        module=payload.get("module"),
+        include_inactive=payload.get("include_inactive", False)
+    )
+    trees = {
+        layout_prefix(item["client_code"], payload["layout"]): render_tree(item["client_data"], item["installed_modules"])
+        for item in items
+    }
+    if len(trees) < len(items):
+        raise ValueError(f"Layout {payload['layout']!r} puts several clients in the same directory")
+    
+    github_service = get_github_service()
+    owner, repo, branch, base = payload["owner"], payload["repo"], payload["head"], payload["base"]
+    writer = GitBatchWriter(payload.get("mirror_dir") or mirror_path(owner, repo))
+    writer.fetch(payload["remote_url"], base, github_service.token)
+    commit = writer.commit_trees(trees, branch, payload["title"], base=base)
+    result = {"clients": len(items), **commit.to_dict()}
+    if not commit.changed:
+        return {**result, "pr_number": None}
+    
+    writer.push(payload["remote_url"], branch, github_service.token)
+    with github_priority(BACKGROUND):
+        # A republish force-pushes the branch of the PR that is already open
+        pr = github_service.find_open_pull_request(owner, repo, branch, base)
+        if pr is None:
+            pr = github_service.create_pull_request(
+                owner=owner,
+                repo=repo,
+                title=payload["title"],
+                body=payload["body"],
+                head=branch,
+                base=base
+            )
+    
+    pr_model = _record_pull_request(session, pr, {
+        **payload,
+        "change_type": "workflows",
+        "change_data": {"clients": [item["client_code"] for item in items], "commit": commit.commit},
+    })
+    return {**result, "pr_number": pr.number, "pr_url": pr.html_url, "id": pr_model.id}
+
+
+@job_queue.register("prs.sync")
+def sync_pull_request_job(session: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Refresh a pull request's status and reviews from GitHub"""
+    github_service = get_github_service()
+    owner, repo, pr_number = payload["owner"], payload["repo"], payload["pr_number"]
+
+    # One PR fetch + paginated reviews feeds both the database and the result
+    with github_priority(BACKGROUND):
+        snapshot = github_service.get_pull_request_snapshot(owner, repo, pr_number)
+    pr_model = github_service.sync_pull_request_to_database(session, owner, repo, pr_number, snapshot)
+
+    return {
+        "pr_number": pr_model.github_pr_number,
+        "status": pr_model.status,
+        "is_approved": pr_model.is_approved,
+        "is_merged": pr_model.is_merged,
+        "reviews": snapshot["reviews"],
+        "change_type": pr_model.change_type,
+        "change_target": pr_model.change_target
+    }
+
+
+@job_queue.register("prs.sync_all")
+def sync_pull_requests_job(session: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Reconcile every pull request changed since the last bulk sync"""
+    github_service = get_github_service()
+    with github_priority(BACKGROUND):
+        return github_service.sync_pull_requests_to_database(
+            session,
+            payload["owner"],
+            payload["repo"],
+            full=payload.get("full", False)
+        )
@@ -0,0 +1,179 @@
+"""GitHub permissions - TTL cache of repository collaborator permissions"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Cache settings
+GITHUB_PERMISSION_TTL_SECONDS = float(os.getenv("GITHUB_PERMISSION_TTL_SECONDS", "300"))
+GITHUB_PERMISSION_NEGATIVE_TTL_SECONDS = float(os.getenv("GITHUB_PERMISSION_NEGATIVE_TTL_SECONDS", "60"))
+GITHUB_PERMISSION_CACHE_MAX_SIZE = int(os.getenv("GITHUB_PERMISSION_CACHE_MAX_SIZE", "4096"))
+
+# Repository permission levels, lowest first
+PERMISSION_LEVELS = ("none", "read", "triage", "write", "maintain", "admin")
+
+# Webhook events that change collaborator permissions
+PERMISSION_EVENTS = ("member", "team")
+
+PermissionKey = Tuple[str, str, str]
+
+
+def permission_satisfies(granted: Optional[str], required: str) -> bool:
+    """Whether a granted permission level includes the required one"""
+    if granted not in PERMISSION_LEVELS or required not in PERMISSION_LEVELS:
+        return False
+    return PERMISSION_LEVELS.index(granted) >= PERMISSION_LEVELS.index(required)
+
+
+class CollaboratorPermissionCache:
+    """TTL + LRU cache of (owner, repo, username) -> permission level
+
+    "none" (not a collaborator) is cached for a shorter TTL. Concurrent misses
+    for the same key share one in-flight fetch, and fetch errors are not
+    cached. Entries are dropped by member/team webhooks as they arrive.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = GITHUB_PERMISSION_TTL_SECONDS,
+        negative_ttl_seconds: float = GITHUB_PERMISSION_NEGATIVE_TTL_SECONDS,
+        max_size: int = GITHUB_PERMISSION_CACHE_MAX_SIZE,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[PermissionKey, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[PermissionKey, Future] = {}
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+        self.shared_fetches = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(owner: str, repo: str, username: str) -> PermissionKey:
+        # GitHub logins and repository names are case-insensitive
+        return (owner.lower(), repo.lower(), username.lower())
+
+    def get_or_fetch(self, owner: str, repo: str, username: str, fetch: Callable[[], str]) -> str:
+        """Cached permission level, calling `fetch` once per key on a miss"""
+        key = self._key(owner, repo, username)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            self.misses += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+            else:
+                self.shared_fetches += 1
+
+        if not leader:
+            return future.result()
+
+        permission: Optional[str] = None
+        error: Optional[BaseException] = None
+        try:
+            permission = fetch()
+            return permission
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            # Followers wait on the future: resolve it whatever happens here
+            try:
+                with self._lock:
+                    # An invalidation during the fetch removed (or replaced) the marker: don't store a stale answer
+                    current = self._inflight.get(key) is future
+                    if current:
+                        del self._inflight[key]
+                    if current and error is None:
+                        ttl = self.negative_ttl_seconds if permission == "none" else self.ttl_seconds
+                        self._entries[key] = (time.monotonic() + ttl, permission)
+                        self._entries.move_to_end(key)
+                        while len(self._entries) > self.max_size:
+                            self._entries.popitem(last=False)
+                            self.evictions += 1
+            finally:
+                if error is None:
+                    future.set_result(permission)
+                else:
+                    future.set_exception(error)
+
+    def invalidate(self, owner: Optional[str] = None, repo: Optional[str] = None, username: Optional[str] = None) -> int:
+        """Drop entries matching every given part (no arguments drops everything)"""
+        wanted = tuple(part.lower() if part is not None else None for part in (owner, repo, username))
+
+        def matches(key: PermissionKey) -> bool:
+            return all(part is None or part == value for part, value in zip(wanted, key))
+
+        with self._lock:
+            stale = [key for key in self._entries if matches(key)]
+            for key in stale:
+                del self._entries[key]
+            for key in [key for key in self._inflight if matches(key)]:
+                del self._inflight[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._inflight.clear()
+            self._reset_counters()
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters and hit rate"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "negative_ttl_seconds": self.negative_ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "shared_fetches": self.shared_fetches,
+                "in_flight": len(self._inflight),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+collaborator_permissions = CollaboratorPermissionCache()
+
+
+def apply_permission_event(event: str, payload: Dict[str, Any]) -> int:
+    """Invalidate cached permissions affected by a member or team webhook"""
+    full_name = (payload.get("repository") or {}).get("full_name")
+    owner, _, repo = full_name.partition("/") if full_name else (None, None, None)
+
+    if event == "member":
+        # A collaborator was added, removed or had their permission changed
+        login = (payload.get("member") or {}).get("login")
+        if login and owner:
+            return collaborator_permissions.invalidate(owner, repo, login)
+        if login:
+            return collaborator_permissions.invalidate(username=login)
+
+    if event == "team" and owner:
+        # Team access to one repository changed: any of its members may be affected
+        return collaborator_permissions.invalidate(owner, repo)
+
+    # Organization-wide team change (created, deleted, edited without a repository)
+    return collaborator_permissions.invalidate()
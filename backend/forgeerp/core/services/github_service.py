@@ -1,27 +1,58 @@
 """GitHub service for PRs and permissions"""
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List
-from github import Github
+from github import Auth, Consts, Github, UnknownObjectException
 from github.Repository import Repository
 from github.PullRequest import PullRequest
+from forgeerp.core.database.models.configuration import Configuration
 from forgeerp.core.database.models.permission import PullRequest as PRModel
 from forgeerp.core.database.models.permission import PullRequestApproval
+from forgeerp.core.database.models.user import User
+from forgeerp.core.services.github_permissions import collaborator_permissions, permission_satisfies
 from sqlmodel import Session, select
 
 
+# Review fetches running at once during a bulk PR sync
+GITHUB_SYNC_CONCURRENCY = int(os.getenv("GITHUB_SYNC_CONCURRENCY", "4"))
+
+
+def to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Normalize a GitHub timestamp to naive UTC (as stored in the database)"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 class GitHubService:
     """Service for GitHub API operations"""
     
-    def __init__(self, token: Optional[str] = None):
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        base_url: str = Consts.DEFAULT_BASE_URL,
+        timeout: int = Consts.DEFAULT_TIMEOUT,
+    ):
         self.token = token or os.getenv("GITHUB_TOKEN")
         if not self.token:
             raise ValueError("GITHUB_TOKEN environment variable is required")
-        self.github = Github(self.token)
+        self.github = Github(
+            auth=Auth.Token(self.token),
+            base_url=base_url,
+            timeout=timeout,
+            per_page=100,  # Fewer pages when listing reviews
+        )
+    
+    def close(self):
+        """Close the underlying GitHub connections"""
+        self.github.close()
     
     def get_repository(self, owner: str, repo: str) -> Repository:
-        """Get a GitHub repository"""
-        return self.github.get_repo(f"{owner}/{repo}")
+        """Get a GitHub repository (lazy, no request until an attribute is needed)"""
+        return self.github.get_repo(f"{owner}/{repo}", lazy=True)
     
     def create_pull_request(
         self,
@@ -42,6 +73,19 @@ class GitHubService:
         )
         return pr
     
+    def find_open_pull_request(
+        self,
+        owner: str,
+        repo: str,
+        head: str,
+        base: str = "main"
+    ) -> Optional[PullRequest]:
+        """Open pull request from a branch of the repository, None when there is none"""
+        repository = self.get_repository(owner, repo)
+        for pr in repository.get_pulls(state="open", head=f"{owner}:{head}", base=base):
+            return pr
+        return None
+    
     def get_pull_request(
         self,
         owner: str,
@@ -52,6 +96,44 @@ class GitHubService:
         repository = self.get_repository(owner, repo)
         return repository.get_pull(pr_number)
     
+    @staticmethod
+    def review_to_dict(review) -> Dict[str, Any]:
+        """Plain representation of a pull request review"""
+        return {
+            "id": review.id,
+            "user": review.user.login if review.user else None,
+            "state": review.state,
+            "body": review.body,
+            "submitted_at": review.submitted_at.isoformat() if review.submitted_at else None
+        }
+    
+    @staticmethod
+    def count_approvals(reviews: List[Dict[str, Any]]) -> int:
+        """Number of approving reviews"""
+        return sum(1 for review in reviews if review["state"] == "APPROVED")
+    
+    def get_pull_request_snapshot(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int
+    ) -> Dict[str, Any]:
+        """Fetch a pull request and all its reviews once (PR + paginated reviews)"""
+        pr = self.get_pull_request(owner, repo, pr_number)
+        
+        return {
+            "number": pr.number,
+            "html_url": pr.html_url,
+            "title": pr.title,
+            "body": pr.body,
+            "state": pr.state,
+            "merged": pr.merged,
+            "merged_at": to_utc_naive(pr.merged_at),
+            "closed_at": to_utc_naive(pr.closed_at),
+            "updated_at": to_utc_naive(pr.updated_at),
+            "reviews": [self.review_to_dict(review) for review in pr.get_reviews()],
+        }
+    
     def is_pull_request_approved(
         self,
         owner: str,
@@ -60,15 +142,8 @@ class GitHubService:
         required_approvals: int = 1
     ) -> bool:
         """Check if a pull request has required approvals"""
-        pr = self.get_pull_request(owner, repo, pr_number)
-        reviews = pr.get_reviews()
-        
-        approvals = 0
-        for review in reviews:
-            if review.state == "APPROVED":
-                approvals += 1
-        
-        return approvals >= required_approvals
+        reviews = self.get_pull_request_reviews(owner, repo, pr_number)
+        return self.count_approvals(reviews) >= required_approvals
     
     def get_pull_request_reviews(
         self,
@@ -78,68 +153,219 @@ class GitHubService:
     ) -> List[Dict[str, Any]]:
         """Get pull request reviews"""
         pr = self.get_pull_request(owner, repo, pr_number)
-        reviews = pr.get_reviews()
-        
-        return [
-            {
-                "id": review.id,
-                "user": review.user.login,
-                "state": review.state,
-                "body": review.body,
-                "submitted_at": review.submitted_at.isoformat() if review.submitted_at else None
-            }
-            for review in reviews
-        ]
+        return [self.review_to_dict(review) for review in pr.get_reviews()]
     
     def sync_pull_request_to_database(
         self,
         session: Session,
         owner: str,
         repo: str,
-        pr_number: int
+        pr_number: int,
+        snapshot: Optional[Dict[str, Any]] = None
     ) -> PRModel:
-        """Sync pull request from GitHub to database"""
-        pr = self.get_pull_request(owner, repo, pr_number)
+        """Sync pull request and its reviews from GitHub to database"""
+        if snapshot is None:
+            snapshot = self.get_pull_request_snapshot(owner, repo, pr_number)
         
         # Check if PR already exists in database
         statement = select(PRModel).where(PRModel.github_pr_number == pr_number)
-        existing_pr = session.exec(statement).first()
-        
-        if existing_pr:
-            # Update existing PR
-            existing_pr.status = "open" if pr.state == "open" else "closed"
-            existing_pr.is_approved = self.is_pull_request_approved(owner, repo, pr_number)
-            existing_pr.is_merged = pr.merged
-            if pr.merged_at:
-                existing_pr.merged_at = pr.merged_at
-            if pr.closed_at:
-                existing_pr.closed_at = pr.closed_at
-            
-            session.add(existing_pr)
-            session.commit()
-            session.refresh(existing_pr)
-            
-            return existing_pr
-        
-        # Create new PR in database
-        pr_model = PRModel(
-            github_pr_number=pr.number,
-            github_pr_url=pr.html_url,
-            title=pr.title,
-            description=pr.body,
-            status="open" if pr.state == "open" else "closed",
-            is_approved=self.is_pull_request_approved(owner, repo, pr_number),
-            is_merged=pr.merged,
-            merged_at=pr.merged_at,
-            closed_at=pr.closed_at
-        )
+        pr_model = self._apply_snapshot(session, session.exec(statement).first(), snapshot)
         
-        session.add(pr_model)
         session.commit()
         session.refresh(pr_model)
         
         return pr_model
     
+    def list_pull_requests_since(
+        self,
+        owner: str,
+        repo: str,
+        since: Optional[datetime] = None
+    ) -> List[PullRequest]:
+        """PRs in any state updated at or after `since`, newest first (one paginated pass)"""
+        repository = self.get_repository(owner, repo)
+        pulls = []
+        for pr in repository.get_pulls(state="all", sort="updated", direction="desc"):
+            if since is not None and to_utc_naive(pr.updated_at) < since:
+                break
+            pulls.append(pr)
+        return pulls
+    
+    def sync_pull_requests_to_database(
+        self,
+        session: Session,
+        owner: str,
+        repo: str,
+        full: bool = False,
+        max_workers: int = GITHUB_SYNC_CONCURRENCY
+    ) -> Dict[str, Any]:
+        """Reconcile every PR changed since the last bulk sync, in one transaction
+        
+        Lists PRs once (state=all, sorted by updated) down to the stored
+        watermark, fetches reviews in parallel only for PRs that changed since
+        their stored github_updated_at, then writes everything and the new
+        watermark in a single commit. `full` ignores the watermark.
+        """
+        watermark = None if full else self.get_sync_watermark(session, owner, repo)
+        pulls = self.list_pull_requests_since(owner, repo, watermark)
+        
+        numbers = [pr.number for pr in pulls]
+        existing = {}
+        if numbers:
+            statement = select(PRModel).where(PRModel.github_pr_number.in_(numbers))
+            existing = {pr_model.github_pr_number: pr_model for pr_model in session.exec(statement).all()}
+        
+        changed = []
+        for pr in pulls:
+            pr_model = existing.get(pr.number)
+            stored_at = pr_model.github_updated_at if pr_model else None
+            if stored_at is None or stored_at < to_utc_naive(pr.updated_at):
+                changed.append(pr)
+        
+        # Listed PR objects already carry their URL, so fetching reviews costs no PR GET.
+        # Each task gets its own context copy to keep the caller's request priority.
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = [executor.submit(copy_context().run, self._list_snapshot, pr) for pr in changed]
+            snapshots = [future.result() for future in futures]
+        
+        for snapshot in snapshots:
+            self._apply_snapshot(session, existing.get(snapshot["number"]), snapshot)
+        
+        if pulls:
+            newest = max(to_utc_naive(pr.updated_at) for pr in pulls)
+            if watermark is None or newest > watermark:
+                watermark = newest
+                self._set_sync_watermark(session, owner, repo, watermark)
+        
+        session.commit()
+        
+        return {
+            "listed": len(pulls),
+            "synced": [snapshot["number"] for snapshot in snapshots],
+            "unchanged": len(pulls) - len(snapshots),
+            "watermark": watermark.isoformat() if watermark else None,
+        }
+    
+    def _list_snapshot(self, pr: PullRequest) -> Dict[str, Any]:
+        """Snapshot of a PR from the list endpoint plus its reviews"""
+        # The list payload has no `merged` field; reading pr.merged would refetch the PR
+        return {
+            "number": pr.number,
+            "html_url": pr.html_url,
+            "title": pr.title,
+            "body": pr.body,
+            "state": pr.state,
+            "merged": pr.merged_at is not None,
+            "merged_at": to_utc_naive(pr.merged_at),
+            "closed_at": to_utc_naive(pr.closed_at),
+            "updated_at": to_utc_naive(pr.updated_at),
+            "reviews": [self.review_to_dict(review) for review in pr.get_reviews()],
+        }
+    
+    @staticmethod
+    def _watermark_key(owner: str, repo: str) -> str:
+        return f"github.prs.sync_watermark:{owner}/{repo}"
+    
+    def get_sync_watermark(self, session: Session, owner: str, repo: str) -> Optional[datetime]:
+        """Newest GitHub updated_at seen by the last bulk sync"""
+        statement = select(Configuration.value).where(
+            Configuration.key == self._watermark_key(owner, repo),
+            Configuration.client_id == None,
+            Configuration.module_id == None
+        )
+        value = session.exec(statement).first()
+        return datetime.fromisoformat(value) if value else None
+    
+    def _set_sync_watermark(self, session: Session, owner: str, repo: str, watermark: datetime):
+        statement = select(Configuration).where(
+            Configuration.key == self._watermark_key(owner, repo),
+            Configuration.client_id == None,
+            Configuration.module_id == None
+        )
+        config = session.exec(statement).first() or Configuration(
+            key=self._watermark_key(owner, repo),
+            value="",
+            description="Bulk PR sync watermark (GitHub updated_at)"
+        )
+        config.value = watermark.isoformat()
+        config.updated_at = datetime.utcnow()
+        session.add(config)
+    
+    def _apply_snapshot(
+        self,
+        session: Session,
+        pr_model: Optional[PRModel],
+        snapshot: Dict[str, Any]
+    ) -> PRModel:
+        """Write a snapshot onto the PR row and its reviews (flushed, not committed)"""
+        if pr_model is None:
+            pr_model = PRModel(
+                github_pr_number=snapshot["number"],
+                github_pr_url=snapshot["html_url"],
+                title=snapshot["title"],
+                description=snapshot["body"],
+                change_type="external"
+            )
+        
+        pr_model.status = "open" if snapshot["state"] == "open" else "closed"
+        pr_model.is_approved = self.count_approvals(snapshot["reviews"]) >= 1
+        pr_model.is_merged = snapshot["merged"]
+        if snapshot["merged_at"]:
+            pr_model.merged_at = snapshot["merged_at"]
+        if snapshot["closed_at"]:
+            pr_model.closed_at = snapshot["closed_at"]
+        if snapshot.get("updated_at"):
+            pr_model.github_updated_at = snapshot["updated_at"]
+        pr_model.synced_at = datetime.utcnow()
+        pr_model.updated_at = pr_model.synced_at
+        
+        session.add(pr_model)
+        session.flush()
+        
+        self._sync_reviews(session, pr_model, snapshot["reviews"])
+        return pr_model
+    
+    def _sync_reviews(self, session: Session, pr_model: PRModel, reviews: List[Dict[str, Any]]):
+        """Upsert reviews into PullRequestApproval (one query each for rows and users)"""
+        statement = select(PullRequestApproval).where(PullRequestApproval.pull_request_id == pr_model.id)
+        existing = {approval.github_review_id: approval for approval in session.exec(statement).all()}
+        
+        logins = {review["user"] for review in reviews if review["user"]}
+        users = {}
+        if logins:
+            statement = select(User.username, User.id).where(User.username.in_(logins))
+            users = dict(session.exec(statement).all())
+        
+        for review in reviews:
+            approval = existing.pop(review["id"], None) or PullRequestApproval(
+                pull_request_id=pr_model.id,
+                github_review_id=review["id"]
+            )
+            approval.reviewer_login = review["user"]
+            approval.approver_id = users.get(review["user"])
+            approval.state = review["state"]
+            approval.approved = review["state"] == "APPROVED"
+            approval.comment = review["body"] or None
+            approval.submitted_at = (
+                to_utc_naive(datetime.fromisoformat(review["submitted_at"])) if review["submitted_at"] else None
+            )
+            session.add(approval)
+        
+        # Reviews no longer on GitHub
+        for approval in existing.values():
+            if approval.github_review_id is not None:
+                session.delete(approval)
+    
+    def get_collaborator_permission(self, owner: str, repo: str, username: str) -> str:
+        """User's permission level on the repository ("none" if not a collaborator), cached"""
+        def fetch() -> str:
+            try:
+                return self.get_repository(owner, repo).get_collaborator_permission(username)
+            except UnknownObjectException:
+                return "none"
+        
+        return collaborator_permissions.get_or_fetch(owner, repo, username, fetch)
+    
     def check_user_permission(
         self,
         owner: str,
@@ -147,12 +373,10 @@ class GitHubService:
         username: str,
         permission: str = "write"
     ) -> bool:
-        """Check if user has permission in repository"""
-        repository = self.get_repository(owner, repo)
-        
-        try:
-            collaborator = repository.get_collaborator_permission(username)
-            return collaborator in ["write", "admin", "maintain"]
-        except Exception:
-            return False
+        """Check if user has permission in repository
 
+        Only "not a collaborator" is a denial; GitHub errors and rate limits
+        propagate so callers can tell them apart from a missing permission.
+        """
+        granted = self.get_collaborator_permission(owner, repo, username)
+        return permission_satisfies(granted, permission)
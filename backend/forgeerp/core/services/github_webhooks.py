@@ -0,0 +1,192 @@
+"""GitHub webhooks - signature checks and incremental PR/review ingestion"""
+
+import hashlib
+import hmac
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from forgeerp.core.database.models.permission import (
+    GitHubWebhookDelivery,
+    PullRequest,
+    PullRequestApproval,
+)
+from forgeerp.core.database.models.user import User
+from forgeerp.core.services.github_service import to_utc_naive
+from forgeerp.core.services.job_queue import job_queue
+
+
+# Events ingested into pull_requests / pull_request_approvals
+SUPPORTED_EVENTS = ("pull_request", "pull_request_review")
+
+
+def get_webhook_secret() -> Optional[str]:
+    """Shared secret configured on the GitHub webhook"""
+    return os.getenv("GITHUB_WEBHOOK_SECRET") or None
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """X-Hub-Signature-256 value for a payload"""
+    digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return f"sha256={digest}"
+
+
+def verify_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Constant-time check of an X-Hub-Signature-256 header"""
+    if not signature:
+        return False
+    return hmac.compare_digest(sign_payload(secret, body), signature)
+
+
+def parse_github_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parse a GitHub ISO 8601 timestamp into naive UTC"""
+    if not value:
+        return None
+    return to_utc_naive(datetime.fromisoformat(value.replace("Z", "+00:00")))
+
+
+def is_tracked_repository(payload: Dict[str, Any]) -> bool:
+    """Whether the event belongs to the repository PRs are tracked for"""
+    full_name = payload.get("repository", {}).get("full_name")
+    owner = os.getenv("GITHUB_OWNER", "forgeerp")
+    repo = os.getenv("GITHUB_REPO", "forgeerp")
+    return full_name == f"{owner}/{repo}"
+
+
+def record_delivery(
+    session: Session,
+    delivery_id: str,
+    event: str,
+    payload: Dict[str, Any],
+) -> Optional[GitHubWebhookDelivery]:
+    """Store a delivery and queue its processing in one transaction
+
+    Returns None when the delivery id was already received (GitHub redelivery).
+    """
+    delivery = GitHubWebhookDelivery(
+        delivery_id=delivery_id,
+        event=event,
+        action=payload.get("action"),
+        payload=json.dumps(payload),
+    )
+    session.add(delivery)
+    try:
+        session.flush()
+        job_queue.enqueue(session, "github.webhook", {"delivery_id": delivery_id}, commit=False)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        return None
+
+    job_queue.notify()
+    session.refresh(delivery)
+    return delivery
+
+
+def _get_or_create_pull_request(session: Session, data: Dict[str, Any]) -> PullRequest:
+    statement = select(PullRequest).where(PullRequest.github_pr_number == data["number"])
+    pr_model = session.exec(statement).first()
+    if pr_model is None:
+        pr_model = PullRequest(
+            github_pr_number=data["number"],
+            github_pr_url=data["html_url"],
+            title=data["title"],
+            description=data.get("body"),
+            change_type="external"
+        )
+    return pr_model
+
+
+def apply_pull_request_event(session: Session, payload: Dict[str, Any]) -> PullRequest:
+    """Apply a pull_request event, ignoring states older than the stored one"""
+    data = payload["pull_request"]
+    pr_model = _get_or_create_pull_request(session, data)
+
+    updated_at = parse_github_datetime(data.get("updated_at"))
+    if pr_model.github_updated_at and updated_at and updated_at < pr_model.github_updated_at:
+        return pr_model
+
+    pr_model.title = data["title"]
+    pr_model.description = data.get("body")
+    pr_model.status = "open" if data["state"] == "open" else "closed"
+    pr_model.is_merged = bool(data.get("merged"))
+    pr_model.merged_at = parse_github_datetime(data.get("merged_at"))
+    pr_model.closed_at = parse_github_datetime(data.get("closed_at"))
+    pr_model.github_updated_at = updated_at
+    pr_model.synced_at = datetime.utcnow()
+    pr_model.updated_at = pr_model.synced_at
+
+    session.add(pr_model)
+    session.commit()
+    session.refresh(pr_model)
+    return pr_model
+
+
+def apply_pull_request_review_event(session: Session, payload: Dict[str, Any]) -> PullRequest:
+    """Upsert one review and recompute the PR's approval flag"""
+    pr_model = _get_or_create_pull_request(session, payload["pull_request"])
+    session.add(pr_model)
+    session.flush()
+
+    review = payload["review"]
+    login = review["user"]["login"] if review.get("user") else None
+    state = "DISMISSED" if payload.get("action") == "dismissed" else review["state"].upper()
+
+    statement = select(PullRequestApproval).where(PullRequestApproval.github_review_id == review["id"])
+    approval = session.exec(statement).first() or PullRequestApproval(
+        pull_request_id=pr_model.id,
+        github_review_id=review["id"]
+    )
+
+    # A dismissal is final, even if the submitted event is delivered after it
+    if approval.state != "DISMISSED":
+        approval.state = state
+        approval.approved = state == "APPROVED"
+    approval.reviewer_login = login
+    approval.comment = review.get("body") or None
+    approval.submitted_at = parse_github_datetime(review.get("submitted_at"))
+    if login:
+        approval.approver_id = session.exec(select(User.id).where(User.username == login)).first()
+    session.add(approval)
+    session.flush()
+
+    statement = select(PullRequestApproval.id).where(
+        PullRequestApproval.pull_request_id == pr_model.id,
+        PullRequestApproval.approved == True
+    )
+    pr_model.is_approved = session.exec(statement).first() is not None
+    pr_model.updated_at = datetime.utcnow()
+
+    session.add(pr_model)
+    session.commit()
+    session.refresh(pr_model)
+    return pr_model
+
+
+EVENT_HANDLERS = {
+    "pull_request": apply_pull_request_event,
+    "pull_request_review": apply_pull_request_review_event,
+}
+
+
+@job_queue.register("github.webhook")
+def process_delivery_job(session: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply a stored webhook delivery"""
+    statement = select(GitHubWebhookDelivery).where(
+        GitHubWebhookDelivery.delivery_id == payload["delivery_id"]
+    )
+    delivery = session.exec(statement).one()
+    pr_model = EVENT_HANDLERS[delivery.event](session, json.loads(delivery.payload))
+
+    delivery.processed_at = datetime.utcnow()
+    session.add(delivery)
+    session.commit()
+
+    return {
+        "delivery_id": delivery.delivery_id,
+        "event": delivery.event,
+        "action": delivery.action,
+        "pr_number": pr_model.github_pr_number,
+    }
@@ -0,0 +1,389 @@
+"""Job queue - in-process runner for jobs persisted in the jobs table"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from sqlalchemy import and_, or_, update
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+from forgeerp.core.database.models.job import Job
+
+
+logger = logging.getLogger(__name__)
+
+# Runner settings
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+# How often a running job's lease is extended (default: a third of the lease)
+JOB_HEARTBEAT_SECONDS = float(os.getenv("JOB_HEARTBEAT_SECONDS", "0")) or None
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SECONDS = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "5"))
+
+# Id of the job the current thread is executing (for progress reports)
+_current_job: ContextVar[Optional[int]] = ContextVar("current_job", default=None)
+
+# Handlers receive their own session and the decoded payload, and return a JSON-able result
+JobHandler = Callable[[Session, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class UnknownJobType(Exception):
+    """Raised when enqueuing a job type without a registered handler"""
+
+
+class RetryLater(Exception):
+    """Raised by a handler to run the job again later without using an attempt"""
+
+    def __init__(self, delay_seconds: float, reason: str = "Deferred"):
+        super().__init__(reason)
+        self.delay_seconds = delay_seconds
+
+
+class JobQueue:
+    """Runs queued jobs on a bounded thread pool
+
+    Jobs are claimed with a conditional UPDATE (compare-and-set on status and
+    lease), which is atomic on SQLite and Postgres alike, so several workers or
+    processes can share the table. A job whose lease expires (worker died) is
+    claimed again; failures are retried with exponential backoff until
+    max_attempts. While a handler runs, a heartbeat thread keeps extending
+    its lease, so long jobs are never claimed twice or swept as expired; the
+    outcome is only recorded while this worker still holds the lease.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        poll_interval: float = JOB_POLL_INTERVAL_SECONDS,
+        lease_seconds: int = JOB_LEASE_SECONDS,
+        heartbeat_seconds: Optional[float] = JOB_HEARTBEAT_SECONDS,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds or lease_seconds / 3
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers: Dict[str, JobHandler] = {}
+        self._bind: Optional[Engine] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._slots = threading.Semaphore(workers)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.running = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.deferred = 0
+        self.failed = 0
+        self.lost = 0
+
+    def register(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """Decorator registering the handler for a job type"""
+        def decorator(handler: JobHandler) -> JobHandler:
+            self._handlers[job_type] = handler
+            return handler
+        return decorator
+
+    def enqueue(
+        self,
+        session: Session,
+        job_type: str,
+        payload: Dict[str, Any],
+        created_by: Optional[int] = None,
+        max_attempts: int = JOB_MAX_ATTEMPTS,
+        dedupe_key: Optional[str] = None,
+        commit: bool = True,
+    ) -> Job:
+        """Persist a new job and wake the dispatcher
+
+        With a dedupe_key, an already queued or running job with the same key
+        is returned instead of creating another one. With commit=False the job
+        is only flushed, so it commits (or not) with the caller's transaction.
+        """
+        if job_type not in self._handlers:
+            raise UnknownJobType(job_type)
+
+        if dedupe_key is not None:
+            statement = select(Job).where(
+                Job.dedupe_key == dedupe_key,
+                Job.status.in_(("queued", "running")),
+            )
+            pending = session.exec(statement).first()
+            if pending is not None:
+                return pending
+
+        job = Job(
+            job_type=job_type,
+            payload=json.dumps(payload),
+            created_by=created_by,
+            max_attempts=max_attempts,
+            dedupe_key=dedupe_key,
+        )
+        session.add(job)
+        if not commit:
+            session.flush()
+            return job
+
+        session.commit()
+        session.refresh(job)
+
+        self._wakeup.set()
+        return job
+
+    def notify(self):
+        """Wake the dispatcher (after committing jobs enqueued with commit=False)"""
+        self._wakeup.set()
+
+    def _claimable(self, now: datetime):
+        """Queued jobs that are due, or running jobs whose lease expired"""
+        return and_(
+            Job.run_after <= now,
+            Job.attempts < Job.max_attempts,
+            or_(
+                Job.status == "queued",
+                and_(Job.status == "running", Job.lease_expires_at < now),
+            ),
+        )
+
+    def claim(self, session: Session) -> Optional[Job]:
+        """Lease the next due job, or None when there is nothing to run"""
+        now = datetime.utcnow()
+
+        # Jobs abandoned by a dead worker after their last attempt
+        session.exec(
+            update(Job)
+            .where(
+                Job.status == "running",
+                Job.lease_expires_at < now,
+                Job.attempts >= Job.max_attempts,
+            )
+            .values(status="failed", error="Lease expired", finished_at=now, updated_at=now)
+        )
+        session.commit()
+
+        while True:
+            statement = select(Job.id).where(self._claimable(now)).order_by(Job.run_after, Job.id).limit(1)
+            job_id = session.exec(statement).first()
+            if job_id is None:
+                return None
+
+            # Compare-and-set: only one worker wins the row
+            result = session.exec(
+                update(Job)
+                .where(Job.id == job_id, self._claimable(now))
+                .values(
+                    status="running",
+                    attempts=Job.attempts + 1,
+                    leased_by=self.worker_id,
+                    lease_expires_at=now + timedelta(seconds=self.lease_seconds),
+                    started_at=now,
+                    updated_at=now,
+                )
+            )
+            session.commit()
+            if result.rowcount == 1:
+                return session.get(Job, job_id, populate_existing=True)
+
+    def run(self, session: Session, job: Job) -> Job:
+        """Execute a claimed job and record its outcome"""
+        with self._lock:
+            self.running += 1
+        try:
+            job, outcome = self._execute(session, job)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        return job
+
+    def _execute(self, session: Session, job: Job) -> Tuple[Job, str]:
+        handler = self._handlers.get(job.job_type)
+        try:
+            if handler is None:
+                raise UnknownJobType(job.job_type)
+            token = _current_job.set(job.id)
+            heartbeat = self._start_heartbeat(session.get_bind(), job.id)
+            try:
+                result = handler(session, json.loads(job.payload))
+            finally:
+                heartbeat.set()
+                _current_job.reset(token)
+        except RetryLater as exc:
+            session.rollback()
+            now = datetime.utcnow()
+            values = dict(
+                status="queued",
+                attempts=Job.attempts - 1,
+                error=str(exc),
+                run_after=now + timedelta(seconds=exc.delay_seconds),
+            )
+            outcome = "deferred"
+            logger.info("Job %s (%s) deferred %.0fs: %s", job.id, job.job_type, exc.delay_seconds, exc)
+        except Exception as exc:
+            session.rollback()
+            now = datetime.utcnow()
+            job = session.get(Job, job.id, populate_existing=True)
+            values = dict(error="".join(traceback.format_exception_only(type(exc), exc)).strip())
+            if job.attempts < job.max_attempts and not isinstance(exc, UnknownJobType):
+                values.update(
+                    status="queued",
+                    run_after=now + timedelta(seconds=JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)),
+                )
+                outcome = "retried"
+            else:
+                values.update(status="failed", finished_at=now)
+                outcome = "failed"
+            logger.warning("Job %s (%s) failed: %s", job.id, job.job_type, values["error"])
+        else:
+            now = datetime.utcnow()
+            values = dict(
+                status="succeeded",
+                result=json.dumps(result, default=str) if result is not None else None,
+                error=None,
+                finished_at=now,
+            )
+            outcome = "succeeded"
+
+        # Same compare-and-set as the claim: a worker whose lease expired (and
+        # was re-claimed) must not overwrite the new owner's state
+        completed = session.exec(
+            update(Job)
+            .where(Job.id == job.id, Job.status == "running", Job.leased_by == self.worker_id)
+            .values(leased_by=None, lease_expires_at=None, updated_at=now, **values)
+        )
+        session.commit()
+        if completed.rowcount != 1:
+            logger.warning("Job %s (%s) lost its lease, outcome %s discarded", job.id, job.job_type, outcome)
+            outcome = "lost"
+        job = session.get(Job, job.id, populate_existing=True)
+        return job, outcome
+
+    def _lease_update(self, job_id: int, now: datetime):
+        # Only the worker holding the lease may extend it
+        return (
+            update(Job)
+            .where(Job.id == job_id, Job.status == "running", Job.leased_by == self.worker_id)
+            .values(lease_expires_at=now + timedelta(seconds=self.lease_seconds), updated_at=now)
+        )
+
+    def extend_lease(self, bind: Engine, job_id: int) -> bool:
+        """Push a running job's lease expiry forward on its own connection"""
+        with bind.begin() as connection:
+            return connection.execute(self._lease_update(job_id, datetime.utcnow())).rowcount == 1
+
+    def _start_heartbeat(self, bind: Engine, job_id: int) -> threading.Event:
+        # Returns the event that stops the heartbeat
+        stopped = threading.Event()
+
+        def beat():
+            while not stopped.wait(self.heartbeat_seconds):
+                try:
+                    if not self.extend_lease(bind, job_id):
+                        logger.warning("Job %s lost its lease", job_id)
+                        return
+                except Exception:
+                    logger.exception("Failed to extend the lease of job %s", job_id)
+
+        threading.Thread(target=beat, name=f"job-heartbeat-{job_id}", daemon=True).start()
+        return stopped
+
+    def report_progress(self, session: Session, progress: Dict[str, Any]):
+        """Store progress on the job being executed and extend its lease (commits; no-op outside a job)"""
+        job_id = _current_job.get()
+        if job_id is None:
+            return
+        session.execute(
+            self._lease_update(job_id, datetime.utcnow())
+            .values(progress=json.dumps(progress, default=str))
+        )
+        session.commit()
+
+    def run_pending(self, session: Session) -> int:
+        """Run every due job in the calling thread, returns how many ran"""
+        count = 0
+        while (job := self.claim(session)) is not None:
+            self.run(session, job)
+            count += 1
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Runner counters for this process"""
+        with self._lock:
+            return {
+                "worker_id": self.worker_id,
+                "started": self._dispatcher is not None,
+                "workers": self.workers,
+                "running": self.running,
+                "succeeded": self.succeeded,
+                "retried": self.retried,
+                "deferred": self.deferred,
+                "failed": self.failed,
+                "lost": self.lost,
+                "job_types": sorted(self._handlers),
+            }
+
+    def _work(self, job_id: int):
+        try:
+            with Session(self._bind) as session:
+                job = session.get(Job, job_id)
+                self.run(session, job)
+        except Exception:
+            logger.exception("Job runner crashed on job %s", job_id)
+        finally:
+            self._slots.release()
+            self._wakeup.set()
+
+    def _dispatch(self):
+        while not self._stopping.is_set():
+            self._slots.acquire()
+            job = None
+            try:
+                with Session(self._bind) as session:
+                    job = self.claim(session)
+            except Exception:
+                logger.exception("Failed to claim a job")
+
+            if job is None:
+                self._slots.release()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+
+            self._executor.submit(self._work, job.id)
+
+    def start(self, bind: Engine):
+        """Start the dispatcher thread and worker pool"""
+        if self._dispatcher is not None:
+            return
+        self._bind = bind
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        self._dispatcher = threading.Thread(target=self._dispatch, name="job-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self, wait: bool = True):
+        """Stop dispatching; running jobs finish (or are re-leased after a crash)"""
+        if self._dispatcher is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        self._slots.release()
+        self._dispatcher.join(timeout=5)
+        self._executor.shutdown(wait=wait)
+        self._dispatcher = None
+        self._executor = None
+        self._slots = threading.Semaphore(self.workers)
+
+
+job_queue = JobQueue()
@@ -0,0 +1,152 @@
+"""Manifest index - addon manifests parsed once and kept in memory"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import yaml
+
+
+# Index settings
+MANIFEST_INDEX_CHECK_SECONDS = float(os.getenv("MANIFEST_INDEX_CHECK_SECONDS", "2"))  # 0 = check on every lookup
+
+ADDONS_DIR = Path(__file__).resolve().parents[3] / "addons"
+MANIFEST_FILE = "manifest.yaml"
+
+# libyaml's C loader when PyYAML was built with it (several times faster)
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+FileStamp = Tuple[int, int, int]  # (mtime_ns, size, inode)
+
+
+class ManifestIndex:
+    """name -> parsed manifest.yaml for every addon in a directory
+
+    Lookups are dictionary reads. At most every `check_seconds` a lookup
+    revalidates the index: one scandir of the addons directory plus a stat
+    per manifest, and only new or changed manifests are parsed again.
+    Manifests are shared between callers and must not be modified.
+    """
+
+    def __init__(self, addons_dir: Path = ADDONS_DIR, check_seconds: float = MANIFEST_INDEX_CHECK_SECONDS):
+        self.addons_dir = Path(addons_dir)
+        self.check_seconds = check_seconds
+        self._manifests: Dict[str, Dict[str, Any]] = {}
+        self._errors: Dict[str, Exception] = {}
+        self._stamps: Dict[str, FileStamp] = {}
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.version = 0  # Bumped whenever a manifest appears, changes or disappears
+        self.scans = 0
+        self.parses = 0
+
+    def _scan(self):
+        # Caller holds the lock
+        self.scans += 1
+        found: Dict[str, Tuple[Path, FileStamp]] = {}
+        try:
+            entries = list(os.scandir(self.addons_dir))
+        except FileNotFoundError:
+            entries = []
+        for entry in entries:
+            if entry.name.startswith("_") or not entry.is_dir():
+                continue
+            path = Path(entry.path) / MANIFEST_FILE
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            found[entry.name] = (path, (stat.st_mtime_ns, stat.st_size, stat.st_ino))
+
+        changed = set(self._stamps) - set(found)
+        for name in changed:
+            self._stamps.pop(name)
+            self._manifests.pop(name, None)
+            self._errors.pop(name, None)
+
+        for name, (path, stamp) in found.items():
+            if self._stamps.get(name) == stamp:
+                continue
+            changed.add(name)
+            self._stamps[name] = stamp
+            self.parses += 1
+            try:
+                with open(path, "rb") as f:
+                    manifest = yaml.load(f, Loader=YamlLoader) or {}
+            except (yaml.YAMLError, OSError) as exc:
+                self._manifests.pop(name, None)
+                self._errors[name] = exc
+                continue
+            self._errors.pop(name, None)
+            self._manifests[name] = manifest
+
+        if changed:
+            self.version += 1
+        self._checked_at = time.monotonic()
+
+    def _fresh(self):
+        with self._lock:
+            if self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds:
+                self._scan()
+
+    def refresh(self):
+        """Revalidate against the filesystem now"""
+        with self._lock:
+            self._scan()
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Parsed manifest of an addon (None if it has none; raises if it does not parse)"""
+        self._fresh()
+        manifest = self._manifests.get(name)
+        if manifest is None and name in self._errors:
+            raise self._errors[name]
+        return manifest
+
+    def names(self) -> List[str]:
+        """Addons with a manifest, sorted"""
+        self._fresh()
+        return sorted(set(self._manifests) | set(self._errors))
+
+    def manifests(self) -> Dict[str, Dict[str, Any]]:
+        """Every parsed manifest (a snapshot of the index)"""
+        self._fresh()
+        with self._lock:
+            return dict(self._manifests)
+
+    def snapshot(self) -> Tuple[int, Dict[str, Dict[str, Any]]]:
+        """(version, manifests) taken together"""
+        self._fresh()
+        with self._lock:
+            return self.version, dict(self._manifests)
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and work counters"""
+        with self._lock:
+            return {
+                "addons_dir": str(self.addons_dir),
+                "manifests": len(self._manifests),
+                "errors": len(self._errors),
+                "version": self.version,
+                "scans": self.scans,
+                "parses": self.parses,
+                "check_seconds": self.check_seconds,
+                "c_loader": YamlLoader is not yaml.SafeLoader,
+            }
+
+
+_indexes: Dict[Path, ManifestIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_manifest_index(addons_dir: Path = ADDONS_DIR) -> ManifestIndex:
+    """Shared index of an addons directory (one per directory and process)"""
+    key = Path(addons_dir).resolve()
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = ManifestIndex(key)
+        return index
+
+
+manifest_index = get_manifest_index()
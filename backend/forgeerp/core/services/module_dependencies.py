@@ -0,0 +1,110 @@
+"""Module dependency edges - the manifest graph stored in SQL for fleet-wide queries"""
+
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, exists
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.module import ClientModule, Module, ModuleDependency
+from forgeerp.core.services.module_graph import DependencyGraph
+
+
+def sync_module_dependencies(
+    session: Session,
+    graph: DependencyGraph,
+    module_ids: Optional[Dict[str, int]] = None
+) -> Dict[str, int]:
+    """Make module_dependencies match the graph for modules with a manifest (caller commits)
+
+    `module_ids` (name -> id) limits the sync to those modules; by default
+    every row of modules is synced. Returns counts of added, updated and
+    removed edges.
+    """
+    if module_ids is None:
+        module_ids = {name: module_id for module_id, name in session.exec(select(Module.id, Module.name)).all()}
+    module_ids = {name: module_id for name, module_id in module_ids.items() if name in graph}
+    counts = {"added": 0, "updated": 0, "removed": 0}
+    if not module_ids:
+        return counts
+
+    existing: Dict[int, Dict[str, ModuleDependency]] = {module_id: {} for module_id in module_ids.values()}
+    statement = select(ModuleDependency).where(ModuleDependency.module_id.in_(list(module_ids.values())))
+    for edge in session.exec(statement).all():
+        existing[edge.module_id][edge.depends_on] = edge
+
+    stale: List[int] = []
+    for name, module_id in module_ids.items():
+        current = existing[module_id]
+        for depends_on, is_direct in graph.edges(name).items():
+            edge = current.pop(depends_on, None)
+            if edge is None:
+                session.add(ModuleDependency(module_id=module_id, depends_on=depends_on, is_direct=is_direct))
+                counts["added"] += 1
+            elif edge.is_direct != is_direct:
+                edge.is_direct = is_direct
+                session.add(edge)
+                counts["updated"] += 1
+        stale.extend(edge.id for edge in current.values())
+
+    if stale:
+        session.execute(delete(ModuleDependency).where(ModuleDependency.id.in_(stale)))
+        counts["removed"] = len(stale)
+    return counts
+
+
+def clients_depending_on(session: Session, module_name: str, direct_only: bool = False) -> List[Dict[str, Any]]:
+    """Active installs, fleet-wide, of modules that need `module_name` (one indexed query)"""
+    statement = (
+        select(Client.id, Client.code, Module.name, ModuleDependency.is_direct)
+        .select_from(ModuleDependency)
+        .join(Module, Module.id == ModuleDependency.module_id)
+        .join(ClientModule, ClientModule.module_id == Module.id)
+        .join(Client, Client.id == ClientModule.client_id)
+        .where(
+            ModuleDependency.depends_on == module_name,
+            ClientModule.is_active == True
+        )
+        .order_by(Client.id, Module.name)
+    )
+    if direct_only:
+        statement = statement.where(ModuleDependency.is_direct == True)
+
+    clients: Dict[int, Dict[str, Any]] = {}
+    for client_id, client_code, name, is_direct in session.exec(statement).all():
+        entry = clients.setdefault(client_id, {"client_id": client_id, "client_code": client_code, "modules": []})
+        entry["modules"].append({"name": name, "is_direct": is_direct})
+    return list(clients.values())
+
+
+def missing_dependencies(session: Session, client_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Active installs whose dependencies are not active for the same client (one indexed query)"""
+    provider = aliased(ClientModule)
+    provider_module = aliased(Module)
+    installed = (
+        exists()
+        .where(
+            provider.client_id == ClientModule.client_id,
+            provider.is_active == True,
+            provider.module_id == provider_module.id,
+            provider_module.name == ModuleDependency.depends_on
+        )
+    )
+    statement = (
+        select(ClientModule.client_id, Module.name, ModuleDependency.depends_on)
+        .select_from(ClientModule)
+        .join(Module, Module.id == ClientModule.module_id)
+        .join(ModuleDependency, ModuleDependency.module_id == Module.id)
+        .where(ClientModule.is_active == True, ~installed)
+        .order_by(ClientModule.client_id, Module.name, ModuleDependency.depends_on)
+    )
+    if client_id is not None:
+        statement = statement.where(ClientModule.client_id == client_id)
+
+    installs: Dict[tuple, Dict[str, Any]] = {}
+    for install_client_id, name, depends_on in session.exec(statement).all():
+        entry = installs.setdefault(
+            (install_client_id, name),
+            {"client_id": install_client_id, "module": name, "missing": []}
+        )
+        entry["missing"].append(depends_on)
+    return list(installs.values())
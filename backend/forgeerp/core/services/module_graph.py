@@ -0,0 +1,234 @@
+"""Module dependency graph - transitive dependencies, install plans and reverse lookups"""
+
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from forgeerp.core.services.manifest_index import ManifestIndex
+
+
+class DependencyError(ValueError):
+    """Base error for dependency resolution"""
+
+
+class UnknownModuleError(DependencyError):
+    """Raised for a module that has no manifest"""
+
+    def __init__(self, module: str):
+        super().__init__(f"Unknown module: {module}")
+        self.module = module
+
+
+class MissingDependencyError(DependencyError):
+    """Raised when a module (transitively) depends on modules without a manifest"""
+
+    def __init__(self, module: str, missing: List[str]):
+        super().__init__(f"Module {module} has missing dependencies: {', '.join(missing)}")
+        self.module = module
+        self.missing = missing
+
+
+class DependencyCycleError(DependencyError):
+    """Raised when a module is in, or depends on, a dependency cycle"""
+
+    def __init__(self, module: str, cycle: List[str]):
+        super().__init__(f"Module {module} is in a dependency cycle: {' -> '.join(cycle + cycle[:1])}")
+        self.module = module
+        self.cycle = cycle
+
+
+def manifest_depends(manifest: Optional[Dict[str, Any]]) -> List[str]:
+    """Direct dependencies declared by a manifest"""
+    depends = (manifest or {}).get("depends") or []
+    if isinstance(depends, str):
+        depends = [depends]
+    return sorted({str(name) for name in depends})
+
+
+class DependencyGraph:
+    """DAG over every module manifest, with all closures computed up front
+
+    Strongly connected components are found once (iterative Tarjan), which
+    also yields a topological order with dependencies first. Transitive
+    dependencies are memoized per component in that order and inverted into
+    transitive dependents, so every query after construction is a lookup.
+    Modules in or above a cycle, or above a missing dependency, raise on
+    queries that would need a complete closure.
+    """
+
+    def __init__(self, depends: Dict[str, List[str]]):
+        self.depends = {name: sorted(set(deps)) for name, deps in depends.items()}
+        self.missing: Dict[str, List[str]] = {
+            name: [dep for dep in deps if dep not in self.depends]
+            for name, deps in self.depends.items()
+            if any(dep not in self.depends for dep in deps)
+        }
+        self.order: List[str] = []
+        self.cycles: List[List[str]] = []
+        self._position: Dict[str, int] = {}
+        self._closure: Dict[str, FrozenSet[str]] = {}
+        self._dependents: Dict[str, FrozenSet[str]] = {}
+        self._direct_dependents: Dict[str, FrozenSet[str]] = {}
+        self._cycle_of: Dict[str, List[str]] = {}  # Module -> a cycle it is in or depends on
+        self._missing_below: Dict[str, List[str]] = {}  # Module -> missing modules it needs
+        self._build()
+
+    @classmethod
+    def from_manifests(cls, manifests: Dict[str, Dict[str, Any]]) -> "DependencyGraph":
+        """Graph of a name -> manifest mapping"""
+        return cls({name: manifest_depends(manifest) for name, manifest in manifests.items()})
+
+    def _components(self) -> List[List[str]]:
+        # Iterative Tarjan; components come out dependencies first
+        index: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        on_stack: Set[str] = set()
+        stack: List[str] = []
+        components: List[List[str]] = []
+        counter = 0
+
+        for root in sorted(self.depends):
+            if root in index:
+                continue
+            work: List[Tuple[str, int]] = [(root, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                edges = [dep for dep in self.depends[node] if dep in self.depends]
+                if child < len(edges):
+                    work.append((node, child + 1))
+                    dep = edges[child]
+                    if dep not in index:
+                        work.append((dep, 0))
+                    elif dep in on_stack:
+                        low[node] = min(low[node], index[dep])
+                    continue
+                # All children done: propagate low-link to the parent
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+        return components
+
+    def _build(self):
+        closure_of: Dict[str, FrozenSet[str]] = {}
+        direct_dependents: Dict[str, Set[str]] = {name: set() for name in self.depends}
+
+        for component in self._components():
+            members = set(component)
+            cyclic = len(component) > 1 or component[0] in self.depends[component[0]]
+            if cyclic:
+                self.cycles.append(component)
+            reached: Set[str] = set(members) if cyclic else set()
+            cycle = component if cyclic else None
+            missing: Set[str] = set()
+            for member in component:
+                missing.update(self.missing.get(member, []))
+                for dep in self.depends[member]:
+                    if dep not in self.depends:
+                        continue
+                    direct_dependents[dep].add(member)
+                    if dep in members:
+                        continue
+                    reached.add(dep)
+                    reached.update(closure_of[dep])
+                    cycle = cycle or self._cycle_of.get(dep)
+                    missing.update(self._missing_below.get(dep, []))
+            closure = frozenset(reached)
+            for member in component:
+                self._position[member] = len(self.order)
+                self.order.append(member)
+                closure_of[member] = closure if cyclic else closure - {member}
+                if cycle:
+                    self._cycle_of[member] = cycle
+                if missing:
+                    self._missing_below[member] = sorted(missing)
+
+        self._closure = closure_of
+        dependents: Dict[str, Set[str]] = {name: set() for name in self.depends}
+        for name, closure in closure_of.items():
+            for dep in closure:
+                if dep != name:
+                    dependents[dep].add(name)
+        self._dependents = {name: frozenset(names) for name, names in dependents.items()}
+        self._direct_dependents = {name: frozenset(names) for name, names in direct_dependents.items()}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.depends
+
+    def _check(self, name: str):
+        if name not in self.depends:
+            raise UnknownModuleError(name)
+        if name in self._cycle_of:
+            raise DependencyCycleError(name, self._cycle_of[name])
+        if name in self._missing_below:
+            raise MissingDependencyError(name, self._missing_below[name])
+
+    def _sorted(self, names: Iterable[str]) -> List[str]:
+        return sorted(names, key=self._position.__getitem__)
+
+    def dependencies(self, name: str, transitive: bool = True) -> List[str]:
+        """Modules `name` needs, dependencies first"""
+        self._check(name)
+        return self._sorted(self._closure[name]) if transitive else list(self.depends[name])
+
+    def dependents(self, name: str, transitive: bool = True) -> FrozenSet[str]:
+        """Modules that need `name` (directly or through others)"""
+        if name not in self.depends:
+            raise UnknownModuleError(name)
+        return self._dependents[name] if transitive else self._direct_dependents[name]
+
+    def install_plan(self, names: Iterable[str], installed: Iterable[str] = ()) -> List[str]:
+        """Modules to install, in order, so `names` and everything they need are present"""
+        needed: Set[str] = set()
+        for name in names:
+            self._check(name)
+            needed.add(name)
+            needed.update(self._closure[name])
+        return self._sorted(needed - set(installed))
+
+    def uninstall_impact(self, name: str, installed: Iterable[str]) -> List[str]:
+        """Installed modules that break if `name` is uninstalled"""
+        return self._sorted(self.dependents(name) & set(installed))
+
+    def edges(self, name: str) -> Dict[str, bool]:
+        """Everything `name` needs -> whether it is a direct dependency (never raises for broken closures)
+
+        Missing modules are included, so stored edges can report them.
+        """
+        if name not in self.depends:
+            raise UnknownModuleError(name)
+        edges = {dep: False for dep in self._closure[name] if dep != name}
+        edges.update({dep: False for dep in self._missing_below.get(name, [])})
+        edges.update({dep: True for dep in self.depends[name]})
+        return edges
+
+    def problems(self) -> Dict[str, Any]:
+        """Cycles and missing dependencies across all manifests"""
+        return {"cycles": self.cycles, "missing": self.missing}
+
+
+_graphs: Dict[int, Tuple[int, DependencyGraph]] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_dependency_graph(index: ManifestIndex) -> DependencyGraph:
+    """Graph of an index's manifests, rebuilt only when a manifest changed"""
+    version, manifests = index.snapshot()  # Revalidates the index when due
+    with _graphs_lock:
+        cached = _graphs.get(id(index))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        graph = DependencyGraph.from_manifests(manifests)
+        _graphs[id(index)] = (version, graph)
+        return graph
@@ -1,53 +1,144 @@
 """Module loader service"""
 
-import os
-import yaml
+import json
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional
 from sqlmodel import Session, select
 from forgeerp.core.database.models.module import Module, ClientModule
+from forgeerp.core.services.manifest_index import ADDONS_DIR, get_manifest_index
+from forgeerp.core.services.module_dependencies import sync_module_dependencies
+from forgeerp.core.services.module_graph import DependencyGraph, get_dependency_graph
 
 
 class ModuleLoader:
     """Service for loading and managing modules"""
     
     def __init__(self, addons_dir: Optional[Path] = None):
-        self.addons_dir = Path(addons_dir) if addons_dir else Path(__file__).parent.parent.parent.parent.parent / "backend" / "addons"
+        self.addons_dir = Path(addons_dir) if addons_dir else ADDONS_DIR
+        # Manifests come from the shared in-memory index of this directory
+        self.index = get_manifest_index(self.addons_dir)
     
     def load_module_manifest(self, module_name: str) -> Dict[str, Any]:
-        """Load module manifest (manifest.yaml)"""
-        module_path = self.addons_dir / module_name
-        manifest_path = module_path / "manifest.yaml"
-        
-        if not manifest_path.exists():
+        """Load module manifest (manifest.yaml), read-only"""
+        manifest = self.index.get(module_name)
+        if manifest is None:
             raise FileNotFoundError(f"Module {module_name} not found or manifest.yaml missing")
-        
-        with open(manifest_path, "r") as f:
-            manifest = yaml.safe_load(f)
-        
         return manifest
     
     def get_available_modules(self) -> List[str]:
         """Get list of available modules"""
-        if not self.addons_dir.exists():
-            return []
+        return self.index.names()
+    
+    def dependency_graph(self) -> DependencyGraph:
+        """Dependency graph of all manifests (rebuilt only when one changes)"""
+        return get_dependency_graph(self.index)
+    
+    def get_module_dependencies(self, module_name: str, transitive: bool = False) -> List[str]:
+        """Get module dependencies (raises DependencyError for unknown, cyclic or missing ones)"""
+        return self.dependency_graph().dependencies(module_name, transitive=transitive)
+    
+    def installed_module_names(self, session: Session, client_id: int) -> List[str]:
+        """Names of the modules active for a client"""
+        statement = (
+            select(Module.name)
+            .join(ClientModule, ClientModule.module_id == Module.id)
+            .where(
+                ClientModule.client_id == client_id,
+                ClientModule.is_active == True
+            )
+        )
+        return list(session.exec(statement).all())
+    
+    def install_plan(
+        self,
+        session: Session,
+        module_names: Iterable[str],
+        client_id: Optional[int] = None
+    ) -> List[str]:
+        """Modules to install, dependencies first (without the client's active ones)"""
+        installed = self.installed_module_names(session, client_id) if client_id else []
+        return self.dependency_graph().install_plan(module_names, installed)
+    
+    def install_modules(
+        self,
+        session: Session,
+        module_names: Iterable[str],
+        client_id: Optional[int] = None
+    ) -> List[Module]:
+        """Install modules and all their dependencies in one transaction
         
-        modules = []
-        for item in self.addons_dir.iterdir():
-            if item.is_dir() and not item.name.startswith("_"):
-                manifest_path = item / "manifest.yaml"
-                if manifest_path.exists():
-                    modules.append(item.name)
+        Returns the Module rows of the plan, dependencies first, with their
+        module_dependencies edges in sync. Nothing is written when the plan
+        cannot be resolved or any insert fails.
+        """
+        graph = self.dependency_graph()
+        module_names = list(module_names)
+        plan = graph.install_plan(module_names)
         
-        return modules
+        try:
+            # Existing rows of the whole plan in one query each
+            modules = {
+                module.name: module
+                for module in session.exec(select(Module).where(Module.name.in_(plan))).all()
+            }
+            for name in plan:
+                module = modules.get(name)
+                if module is None:
+                    manifest = self.load_module_manifest(name)
+                    depends = graph.dependencies(name, transitive=False)
+                    module = Module(
+                        name=name,
+                        display_name=manifest.get("name", name),
+                        description=manifest.get("description"),
+                        category=manifest.get("category", "addon"),
+                        depends_on=json.dumps(depends) if depends else None,
+                        is_active=True,
+                        is_installed=True
+                    )
+                    modules[name] = module
+                elif not module.is_installed:
+                    module.is_installed = True
+                session.add(module)
+            session.flush()  # Assigns ids to new modules
+            sync_module_dependencies(session, graph, {name: modules[name].id for name in plan})
+            
+            if client_id:
+                module_ids = [modules[name].id for name in plan]
+                existing = {
+                    client_module.module_id: client_module
+                    for client_module in session.exec(
+                        select(ClientModule).where(
+                            ClientModule.client_id == client_id,
+                            ClientModule.module_id.in_(module_ids)
+                        )
+                    ).all()
+                }
+                for module_id in module_ids:
+                    client_module = existing.get(module_id)
+                    if client_module is None:
+                        session.add(ClientModule(client_id=client_id, module_id=module_id, is_active=True))
+                    elif not client_module.is_active:
+                        client_module.is_active = True
+                        session.add(client_module)
+            
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        
+        # Reload the committed rows in one query instead of a refresh per module
+        modules = {module.name: module for module in session.exec(select(Module).where(Module.name.in_(plan))).all()}
+        return [modules[name] for name in plan]
     
-    def get_module_dependencies(self, module_name: str) -> List[str]:
-        """Get module dependencies"""
+    def sync_dependencies(self, session: Session) -> Dict[str, int]:
+        """Rebuild the module_dependencies edges of every module from the manifests"""
         try:
-            manifest = self.load_module_manifest(module_name)
-            return manifest.get("depends", [])
+            counts = sync_module_dependencies(session, self.dependency_graph())
+            session.commit()
         except Exception:
-            return []
+            session.rollback()
+            raise
+        return counts
     
     def install_module_in_database(
         self,
@@ -55,43 +146,9 @@ class ModuleLoader:
         module_name: str,
         client_id: Optional[int] = None
     ) -> Module:
-        """Install module in database"""
-        # Check if module already exists
-        statement = select(Module).where(Module.name == module_name)
-        existing_module = session.exec(statement).first()
-        
-        if existing_module:
-            return existing_module
-        
-        # Load manifest
-        manifest = self.load_module_manifest(module_name)
-        
-        # Create module
-        module = Module(
-            name=module_name,
-            display_name=manifest.get("name", module_name),
-            description=manifest.get("description"),
-            category=manifest.get("category", "addon"),
-            depends_on=str(manifest.get("depends", [])) if manifest.get("depends") else None,
-            is_active=True,
-            is_installed=True
-        )
-        
-        session.add(module)
-        session.commit()
-        session.refresh(module)
-        
-        # If client_id provided, install for client
-        if client_id:
-            client_module = ClientModule(
-                client_id=client_id,
-                module_id=module.id,
-                is_active=True
-            )
-            session.add(client_module)
-            session.commit()
-        
-        return module
+        """Install module in database (with its dependencies)"""
+        modules = self.install_modules(session, [module_name], client_id=client_id)
+        return next(module for module in modules if module.name == module_name)
     
     def get_installed_modules_for_client(
         self,
@@ -99,17 +156,15 @@ class ModuleLoader:
         client_id: int
     ) -> List[Module]:
         """Get installed modules for a client"""
-        statement = select(ClientModule).where(
-            ClientModule.client_id == client_id,
-            ClientModule.is_active == True
+        statement = (
+            select(Module)
+            .join(Module.client_modules)
+            .where(
+                ClientModule.client_id == client_id,
+                ClientModule.is_active == True
+            )
         )
-        client_modules = session.exec(statement).all()
-        
-        modules = []
-        for cm in client_modules:
-            module = session.get(Module, cm.module_id)
-            if module:
-                modules.append(module)
-        
-        return modules
+        return list(session.exec(statement).all())
+
 
+module_loader = ModuleLoader()
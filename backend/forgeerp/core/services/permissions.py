@@ -0,0 +1,242 @@
+"""Permission engine - per-user compiled permission matrices"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+from sqlalchemy import event, false, inspect, true
+from sqlalchemy.orm import object_session
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.events import after_commit
+from forgeerp.core.database.models.permission import Permission
+from forgeerp.core.database.models.user import User
+
+
+logger = logging.getLogger(__name__)
+
+
+# Cache settings
+PERMISSION_CACHE_TTL_SECONDS = float(os.getenv("PERMISSION_CACHE_TTL_SECONDS", "60"))
+PERMISSION_CACHE_MAX_SIZE = int(os.getenv("PERMISSION_CACHE_MAX_SIZE", "1024"))
+
+# Roles resolved without reading the permissions table
+UNRESTRICTED_ROLES = ("superuser", "admin")
+READ_ONLY_ROLES = ("viewer",)
+
+Grant = Tuple[str, Optional[int], Optional[str]]
+
+# Matrix the auth dependency loaded for the current request: (user id, matrix)
+_request_matrix: ContextVar[Optional[Tuple[int, "PermissionMatrix"]]] = ContextVar("request_permission_matrix", default=None)
+
+
+class PermissionMatrix:
+    """A user's active Permission rows compiled into hash lookups
+
+    Each grant is (permission_type, client_id, environment), where a None
+    client_id or environment applies to every client or environment.
+    """
+
+    __slots__ = ("_grants", "_all_clients", "_clients")
+
+    def __init__(self, grants: Iterable[Grant]):
+        self._grants: FrozenSet[Grant] = frozenset(grants)
+        self._all_clients: Set[str] = set()
+        self._clients: Dict[str, Set[int]] = defaultdict(set)
+        for permission_type, client_id, _ in self._grants:
+            if client_id is None:
+                self._all_clients.add(permission_type)
+            else:
+                self._clients[permission_type].add(client_id)
+
+    def allows(
+        self,
+        permission_type: str,
+        client_id: Optional[int] = None,
+        environment: Optional[str] = None,
+    ) -> bool:
+        """O(1) check against the compiled grants"""
+        grants = self._grants
+        return (
+            (permission_type, None, None) in grants
+            or (permission_type, client_id, None) in grants
+            or (permission_type, None, environment) in grants
+            or (permission_type, client_id, environment) in grants
+        )
+
+    def client_scope(self, permission_type: str) -> Optional[FrozenSet[int]]:
+        """Client ids with any grant for the type, or None for all clients"""
+        if permission_type in self._all_clients:
+            return None
+        return frozenset(self._clients.get(permission_type, ()))
+
+    def __len__(self) -> int:
+        return len(self._grants)
+
+
+class PermissionEngine:
+    """Per-user TTL + LRU cache of compiled permission matrices"""
+
+    def __init__(
+        self,
+        ttl_seconds: float = PERMISSION_CACHE_TTL_SECONDS,
+        max_size: int = PERMISSION_CACHE_MAX_SIZE,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, Tuple[float, PermissionMatrix]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def uses_matrix(user: User) -> bool:
+        """Whether checks for this user read the permissions table"""
+        return not (
+            user.is_superuser
+            or user.role in UNRESTRICTED_ROLES
+            or user.role in READ_ONLY_ROLES
+        )
+
+    def get(self, user_id: int) -> Optional[PermissionMatrix]:
+        """Get a cached matrix, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def load(self, session: Session, user_id: int) -> PermissionMatrix:
+        """Compile a user's active permissions with a single query and cache them"""
+        statement = select(
+            Permission.permission_type,
+            Permission.client_id,
+            Permission.environment,
+        ).where(Permission.user_id == user_id, Permission.is_active == True)
+        matrix = PermissionMatrix(session.exec(statement).all())
+
+        with self._lock:
+            self.loads += 1
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, matrix)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return matrix
+
+    def matrix_for(self, user: User, session: Optional[Session] = None) -> PermissionMatrix:
+        """Matrix for a user: the one loaded for this request, else cached, else compiled
+
+        Request handlers load the matrix through their AsyncSession (see
+        load_async), and it stays with the request, so an expiry or eviction
+        of the cache entry mid-request cannot turn into a denial. Outside a
+        request, without a usable sync session a miss fails closed: the user
+        gets no grants and nothing is cached.
+        """
+        loaded = _request_matrix.get()
+        if loaded is not None and loaded[0] == user.id:
+            return loaded[1]
+        matrix = self.get(user.id)
+        if matrix is not None:
+            return matrix
+
+        session = session or object_session(user)
+        if session is None or session.get_bind().dialect.is_async:
+            # Detached (principal cache) or owned by an AsyncSession: never block the event loop
+            logger.warning("Permission matrix for user %s not loaded; denying", user.id)
+            return PermissionMatrix(())
+        return self.load(session, user.id)
+
+    async def load_async(self, session: AsyncSession, user: User) -> Optional[PermissionMatrix]:
+        """Load a user's matrix through the request's AsyncSession unless it is cached
+
+        The matrix is kept for the rest of the request (see matrix_for).
+        """
+        if not self.uses_matrix(user):
+            return None
+        matrix = self.get(user.id)
+        if matrix is None:
+            matrix = await session.run_sync(self.load, user.id)
+        _request_matrix.set((user.id, matrix))
+        return matrix
+
+    def client_scope(
+        self,
+        user: User,
+        permission_type: str,
+        session: Optional[Session] = None,
+    ) -> Optional[FrozenSet[int]]:
+        """Client ids the user holds permission_type on, or None for all clients"""
+        if user.is_superuser or user.role in UNRESTRICTED_ROLES:
+            return None
+        if user.role in READ_ONLY_ROLES:
+            return frozenset()
+        return self.matrix_for(user, session).client_scope(permission_type)
+
+    def scope_clause(
+        self,
+        user: User,
+        permission_type: str,
+        column,
+        session: Optional[Session] = None,
+    ):
+        """SQL filter on a client_id column restricting rows to the user's scope"""
+        scope = self.client_scope(user, permission_type, session)
+        if scope is None:
+            return true()
+        if not scope:
+            return false()
+        return column.in_(scope)
+
+    def invalidate(self, *user_ids: int):
+        """Drop cached matrices for the given users"""
+        with self._lock:
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.loads = self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters and hit rate"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "loads": self.loads,
+                "invalidations": self.invalidations,
+            }
+
+
+permission_engine = PermissionEngine()
+
+
+@event.listens_for(Permission, "after_insert")
+@event.listens_for(Permission, "after_update")
+@event.listens_for(Permission, "after_delete")
+def _invalidate_permissions(mapper, connection, target: Permission):
+    """Invalidate the owner's matrix on any ORM change to a permission, once committed"""
+    # Also drop the previous owner if the grant was reassigned
+    previous = inspect(target).attrs.user_id.history.deleted
+    session = object_session(target)
+    if session is None:
+        permission_engine.invalidate(target.user_id, *previous)
+        return
+    after_commit(session, permission_engine.invalidate, target.user_id, *previous)
@@ -0,0 +1,112 @@
+"""Principal cache - in-process TTL/LRU cache of authenticated users"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import object_session
+from forgeerp.core.database.events import after_commit
+from forgeerp.core.database.models.user import User
+
+
+# Cache settings
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "1024"))
+
+
+class PrincipalCache:
+    """TTL + LRU cache of users keyed by the token subject (username)
+
+    Entries are stored as plain field snapshots; every hit returns a new,
+    session-less User so cached principals are never shared between requests.
+    The TTL bounds staleness for changes made by other processes.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = PRINCIPAL_CACHE_TTL_SECONDS,
+        max_size: int = PRINCIPAL_CACHE_MAX_SIZE,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, username: str) -> Optional[User]:
+        """Get a cached user, or None on miss/expiry"""
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, data = entry
+            if expires_at <= time.monotonic():
+                del self._entries[username]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(username)
+            self.hits += 1
+
+        return User(**data)
+
+    def set(self, username: str, user: User):
+        """Cache a user snapshot"""
+        data = user.model_dump()
+        with self._lock:
+            self._entries[username] = (time.monotonic() + self.ttl_seconds, data)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *usernames: str):
+        """Drop cached entries for the given usernames"""
+        with self._lock:
+            for username in usernames:
+                if self._entries.pop(username, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters and hit rate"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_principal(mapper, connection, target: User):
+    """Invalidate on any ORM change to a user (update, deactivate, lock, delete), once committed"""
+    # Also drop the previous username if it was renamed
+    previous = inspect(target).attrs.username.history.deleted
+    session = object_session(target)
+    if session is None:
+        principal_cache.invalidate(target.username, *previous)
+        return
+    after_commit(session, principal_cache.invalidate, target.username, *previous)
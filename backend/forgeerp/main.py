@@ -6,7 +6,26 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-from forgeerp.core.database.database import create_db_and_tables
+from sqlmodel import Session
+from forgeerp.core.database.database import (
+    engine,
+    create_db_and_tables,
+    dispose_async_engine,
+    get_database_pool_stats,
+)
+from forgeerp.core.services.principal_cache import principal_cache
+from forgeerp.core.services.permissions import permission_engine
+from forgeerp.core.services.github_permissions import collaborator_permissions
+from forgeerp.core.engine.github_generator.registry import template_registry
+from forgeerp.core.services.manifest_index import manifest_index
+from forgeerp.core.services.module_loader import module_loader
+from forgeerp.core.services.password_hasher import password_hasher
+from forgeerp.core.services.job_queue import job_queue
+from forgeerp.core.services.github_client import (
+    close_github_client,
+    github_transport,
+    start_github_client,
+)
 from forgeerp.core.api.routes import (
     auth_router,
     clients_router,
@@ -14,6 +33,7 @@ from forgeerp.core.api.routes import (
     configurations_router,
     github_router,
     environments_router,
+    jobs_router,
 )
 
 app = FastAPI(
@@ -39,6 +59,7 @@ app.include_router(environments_router, prefix="/api/v1")
 app.include_router(modules_router, prefix="/api/v1")
 app.include_router(configurations_router, prefix="/api/v1")
 app.include_router(github_router, prefix="/api/v1")
+app.include_router(jobs_router, prefix="/api/v1")
 
 
 @app.get("/health")
@@ -47,6 +68,40 @@ async def health():
     return {"status": "healthy", "service": "forgeerp"}
 
 
+@app.get("/health/database")
+async def health_database():
+    """Database connection pool statistics"""
+    return {"status": "healthy", "pools": get_database_pool_stats()}
+
+
+@app.get("/health/cache")
+async def health_cache():
+    """In-process cache statistics"""
+    return {
+        "status": "healthy",
+        "caches": {
+            "principal": principal_cache.stats(),
+            "permissions": permission_engine.stats(),
+            "github_permissions": collaborator_permissions.stats(),
+            "templates": template_registry.stats(),
+            "manifests": manifest_index.stats(),
+        },
+    }
+
+
+@app.get("/health/workers")
+async def health_workers():
+    """Worker pool statistics"""
+    return {
+        "status": "healthy",
+        "pools": {
+            "password_hasher": password_hasher.stats(),
+            "jobs": job_queue.stats(),
+            "github": github_transport.stats(),
+        },
+    }
+
+
 # Serve static files (frontend build) - must be after API routes
 # When running from /app/backend, static is at /app/static
 static_dir = Path("/app/static") if Path("/app/static").exists() else Path(__file__).parent.parent.parent / "static"
@@ -87,8 +142,21 @@ else:
 
 @app.on_event("startup")
 def on_startup():
-    """Initialize database on startup"""
+    """Initialize database, GitHub client and job runner on startup"""
     create_db_and_tables()
+    with Session(engine) as session:
+        module_loader.sync_dependencies(session)  # Manifests may have changed since the last run
+    start_github_client()
+    job_queue.start(engine)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop workers and close database connections on shutdown"""
+    job_queue.stop()
+    close_github_client()
+    await dispose_async_engine()
+    password_hasher.shutdown()
 
 
 @app.exception_handler(Exception)
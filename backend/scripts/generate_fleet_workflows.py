@@ -0,0 +1,60 @@
+"""Generate GitHub workflows for the whole client fleet in parallel
+
+Each client is written to <output>/<client_code>/.github/workflows, with a
+progress line per finished chunk and a summary at the end.
+
+Usage:
+    python scripts/generate_fleet_workflows.py --output /tmp/forgeerp-fleet --workers 8
+    python scripts/generate_fleet_workflows.py --client acme --client racco
+    python scripts/generate_fleet_workflows.py --module hetzner --json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlmodel import Session
+from forgeerp.core.database.database import engine
+from forgeerp.core.engine.github_generator.fleet import FLEET_OUTPUT_DIR, FLEET_WORKERS, generate_fleet, load_fleet
+
+
+def print_progress(update):
+    for result in update["results"]:
+        if result.get("error"):
+            print(f"  ✗ {result['client_code']}: {result['error']}", flush=True)
+    print(f"[{update['done']}/{update['total']}] {update['failed']} failed", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate workflows for every client")
+    parser.add_argument("--output", default=FLEET_OUTPUT_DIR, help="Root of the per-client trees")
+    parser.add_argument("--workers", type=int, default=FLEET_WORKERS, help="Processes (0 = one per CPU)")
+    parser.add_argument("--client", action="append", dest="clients", help="Client code (repeatable)")
+    parser.add_argument("--module", help="Only clients with this module installed")
+    parser.add_argument("--include-inactive", action="store_true", help="Also inactive clients")
+    parser.add_argument("--json", action="store_true", help="Print the summary as JSON")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        items = load_fleet(session, args.clients, args.module, args.include_inactive)
+
+    print(f"Generating workflows for {len(items)} clients into {args.output}", flush=True)
+    report = generate_fleet(items, args.output, args.workers, progress=None if args.json else print_progress)
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+    else:
+        print(
+            f"\n{report.succeeded}/{report.total} clients in {report.elapsed_seconds:.2f}s "
+            f"on {report.workers} workers: {report.written} written, {report.skipped} unchanged, "
+            f"{report.removed} removed, {report.up_to_date} clients up to date, {report.failed} failed"
+        )
+    sys.exit(1 if report.failed else 0)
+
+
+if __name__ == "__main__":
+    main()
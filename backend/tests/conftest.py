@@ -2,37 +2,106 @@
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
-from sqlmodel.pool import StaticPool
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from forgeerp.main import app
-from forgeerp.core.database.database import get_session
+from forgeerp.core.database.database import (
+    get_session,
+    get_async_session,
+    create_database_engine,
+    create_async_database_engine,
+)
 from forgeerp.core.database.models.user import User
 from forgeerp.core.services.authentication import get_password_hash
+from forgeerp.core.services.permissions import permission_engine
+from forgeerp.core.services.principal_cache import principal_cache
+from forgeerp.core.services import github_client
+from forgeerp.core.services.github_client import close_github_client, get_github_service
+from forgeerp.core.services.github_permissions import collaborator_permissions
+from tests.fake_github import FakeGitHub
+
+
+@pytest.fixture(name="database_path")
+def database_path_fixture(tmp_path):
+    """Path of the test database file (shared by sync and async engines)"""
+    return tmp_path / "forgeerp-test.db"
+
+
+@pytest.fixture(name="engine")
+def engine_fixture(database_path):
+    """Create a test database engine"""
+    engine = create_database_engine(f"sqlite:///{database_path}")
+    SQLModel.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(engine, database_path):
+    """Create a test async database engine on the same database"""
+    return create_async_database_engine(
+        f"sqlite+aiosqlite:///{database_path}",
+        poolclass=NullPool,
+    )
+
+
+class QueryCounter:
+    """Records SQL statements executed on the test engines"""
+    
+    def __init__(self):
+        self.statements = []
+    
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+    
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+    
+    def reset(self):
+        self.statements.clear()
+
+
+@pytest.fixture(name="query_counter")
+def query_counter_fixture(engine, async_engine):
+    """Count queries (sync and async) to catch N+1 regressions"""
+    counter = QueryCounter()
+    engines = [engine, async_engine.sync_engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", counter)
+    yield counter
+    for target in engines:
+        event.remove(target, "before_cursor_execute", counter)
 
 
 @pytest.fixture(name="session")
-def session_fixture():
+def session_fixture(engine):
     """Create a test database session"""
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    SQLModel.metadata.create_all(engine)
+    permission_engine.clear()
     with Session(engine) as session:
         yield session
+    permission_engine.clear()
 
 
 @pytest.fixture(name="client")
-def client_fixture(session: Session):
+def client_fixture(session: Session, async_engine):
     """Create a test client"""
     def get_session_override():
         return session
     
+    async def get_async_session_override():
+        async with AsyncSession(async_engine, expire_on_commit=False) as async_session:
+            yield async_session
+    
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_async_session] = get_async_session_override
+    principal_cache.clear()
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
+    principal_cache.clear()
 
 
 @pytest.fixture(name="admin_user")
@@ -92,3 +161,22 @@ def auth_headers_user_fixture(client: TestClient, regular_user: User):
     token = response.json()["access_token"]
     return {"Authorization": f"Bearer {token}"}
 
+
+@pytest.fixture(name="fake_github")
+def fake_github_fixture():
+    """Local fake GitHub API server"""
+    fake = FakeGitHub().start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture(name="github_service")
+def github_service_fixture(fake_github, monkeypatch):
+    """Shared GitHubService pointed at the fake GitHub server"""
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+    monkeypatch.setattr(github_client, "GITHUB_API_URL", fake_github.url)
+    close_github_client()
+    collaborator_permissions.clear()
+    yield get_github_service()
+    close_github_client()
+    collaborator_permissions.clear()
@@ -0,0 +1,136 @@
+"""Local fake of the GitHub REST API for tests"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FakeGitHub:
+    """Serves canned JSON responses over keep-alive HTTP/1.1 and records traffic
+
+    GETs carry an ETag and answer 304 to a matching If-None-Match, like GitHub.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], Tuple[int, Any, Dict[str, str]]] = {}
+        self.requests: List[Dict[str, Any]] = []
+        self.pulls: Dict[Tuple[str, str], Dict[int, Dict[str, Any]]] = {}
+        self.connections = set()
+        # Core rate limit, decremented by every response except 304s (None disables the headers)
+        self.rate_limit: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def set_rate_limit(self, remaining: int, limit: int = 5000, reset_in: int = 3600):
+        """Start sending X-RateLimit-* headers"""
+        self.rate_limit = {"limit": limit, "remaining": remaining, "reset": int(time.time()) + reset_in}
+
+    def add(self, method: str, path: str, body: Any, status: int = 200, headers: Optional[Dict[str, str]] = None):
+        """Register a response for a method and path (query string ignored)"""
+        self.routes[(method, path)] = (status, body, headers or {})
+
+    def add_pull(self, owner: str, repo: str, number: int, **fields):
+        """Register a pull request resource"""
+        pull = {
+            "number": number,
+            "url": f"{self.url}/repos/{owner}/{repo}/pulls/{number}",
+            "html_url": f"https://github.com/{owner}/{repo}/pull/{number}",
+            "title": f"PR {number}",
+            "body": "",
+            "state": "open",
+            "merged": False,
+            "merged_at": None,
+            "closed_at": None,
+            "updated_at": "2024-01-01T00:00:00Z",
+        }
+        pull.update(fields)
+        self.add("GET", f"/repos/{owner}/{repo}/pulls/{number}", pull)
+        self.pulls.setdefault((owner, repo), {})[number] = pull
+        # The list endpoint, sorted by updated (newest first) like sort=updated&direction=desc
+        pulls = self.pulls[(owner, repo)]
+        self.add("GET", f"/repos/{owner}/{repo}/pulls", lambda handler: (
+            200, sorted(pulls.values(), key=lambda p: p["updated_at"], reverse=True), {}
+        ))
+        return pull
+
+    def add_reviews(self, owner: str, repo: str, number: int, reviews: List[Dict[str, Any]]):
+        """Register the reviews of a pull request, given as (id, login, state) dicts"""
+        body = [
+            {
+                "id": review["id"],
+                "user": {"login": review["login"]},
+                "state": review["state"],
+                "body": review.get("body", ""),
+                "submitted_at": review.get("submitted_at", "2024-01-01T00:00:00Z"),
+            }
+            for review in reviews
+        ]
+        self.add("GET", f"/repos/{owner}/{repo}/pulls/{number}/reviews", body)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                path = self.path.split("?", 1)[0]
+                with fake._lock:
+                    fake.connections.add(self.client_address)
+                    fake.requests.append({
+                        "method": self.command,
+                        "path": path,
+                        "query": self.path.partition("?")[2],
+                        "headers": dict(self.headers),
+                        "body": body,
+                    })
+
+                status, payload, headers = fake.routes.get(
+                    (self.command, path), (404, {"message": "Not Found"}, {})
+                )
+                if callable(payload):
+                    status, payload, headers = payload(self)
+                data = json.dumps(payload).encode() if payload is not None else b""
+                headers = dict(headers)
+                if self.command == "GET" and status == 200:
+                    headers.setdefault("ETag", f'W/"{hashlib.sha1(data).hexdigest()}"')
+                    if self.headers.get("If-None-Match") == headers["ETag"]:
+                        status, data = 304, b""
+                with fake._lock:
+                    if fake.rate_limit is not None:
+                        if status != 304:
+                            fake.rate_limit["remaining"] = max(fake.rate_limit["remaining"] - 1, 0)
+                        headers.setdefault("X-RateLimit-Limit", str(fake.rate_limit["limit"]))
+                        headers.setdefault("X-RateLimit-Remaining", str(fake.rate_limit["remaining"]))
+                        headers.setdefault("X-RateLimit-Reset", str(fake.rate_limit["reset"]))
+                        headers.setdefault("X-RateLimit-Resource", "core")
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
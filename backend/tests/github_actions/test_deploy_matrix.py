@@ -0,0 +1,132 @@
+"""Tests for the change-aware deploy matrix of deploy-client.yml"""
+
+import json
+import shutil
+import subprocess
+import pytest
+import yaml
+from forgeerp.core.engine.github_generator.workflows import GitHubWorkflowGenerator
+
+pytestmark = pytest.mark.skipif(shutil.which("jq") is None, reason="jq not installed")
+
+
+def git(repo, *args) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def commit(repo, files, message) -> str:
+    for path, content in files.items():
+        target = repo / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(content)
+    git(repo, "add", "-A")
+    git(repo, "commit", "-q", "-m", message)
+    return git(repo, "rev-parse", "HEAD")
+
+
+@pytest.fixture(name="deploy_workflow")
+def deploy_workflow_fixture():
+    generator = GitHubWorkflowGenerator()
+    data = generator.deploy_client_workflow_data({"client_name": "acme", "deploy_max_parallel": 2})
+    return yaml.safe_load(generator.render_workflow(data))
+
+
+@pytest.fixture(name="pushed_repo")
+def pushed_repo_fixture(github_repo_dir, tmp_path):
+    """Shallow checkout (as actions/checkout makes it) of three pushed commits"""
+    first = commit(github_repo_dir, {
+        "clients/acme/values-dev.yaml": "replicas: 1\n",
+        "clients/globex/values-prod.yaml": "replicas: 3\n",
+    }, "Initial")
+    commit(github_repo_dir, {
+        "clients/acme/values-dev.yaml": "replicas: 2\n",
+        "clients/globex/values-hml.yaml": "replicas: 1\n",
+        "README.md": "docs\n",
+    }, "Second")
+    last = commit(github_repo_dir, {"clients/globex/values-prod.yaml": "replicas: 4\n"}, "Third")
+    checkout = tmp_path / "checkout"
+    subprocess.run(
+        ["git", "clone", "-q", "--depth", "2", f"file://{github_repo_dir}", str(checkout)],
+        check=True, capture_output=True
+    )
+    return checkout, first, last
+
+
+def run_matrix(workflow, checkout, tmp_path, **env):
+    step = workflow["jobs"]["changes"]["steps"][1]
+    output = tmp_path / "github_output"
+    output.write_text("")
+    subprocess.run(
+        ["bash", "-c", step["run"]],
+        cwd=checkout, check=True, capture_output=True,
+        env={"PATH": "/usr/bin:/bin", "GITHUB_OUTPUT": str(output), "EVENT_NAME": "push",
+             "BEFORE": "", "SHA": "", "INPUT_CLIENT": "", "INPUT_ENVIRONMENT": "",
+             "DEFAULT_POLICY": step["env"]["DEFAULT_POLICY"], **env}
+    )
+    outputs = dict(line.split("=", 1) for line in output.read_text().splitlines())
+    return json.loads(outputs["matrix"])["include"], outputs["any"]
+
+
+def run_changes(workflow, checkout, tmp_path, **env):
+    include, any_changed = run_matrix(workflow, checkout, tmp_path, **env)
+    return [(item["client"], item["environment"]) for item in include], any_changed
+
+
+def test_deploy_fans_out_over_matrix(deploy_workflow):
+    """Test deploy runs one job per changed pair with the client's parallelism"""
+    deploy = deploy_workflow["jobs"]["deploy"]
+    assert deploy["needs"] == "changes"
+    assert deploy["strategy"]["matrix"] == "${{ fromJSON(needs.changes.outputs.matrix) }}"
+    assert deploy["strategy"]["max-parallel"] == 2
+    assert deploy["strategy"]["fail-fast"] is False
+    assert deploy["environment"] == "${{ matrix.environment }}"
+    assert deploy["concurrency"] == {
+        "group": "deploy-${{ matrix.client }}-${{ matrix.environment }}",
+        "cancel-in-progress": "${{ matrix.cancel }}",
+    }
+
+
+def test_push_deploys_only_changed_pairs(deploy_workflow, pushed_repo, tmp_path):
+    """Test a push range yields exactly the changed client/environment pairs"""
+    checkout, first, last = pushed_repo
+    pairs, any_changed = run_changes(deploy_workflow, checkout, tmp_path, BEFORE=first, SHA=last)
+    assert pairs == [("acme", "dev"), ("globex", "hml"), ("globex", "prod")]
+    assert any_changed == "true"
+
+
+def test_new_branch_uses_last_commit(deploy_workflow, pushed_repo, tmp_path):
+    """Test a push without a previous commit diffs the head commit only"""
+    checkout, _, last = pushed_repo
+    pairs, _ = run_changes(deploy_workflow, checkout, tmp_path, BEFORE="0" * 40, SHA=last)
+    assert pairs == [("globex", "prod")]
+
+
+def test_dispatch_filters(deploy_workflow, pushed_repo, tmp_path):
+    """Test manual runs select clients/environments from the inputs"""
+    checkout, _, _ = pushed_repo
+    pairs, _ = run_changes(deploy_workflow, checkout, tmp_path, EVENT_NAME="workflow_dispatch", INPUT_CLIENT="globex")
+    assert pairs == [("globex", "hml"), ("globex", "prod")]
+    pairs, any_changed = run_changes(
+        deploy_workflow, checkout, tmp_path, EVENT_NAME="workflow_dispatch", INPUT_CLIENT="nobody"
+    )
+    assert pairs == []
+    assert any_changed == "false"
+
+
+def test_cancel_policy_per_matrix_entry(deploy_workflow, pushed_repo, tmp_path):
+    """Test each entry cancels from its own client's policy file, defaults without one"""
+    checkout, _, _ = pushed_repo
+    files = GitHubWorkflowGenerator.deploy_policy_files({
+        "client_name": "globex",
+        "concurrency": {"deploy-client.hml": "queue", "deploy-client.prod": "cancel"},
+    })
+    for path, content in files.items():
+        (checkout / path).write_text(content)
+    include, _ = run_matrix(deploy_workflow, checkout, tmp_path, EVENT_NAME="workflow_dispatch")
+    cancel = {(item["client"], item["environment"]): item["cancel"] for item in include}
+    # acme has no policy file: dev/hml cancel, prod queues
+    assert cancel == {
+        ("acme", "dev"): True,
+        ("globex", "hml"): False,
+        ("globex", "prod"): True,
+    }
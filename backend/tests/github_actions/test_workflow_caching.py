@@ -0,0 +1,114 @@
+"""Tests for module-aware cache steps in generated workflows"""
+
+import pytest
+import yaml
+from forgeerp.core.engine.github_generator.caching import module_cache_specs
+from forgeerp.core.engine.github_generator.workflows import GitHubWorkflowGenerator
+from forgeerp.core.services.module_loader import ModuleLoader
+
+CLIENT_DATA = {"client_name": "acme", "environments": ["dev", "prod"]}
+
+
+@pytest.fixture(name="addons_dir")
+def addons_dir_fixture(tmp_path):
+    """Addons with and without a ci.cache section"""
+    addons = tmp_path / "addons"
+    manifests = {
+        "kubernetes": {"name": "Kubernetes", "ci": {"cache": ["helm"]}},
+        "hetzner": {"name": "Hetzner", "ci": {"cache": ["terraform"]}},
+        "images": {"name": "Images", "ci": {"cache": ["buildx"]}},
+        "plain": {"name": "Plain"},
+    }
+    for name, manifest in manifests.items():
+        (addons / name).mkdir(parents=True)
+        (addons / name / "manifest.yaml").write_text(yaml.safe_dump(manifest))
+    (addons / "reports").mkdir()
+    (addons / "reports" / "manifest.yaml").write_text(yaml.safe_dump({
+        "name": "Reports",
+        "ci": {"cache": [
+            "helm",
+            {"preset": "pip", "key_files": ["addons/reports/requirements.txt"]},
+            {"name": "fonts", "paths": ["~/.fonts"], "workflows": ["setup-client"]},
+        ]},
+    }))
+    return addons
+
+
+def test_specs_from_manifests(addons_dir):
+    """Test manifests declare caches, modules without a section add none, names are deduplicated"""
+    specs = module_cache_specs(["reports", "kubernetes", "hetzner", "plain", "missing"], ModuleLoader(addons_dir).load_module_manifest)
+    
+    assert [spec["name"] for spec in specs] == ["fonts", "helm", "pip", "terraform"]
+    pip = next(spec for spec in specs if spec["name"] == "pip")
+    assert pip["paths"] == ["~/.cache/pip"]
+    assert pip["key_files"] == ["addons/reports/requirements.txt"]
+
+
+def test_shipped_addons_declare_caches():
+    """Test the repository's addons declare their caches in their manifests"""
+    specs = module_cache_specs(["kubernetes", "postgresql", "hetzner", "ssl"], ModuleLoader().load_module_manifest)
+    assert [spec["name"] for spec in specs] == ["helm", "pip", "terraform"]
+
+
+def test_invalid_cache_entries_are_skipped(addons_dir, caplog):
+    """Test unknown presets, caches without paths and unreadable manifests are logged and skipped"""
+    specs = module_cache_specs(["x"], lambda name: {"ci": {"cache": ["nope", {"name": "empty"}, "helm"]}})
+    assert [spec["name"] for spec in specs] == ["helm"]
+    assert "Unknown cache preset in module x: 'nope'" in caplog.text
+    
+    assert module_cache_specs(["x"], lambda name: {"ci": {"cache": "helm"}}) == []
+    (addons_dir / "broken").mkdir()
+    (addons_dir / "broken" / "manifest.yaml").write_text("ci: [unclosed\n")
+    specs = module_cache_specs(["broken", "kubernetes"], ModuleLoader(addons_dir).load_module_manifest)
+    assert [spec["name"] for spec in specs] == ["helm"]
+    assert "Skipping caches of module broken" in caplog.text
+
+
+def test_restore_and_save_steps(addons_dir):
+    """Test caches are restored after checkout and saved last, only on a miss"""
+    generator = GitHubWorkflowGenerator(module_loader=ModuleLoader(addons_dir))
+    outputs = generator.render_workflows_for_client(CLIENT_DATA, ["reports", "hetzner"])
+    setup = yaml.safe_load(outputs["setup-client.yml"])["jobs"]["setup"]["steps"]
+    deploy = yaml.safe_load(outputs["deploy-client.yml"])["jobs"]["deploy"]["steps"]
+    
+    assert setup[0] == {"uses": "actions/checkout@v4"}
+    assert setup[1]["name"] == "Configure caches"
+    assert 'mkdir -p "$HOME/.terraform.d/plugin-cache"' in setup[1]["run"]
+    restores = [step for step in setup if step.get("uses") == "actions/cache/restore@v4"]
+    saves = [step for step in setup if step.get("uses") == "actions/cache/save@v4"]
+    assert [step["id"] for step in restores] == ["cache-fonts", "cache-helm", "cache-pip", "cache-terraform"]
+    assert restores[2]["with"] == {
+        "path": "~/.cache/pip",
+        "key": "pip-v1-${{ runner.os }}-${{ hashFiles('addons/reports/requirements.txt') }}",
+        "restore-keys": "pip-v1-${{ runner.os }}-",
+    }
+    assert saves[2]["if"] == "success() && steps.cache-pip.outputs.cache-hit != 'true'"
+    assert setup.index(saves[0]) > setup.index(next(step for step in setup if step.get("name") == "Setup Client"))
+    
+    # fonts is only cached by setup-client
+    assert "cache-fonts" not in [step.get("id") for step in deploy]
+
+
+def test_buildx_layer_cache(addons_dir):
+    """Test docker layers go to the GitHub Actions cache scoped per client and workflow"""
+    generator = GitHubWorkflowGenerator(module_loader=ModuleLoader(addons_dir))
+    deploy = generator.deploy_client_workflow_data(CLIENT_DATA, ["images"])["jobs"]["deploy"]["steps"]
+    
+    assert [step.get("uses") for step in deploy[2:4]] == [
+        "docker/setup-buildx-action@v3", "crazy-max/ghaction-github-runtime@v3"
+    ]
+    assert 'BUILDX_CACHE_TO=type=gha,scope=acme-deploy-client,mode=max' in deploy[1]["run"]
+
+
+def test_manifest_change_regenerates(addons_dir, github_repo_dir):
+    """Test editing an installed module's cache section invalidates the generation manifest"""
+    generator = GitHubWorkflowGenerator(github_repo_dir, module_loader=ModuleLoader(addons_dir))
+    generator.generate_workflows_for_client(CLIENT_DATA, ["kubernetes"])
+    assert generator.generate_workflows_for_client(CLIENT_DATA, ["kubernetes"]).up_to_date
+    
+    (addons_dir / "kubernetes" / "manifest.yaml").write_text(yaml.safe_dump({"ci": {"cache": ["helm", "pip"]}}))
+    generator.module_loader.index.refresh()
+    report = generator.generate_workflows_for_client(CLIENT_DATA, ["kubernetes"])
+    
+    assert not report.up_to_date
+    assert report.written == ["setup-client.yml", "deploy-client.yml"]
@@ -0,0 +1,101 @@
+"""Tests for concurrency policies in generated workflows"""
+
+import json
+import yaml
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.configuration import Configuration
+from forgeerp.core.engine.github_generator.archive import render_tree
+from forgeerp.core.engine.github_generator.concurrency import deploy_policy, load_concurrency_settings
+from forgeerp.core.engine.github_generator.workflows import GitHubWorkflowGenerator
+
+CLIENT_DATA = {"client_name": "acme", "environments": ["dev", "hml", "prod"]}
+
+
+def render(client_data, installed_modules=("hetzner",)):
+    outputs = GitHubWorkflowGenerator().render_workflows_for_client(client_data, list(installed_modules))
+    return {name: yaml.safe_load(content) for name, content in outputs.items()}
+
+
+def test_default_policies():
+    """Test dev/hml deploys cancel, prod queues and disaster recovery is exclusive"""
+    workflows = render(CLIENT_DATA)
+    
+    deploy = workflows["deploy-client.yml"]["jobs"]["deploy"]["concurrency"]
+    assert deploy["group"] == "deploy-${{ matrix.client }}-${{ matrix.environment }}"
+    assert deploy["cancel-in-progress"] == "${{ matrix.cancel }}"
+    assert deploy_policy(CLIENT_DATA) == {"cancel": ["dev", "hml"], "queue": ["prod"], "default": False}
+    
+    # Exclusive: one group per client, whatever the recovery action
+    assert workflows["disaster-recovery.yml"]["concurrency"] == {
+        "group": "disaster-recovery-acme", "cancel-in-progress": False
+    }
+    assert workflows["setup-client.yml"]["concurrency"] == {
+        "group": "setup-client-acme-${{ inputs.environment }}", "cancel-in-progress": False
+    }
+    assert workflows["diagnose-services.yml"]["concurrency"]["cancel-in-progress"] is True
+
+
+def test_client_overrides():
+    """Test client settings change or drop the policies"""
+    client_data = {**CLIENT_DATA, "concurrency": {
+        "deploy-client.hml": "queue",
+        "deploy-client.qa": "cancel",
+        "disaster-recovery": "queue",
+        "fix-common-issues": "none",
+    }}
+    workflows = render(client_data)
+    
+    policy = json.loads(render_tree(client_data)["clients/acme/deploy-concurrency.json"])
+    assert policy == {"cancel": ["dev", "qa"], "queue": ["hml", "prod"], "default": False}
+    # The shared deploy workflow does not depend on any client's policy
+    assert render_tree(client_data)[".github/workflows/deploy-client.yml"] == render_tree(CLIENT_DATA)[".github/workflows/deploy-client.yml"]
+    assert workflows["disaster-recovery.yml"]["concurrency"]["group"] == "disaster-recovery-acme-${{ inputs.action }}"
+    assert "concurrency" not in workflows["fix-common-issues.yml"]
+
+
+def test_invalid_policy_falls_back_to_default(caplog):
+    """Test unknown or unsupported policies are logged and the default used"""
+    workflows = render({**CLIENT_DATA, "concurrency": {"disaster-recovery": "sometimes"}})
+    assert workflows["disaster-recovery.yml"]["concurrency"] == {
+        "group": "disaster-recovery-acme", "cancel-in-progress": False
+    }
+    assert deploy_policy({**CLIENT_DATA, "concurrency": {"deploy-client.prod": "exclusive"}})["queue"] == ["prod"]
+    assert "Ignoring invalid concurrency policy for disaster-recovery" in caplog.text
+
+
+def test_invalid_policy_rejected_on_write(client, auth_headers_admin):
+    """Test concurrency configurations are validated when written"""
+    response = client.post("/api/v1/configurations", json={
+        "key": "workflows.concurrency.deploy-client.prod", "value": "exclusive"
+    }, headers=auth_headers_admin)
+    assert response.status_code == 400
+    
+    response = client.post("/api/v1/configurations", json={
+        "key": "workflows.concurrency.deploy-client.prod", "value": "Cancel"
+    }, headers=auth_headers_admin)
+    assert response.status_code == 201
+    response = client.patch(f"/api/v1/configurations/{response.json()['id']}", json={
+        "value": "sometimes"
+    }, headers=auth_headers_admin)
+    assert response.status_code == 400
+
+
+def test_settings_from_configuration(session):
+    """Test global settings apply to every client and client rows override them"""
+    acme = Client(name="Acme", code="acme")
+    globex = Client(name="Globex", code="globex")
+    session.add_all([acme, globex])
+    session.commit()
+    session.add_all([
+        Configuration(key="workflows.concurrency.deploy-client.prod", value="cancel"),
+        Configuration(key="workflows.concurrency.deploy-client.prod", value="Queue", client_id=acme.id),
+        Configuration(key="workflows.concurrency.disaster-recovery", value="none", client_id=globex.id),
+        Configuration(key="workflows.concurrency.setup-client", value="cancel", client_id=globex.id, is_active=False),
+        Configuration(key="unrelated", value="x", client_id=acme.id),
+    ])
+    session.commit()
+    
+    settings = load_concurrency_settings(session, [acme.id, globex.id])
+    
+    assert settings[acme.id] == {"deploy-client.prod": "queue"}
+    assert settings[globex.id] == {"deploy-client.prod": "cancel", "disaster-recovery": "none"}
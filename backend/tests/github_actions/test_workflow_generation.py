@@ -155,3 +155,70 @@ def test_deploy_client_workflow_generation(github_workflows_dir, github_repo_dir
     assert "push" in workflow_content.get("on", {})
     assert "jobs" in workflow_content
 
+
+
+def test_regeneration_is_incremental(github_workflows_dir, github_repo_dir):
+    """Test unchanged inputs skip rendering and unchanged files keep their mtime"""
+    generator = GitHubWorkflowGenerator(github_repo_dir)
+    client_data = {"client_name": "test-client", "environments": ["dev", "hml", "prod"]}
+    
+    report = generator.generate_workflows_for_client(client_data, ["hetzner"])
+    assert sorted(report.written) == report.workflows
+    assert "disaster-recovery.yml" in report.workflows
+    mtimes = {path.name: path.stat().st_mtime_ns for path in github_workflows_dir.iterdir()}
+    
+    report = generator.generate_workflows_for_client(client_data, ["hetzner"])
+    assert report.up_to_date is True
+    assert report.written == []
+    assert {path.name: path.stat().st_mtime_ns for path in github_workflows_dir.iterdir()} == mtimes
+    
+    # New inputs: only changed files are written, dropped outputs are removed
+    report = generator.generate_workflows_for_client({**client_data, "environments": ["dev"]}, [])
+    # setup: environments; deploy: hetzner's terraform cache is gone
+    assert report.written == ["setup-client.yml", "deploy-client.yml"]
+    assert report.removed == ["disaster-recovery.yml"]
+    assert "diagnose-services.yml" in report.skipped
+    assert not (github_workflows_dir / "disaster-recovery.yml").exists()
+    assert not list(github_workflows_dir.glob("*.tmp"))
+
+
+def test_regeneration_restores_edited_files(github_workflows_dir, github_repo_dir):
+    """Test a generated file edited by hand is rewritten and unrelated files are kept"""
+    generator = GitHubWorkflowGenerator(github_repo_dir)
+    client_data = {"client_name": "test-client"}
+    generator.generate_workflows_for_client(client_data)
+    
+    (github_workflows_dir / "deploy-client.yml").write_text("edited")
+    (github_workflows_dir / "custom.yml").write_text("name: Custom")
+    report = generator.generate_workflows_for_client(client_data)
+    
+    assert report.up_to_date is False
+    assert report.written == ["deploy-client.yml"]
+    assert report.removed == []
+    assert (github_workflows_dir / "custom.yml").exists()
+
+
+def test_deploy_policy_file_is_tracked(github_repo_dir):
+    """Test the client's deploy policy file is in the manifest, restored when edited and removed when stale"""
+    generator = GitHubWorkflowGenerator(github_repo_dir)
+    client_data = {"client_name": "test-client", "environments": ["dev"]}
+    policy = github_repo_dir / "clients" / "test-client" / "deploy-concurrency.json"
+    
+    generator.generate_workflows_for_client(client_data)
+    assert "clients/test-client/deploy-concurrency.json" in generator.load_manifest()["files"]
+    
+    policy.write_text("edited")
+    assert generator.generate_workflows_for_client(client_data).up_to_date is False
+    assert policy.read_text() != "edited"
+    
+    generator.generate_workflows_for_client({**client_data, "client_name": "renamed"})
+    assert not policy.exists()
+    assert (github_repo_dir / "clients" / "renamed" / "deploy-concurrency.json").exists()
+
+
+@pytest.mark.parametrize("client_name", ["../escaped", "/etc", "a/b", ".", ""])
+def test_deploy_policy_rejects_unsafe_client_names(github_repo_dir, client_name):
+    """Test a client name cannot place the policy file outside clients/<client>/"""
+    with pytest.raises(ValueError):
+        GitHubWorkflowGenerator(github_repo_dir).generate_workflows_for_client({"client_name": client_name})
+    assert not (github_repo_dir.parent / "escaped").exists()
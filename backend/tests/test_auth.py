@@ -70,3 +70,97 @@ def test_logout(client, auth_headers_admin):
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["message"] == "Successfully logged out"
 
+
+
+def test_get_current_user_cached(client, auth_headers_admin, query_counter):
+    """Test a cached principal costs zero database queries"""
+    client.get("/api/v1/auth/me", headers=auth_headers_admin)
+    
+    query_counter.reset()
+    response = client.get("/api/v1/auth/me", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["username"] == "admin"
+    assert query_counter.count == 0
+    
+    stats = client.get("/health/cache").json()["caches"]["principal"]
+    assert stats["hits"] >= 1
+    assert stats["hit_rate"] > 0
+
+
+def test_get_current_user_cache_invalidated_on_deactivate(client, auth_headers_admin, admin_user, session):
+    """Test deactivating a user invalidates the cached principal"""
+    assert client.get("/api/v1/auth/me", headers=auth_headers_admin).status_code == status.HTTP_200_OK
+    
+    admin_user.is_active = False
+    session.add(admin_user)
+    session.commit()
+    
+    response = client.get("/api/v1/auth/me", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_deactivate_invalidates_after_commit(client, auth_headers_admin, admin_user, session):
+    """Test a request between the flush and the commit cannot keep the old principal cached"""
+    assert client.get("/api/v1/auth/me", headers=auth_headers_admin).status_code == status.HTTP_200_OK
+    
+    admin_user.is_active = False
+    session.add(admin_user)
+    session.flush()
+    # A concurrent request still reads the committed (active) row and caches it again
+    assert client.get("/api/v1/auth/me", headers=auth_headers_admin).status_code == status.HTTP_200_OK
+    
+    session.commit()
+    response = client.get("/api/v1/auth/me", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_login_locks_account_after_failed_attempts(client, admin_user, session):
+    """Test repeated failures lock the account, even for the right password"""
+    for _ in range(5):
+        response = client.post(
+            "/api/v1/auth/login",
+            json={"username": "admin", "password": "wrong"}
+        )
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    
+    session.refresh(admin_user)
+    assert admin_user.locked_until is not None
+    
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "admin", "password": "admin"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_locked_account_skips_hashing(client, admin_user, session, monkeypatch):
+    """Test locked accounts are rejected before bcrypt runs"""
+    from datetime import datetime, timedelta
+    from forgeerp.core.services.password_hasher import password_hasher
+    
+    admin_user.locked_until = datetime.utcnow() + timedelta(minutes=5)
+    session.add(admin_user)
+    session.commit()
+    
+    async def fail_verify(*args):
+        raise AssertionError("password should not be hashed for a locked account")
+    
+    monkeypatch.setattr(password_hasher, "verify", fail_verify)
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "admin", "password": "admin"}
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_login_hasher_saturated(client, admin_user, monkeypatch):
+    """Test login returns 503 with Retry-After when the hasher pool is full"""
+    from forgeerp.core.services.password_hasher import password_hasher
+    
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post(
+        "/api/v1/auth/login",
+        json={"username": "admin", "password": "admin"}
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["Retry-After"] == "1"
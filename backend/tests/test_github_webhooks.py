@@ -0,0 +1,138 @@
+"""Tests for GitHub webhooks"""
+
+import json
+from pathlib import Path
+import pytest
+from fastapi import status
+from sqlmodel import select
+from forgeerp.core.database.models.permission import PullRequest, PullRequestApproval
+from forgeerp.core.services.github_permissions import collaborator_permissions
+from forgeerp.core.services.github_webhooks import sign_payload
+from forgeerp.core.services.job_queue import job_queue
+from scripts.replay_github_webhooks import load_recordings, replay
+
+RECORDINGS = Path(__file__).parent / "fixtures" / "github_webhooks"
+SECRET = "webhook-secret"
+
+
+@pytest.fixture(name="webhook_secret")
+def webhook_secret_fixture(monkeypatch):
+    monkeypatch.setenv("GITHUB_WEBHOOK_SECRET", SECRET)
+    return SECRET
+
+
+def _assert_final_state(session):
+    pr = session.exec(select(PullRequest).where(PullRequest.github_pr_number == 42)).one()
+    assert pr.status == "closed"
+    assert pr.is_merged is True
+    assert pr.is_approved is True
+    
+    approvals = session.exec(
+        select(PullRequestApproval).order_by(PullRequestApproval.github_review_id)
+    ).all()
+    assert [(a.github_review_id, a.reviewer_login, a.state) for a in approvals] == [
+        (900, "octocat", "APPROVED"),
+        (901, "hubot", "DISMISSED"),
+    ]
+
+
+def test_webhook_not_configured(client, monkeypatch):
+    """Test deliveries are refused without a configured secret"""
+    monkeypatch.delenv("GITHUB_WEBHOOK_SECRET", raising=False)
+    response = client.post("/api/v1/github/webhooks", content=b"{}")
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+def test_webhook_invalid_signature(client, webhook_secret):
+    """Test deliveries with a wrong signature are rejected"""
+    body = b'{"action": "opened"}'
+    response = client.post(
+        "/api/v1/github/webhooks",
+        content=body,
+        headers={
+            "X-GitHub-Event": "pull_request",
+            "X-GitHub-Delivery": "1",
+            "X-Hub-Signature-256": sign_payload("other-secret", body),
+        }
+    )
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+def test_webhook_ignores_other_events(client, webhook_secret):
+    """Test unsupported events are acknowledged without being stored"""
+    body = json.dumps({"zen": "Keep it logically awesome."}).encode()
+    response = client.post(
+        "/api/v1/github/webhooks",
+        content=body,
+        headers={
+            "X-GitHub-Event": "push",
+            "X-GitHub-Delivery": "2",
+            "X-Hub-Signature-256": sign_payload(webhook_secret, body),
+        }
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["message"] == "Event ignored"
+
+
+def test_member_event_invalidates_permissions(client, webhook_secret):
+    """Test member events drop cached collaborator permissions without queuing a job"""
+    collaborator_permissions.get_or_fetch("forgeerp", "forgeerp", "octocat", lambda: "write")
+    body = json.dumps({
+        "action": "edited",
+        "member": {"login": "octocat"},
+        "repository": {"full_name": "forgeerp/forgeerp"},
+    }).encode()
+    response = client.post(
+        "/api/v1/github/webhooks",
+        content=body,
+        headers={
+            "X-GitHub-Event": "member",
+            "X-GitHub-Delivery": "3",
+            "X-Hub-Signature-256": sign_payload(webhook_secret, body),
+        }
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["invalidated"] == 1
+    assert collaborator_permissions.stats()["size"] == 0
+    collaborator_permissions.clear()
+
+
+def test_replay_in_order(client, session, webhook_secret):
+    """Test recorded deliveries are queued and applied incrementally"""
+    responses = replay(client.post, load_recordings(RECORDINGS), webhook_secret)
+    assert [r.status_code for r in responses] == [status.HTTP_202_ACCEPTED] * 5
+    
+    assert job_queue.run_pending(session) == 5
+    _assert_final_state(session)
+
+
+def test_replay_out_of_order_with_duplicates(client, session, webhook_secret):
+    """Test shuffled redeliveries converge on the same state"""
+    responses = replay(
+        client.post,
+        load_recordings(RECORDINGS),
+        webhook_secret,
+        shuffle=True,
+        duplicates=True,
+        seed=1,  # Merge before open, dismissal before the review
+    )
+    duplicates = [r for r in responses if r.json()["duplicate"]]
+    assert len(duplicates) == 5
+    assert all(r.status_code == status.HTTP_200_OK for r in duplicates)
+    
+    assert job_queue.run_pending(session) == 5
+    _assert_final_state(session)
+
+
+def test_status_is_served_from_database(client, session, webhook_secret, auth_headers_admin, monkeypatch):
+    """Test PR status reads don't poll GitHub when webhooks keep it current"""
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+    replay(client.post, load_recordings(RECORDINGS), webhook_secret)
+    job_queue.run_pending(session)
+    
+    response = client.get("/api/v1/github/prs/42/status", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert "job_id" not in data
+    assert data["is_merged"] is True
+    assert [review["user"] for review in data["reviews"]] == ["octocat", "hubot"]
@@ -0,0 +1,359 @@
+"""Tests for background jobs"""
+
+import json
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from fastapi import status
+from sqlmodel import select
+from forgeerp.main import app
+from forgeerp.core.api.routes import github as github_routes
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.job import Job
+from forgeerp.core.database.models.permission import Permission, PullRequest, PullRequestApproval
+from forgeerp.core.engine.github_generator.archive import read_archive
+from forgeerp.core.services.github_client import GitHubRateLimited, require_github_service
+from forgeerp.core.services.github_permissions import collaborator_permissions
+from forgeerp.core.services.github_jobs import _record_pull_request
+from forgeerp.core.services.job_queue import job_queue
+
+
+@pytest.fixture(name="github_configured")
+def github_configured_fixture(client):
+    """Pretend GitHub is configured (the jobs are not run)"""
+    app.dependency_overrides[require_github_service] = lambda: None
+
+
+def test_generate_workflows_runs_as_job(client, auth_headers_admin, session, tmp_path):
+    """Test workflow generation returns 202 and writes files from the job"""
+    db_client = Client(name="Job Client", code="job-client")
+    session.add(db_client)
+    session.commit()
+    session.refresh(db_client)
+    repo_dir = tmp_path / "repo"
+    
+    response = client.post(
+        "/api/v1/github/workflows/generate",
+        json={"client_id": db_client.id, "repo_dir": str(repo_dir)},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    job_id = response.json()["job_id"]
+    assert not repo_dir.exists()
+    
+    response = client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == "queued"
+    
+    assert job_queue.run_pending(session) == 1
+    
+    data = client.get(f"/api/v1/jobs/{job_id}", headers=auth_headers_admin).json()
+    assert data["status"] == "succeeded"
+    assert data["attempts"] == 1
+    assert "deploy-client.yml" in data["result"]["workflows"]
+    assert (repo_dir / ".github" / "workflows").is_dir()
+
+
+def test_generate_fleet_runs_as_job(client, auth_headers_admin, session, tmp_path, monkeypatch):
+    """Test fleet generation is queued and stores progress and a summary"""
+    monkeypatch.setattr(github_routes, "FLEET_OUTPUT_DIR", str(tmp_path))
+    for code in ("fleet-a", "fleet-b"):
+        session.add(Client(name=code, code=code))
+    session.commit()
+    
+    response = client.post(
+        "/api/v1/github/workflows/generate-fleet",
+        json={"output_dir": "nightly", "workers": 1},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert job_queue.run_pending(session) == 1
+    
+    data = client.get(response.json()["status_url"], headers=auth_headers_admin).json()
+    assert data["status"] == "succeeded"
+    assert data["progress"] == {"done": 2, "total": 2, "failed": 0}
+    assert data["result"]["succeeded"] == 2
+    assert (tmp_path / "nightly" / "fleet-b" / ".github" / "workflows" / "setup-client.yml").exists()
+
+
+@pytest.mark.parametrize("output_dir", ["../escape", "/etc"])
+def test_generate_fleet_rejects_output_dir_outside_base(client, auth_headers_admin, session, tmp_path, monkeypatch, output_dir):
+    """Test the fleet output directory cannot leave FLEET_OUTPUT_DIR"""
+    monkeypatch.setattr(github_routes, "FLEET_OUTPUT_DIR", str(tmp_path / "fleet"))
+    
+    response = client.post(
+        "/api/v1/github/workflows/generate-fleet",
+        json={"output_dir": output_dir},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert session.exec(select(Job)).all() == []
+
+
+def test_generate_fleet_requires_permission(client, auth_headers_user):
+    """Test fleet generation needs an unscoped workflow_generate grant"""
+    response = client.post("/api/v1/github/workflows/generate-fleet", json={}, headers=auth_headers_user)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_download_workflow_archive(client, auth_headers_admin, session):
+    """Test the workflow tree is streamed as an archive without a job"""
+    db_client = Client(name="Archive Client", code="archive-client")
+    session.add(db_client)
+    session.commit()
+    session.refresh(db_client)
+    
+    response = client.get(
+        f"/api/v1/github/workflows/{db_client.id}/archive?format=tar.gz",
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/gzip"
+    assert "archive-client-workflows.tar.gz" in response.headers["content-disposition"]
+    tree = read_archive(response.content)
+    assert ".github/workflows/deploy-client.yml" in tree
+    
+    # Diffing the downloaded tree against a fresh render finds nothing
+    response = client.post(
+        f"/api/v1/github/workflows/{db_client.id}/diff",
+        files={"existing": ("tree.tar.gz", response.content, "application/gzip")},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == ""
+    
+    # Without an upload every generated file is an addition
+    response = client.post(f"/api/v1/github/workflows/{db_client.id}/diff", headers=auth_headers_admin)
+    assert response.headers["content-type"].startswith("text/x-diff")
+    assert "+++ b/.github/workflows/deploy-client.yml" in response.text
+
+
+def test_workflow_diff_rejects_bad_archive(client, auth_headers_admin, session):
+    """Test an unreadable upload is a 400"""
+    db_client = Client(name="Diff Client", code="diff-client")
+    session.add(db_client)
+    session.commit()
+    session.refresh(db_client)
+    
+    response = client.post(
+        f"/api/v1/github/workflows/{db_client.id}/diff",
+        files={"existing": ("tree.zip", b"garbage", "application/zip")},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_publish_workflows_queues_job(client, auth_headers_admin, auth_headers_user, github_configured):
+    """Test publishing is queued once per branch and needs fleet-wide permissions"""
+    body = {"client_codes": ["acme"]}
+    response = client.post("/api/v1/github/workflows/publish", json=body, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    again = client.post("/api/v1/github/workflows/publish", json=body, headers=auth_headers_admin)
+    assert again.json()["job_id"] == response.json()["job_id"]
+    
+    response = client.post("/api/v1/github/workflows/publish", json=body, headers=auth_headers_user)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_publish_workflows_root_layout_needs_one_client(client, auth_headers_admin, github_configured, monkeypatch):
+    """Test the repository-root layout refuses to publish several clients into one tree"""
+    response = client.post("/api/v1/github/workflows/publish", json={}, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    monkeypatch.setattr(github_routes, "WORKFLOWS_GIT_LAYOUT", "{client_code}/")
+    response = client.post("/api/v1/github/workflows/publish", json={}, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+
+
+def test_pr_status_returns_stored_state(client, auth_headers_admin, session, monkeypatch):
+    """Test PR status answers from the database and queues one GitHub sync"""
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+    session.add(PullRequest(
+        github_pr_number=7,
+        github_pr_url="https://github.com/forgeerp/forgeerp/pull/7",
+        title="PR 7",
+        change_type="deploy",
+    ))
+    session.commit()
+    
+    response = client.get("/api/v1/github/prs/7/status", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    data = response.json()
+    assert data["status"] == "open"
+    assert data["change_type"] == "deploy"
+    assert data["reviews"] == []
+    
+    job = client.get(f"/api/v1/jobs/{data['job_id']}", headers=auth_headers_admin).json()
+    assert job["job_type"] == "prs.sync"
+    
+    # A pending sync is reused instead of queuing another one
+    again = client.get("/api/v1/github/prs/7/status", headers=auth_headers_admin).json()
+    assert again["job_id"] == data["job_id"]
+
+
+def test_pr_status_fresh_from_database(client, auth_headers_admin, session, monkeypatch):
+    """Test recently synced PRs are served with their reviews and no GitHub sync"""
+    monkeypatch.setenv("GITHUB_TOKEN", "test-token")
+    pr = PullRequest(
+        github_pr_number=8,
+        github_pr_url="https://github.com/forgeerp/forgeerp/pull/8",
+        title="PR 8",
+        change_type="deploy",
+        is_approved=True,
+        synced_at=datetime.utcnow(),
+    )
+    session.add(pr)
+    session.commit()
+    session.add(PullRequestApproval(
+        pull_request_id=pr.id,
+        github_review_id=80,
+        reviewer_login="octocat",
+        state="APPROVED",
+    ))
+    session.commit()
+    
+    response = client.get("/api/v1/github/prs/8/status", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert "job_id" not in data
+    assert data["is_approved"] is True
+    assert data["reviews"][0]["user"] == "octocat"
+    assert data["reviews"][0]["state"] == "APPROVED"
+
+
+def test_create_pr_returns_job(client, auth_headers_admin, github_configured):
+    """Test PR creation is queued instead of calling GitHub in the request"""
+    response = client.post(
+        "/api/v1/github/prs/create",
+        json={"title": "Deploy", "body": "Body", "head": "feature", "change_type": "deploy"},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["status_url"] == f"/api/v1/jobs/{response.json()['job_id']}"
+
+
+@pytest.mark.parametrize("route, body", [
+    ("/api/v1/github/prs/create", {"title": "Deploy", "body": "Body", "change_type": "deploy"}),
+    ("/api/v1/github/workflows/publish", {"client_codes": ["acme"]}),
+])
+@pytest.mark.parametrize("branch", ["x\nreset refs/heads/main", "x:refs/heads/main", "+main", "-x", "a..b"])
+def test_branch_names_are_validated(client, auth_headers_admin, github_configured, route, body, branch):
+    """Test head/base must be plain branch names before anything is queued"""
+    for field in ("head", "base"):
+        response = client.post(route, json={"head": "feature", **body, field: branch}, headers=auth_headers_admin)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def test_bulk_pr_sync_is_deduplicated(client, auth_headers_admin, github_configured):
+    """Test the bulk PR sync is queued once while a sync is pending"""
+    first = client.post("/api/v1/github/prs/sync", headers=auth_headers_admin)
+    second = client.post("/api/v1/github/prs/sync?full=true", headers=auth_headers_admin)
+    
+    assert first.status_code == status.HTTP_202_ACCEPTED
+    assert second.json()["job_id"] == first.json()["job_id"]
+    job = client.get(first.json()["status_url"], headers=auth_headers_admin).json()
+    assert job["job_type"] == "prs.sync_all"
+
+
+def test_bulk_pr_sync_forbidden_for_viewer(client, session, regular_user, auth_headers_user, github_configured):
+    """Test viewers cannot queue a fleet-wide PR reconciliation"""
+    regular_user.role = "viewer"
+    session.add(regular_user)
+    session.commit()
+    
+    response = client.post("/api/v1/github/prs/sync", headers=auth_headers_user)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert session.exec(select(Job)).all() == []
+
+
+def test_github_write_access_check_is_opt_in(client, session, regular_user, auth_headers_user, github_service, fake_github):
+    """Test by default the app's own permissions decide and GitHub is not asked"""
+    session.add(Permission(user_id=regular_user.id, permission_type="pr_create"))
+    session.commit()
+    payload = {"title": "Deploy", "body": "Body", "head": "feature", "change_type": "deploy"}
+    
+    response = client.post("/api/v1/github/prs/create", json=payload, headers=auth_headers_user)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert fake_github.requests == []
+
+
+def test_create_pr_requires_github_write_access(client, session, regular_user, auth_headers_user, github_service, fake_github, monkeypatch):
+    """Test PR creation checks the user's collaborator permission once per TTL"""
+    monkeypatch.setattr(github_routes, "GITHUB_WRITE_PERMISSION", "write")
+    session.add(Permission(user_id=regular_user.id, permission_type="pr_create"))
+    session.commit()
+    payload = {"title": "Deploy", "body": "Body", "head": "feature", "change_type": "deploy"}
+    
+    response = client.post("/api/v1/github/prs/create", json=payload, headers=auth_headers_user)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    
+    collaborator_permissions.clear()
+    fake_github.add("GET", "/repos/forgeerp/forgeerp/collaborators/user/permission", {"permission": "write", "user": None})
+    for _ in range(2):
+        response = client.post("/api/v1/github/prs/create", json=payload, headers=auth_headers_user)
+        assert response.status_code == status.HTTP_202_ACCEPTED
+    
+    paths = [request["path"] for request in fake_github.requests]
+    assert paths.count("/repos/forgeerp/forgeerp/collaborators/user/permission") == 2  # Once denied, once granted
+
+
+def test_github_permission_errors_are_not_denials(client, session, regular_user, auth_headers_user, github_service, fake_github, monkeypatch):
+    """Test GitHub failures answer 503 and rate limits 429 with Retry-After, never a 403"""
+    monkeypatch.setattr(github_routes, "GITHUB_WRITE_PERMISSION", "write")
+    session.add(Permission(user_id=regular_user.id, permission_type="pr_create"))
+    session.commit()
+    payload = {"title": "Deploy", "body": "Body", "head": "feature", "change_type": "deploy"}
+    
+    fake_github.add("GET", "/repos/forgeerp/forgeerp/collaborators/user/permission", {"message": "Bad credentials"}, status=401)
+    response = client.post("/api/v1/github/prs/create", json=payload, headers=auth_headers_user)
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    
+    def rate_limited(*args):
+        raise GitHubRateLimited(12.5, "Rate limit reached")
+    
+    monkeypatch.setattr(github_service, "check_user_permission", rate_limited)
+    response = client.post("/api/v1/github/prs/create", json=payload, headers=auth_headers_user)
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert response.headers["Retry-After"] == "13"
+    assert session.exec(select(Job)).all() == []
+
+
+def test_list_jobs_scoped_to_owner(client, auth_headers_admin, auth_headers_user, session, admin_user):
+    """Test non-admin users only see their own jobs"""
+    job = job_queue.enqueue(session, "prs.sync", {"pr_number": 1}, created_by=admin_user.id)
+    
+    response = client.get("/api/v1/jobs", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["total"] == 1
+    
+    response = client.get("/api/v1/jobs", headers=auth_headers_user)
+    assert response.json()["total"] == 0
+    
+    response = client.get(f"/api/v1/jobs/{job.id}", headers=auth_headers_user)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_create_pr_without_github(client, auth_headers_admin, monkeypatch):
+    """Test PR creation is refused up front when GitHub is not configured"""
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    response = client.post(
+        "/api/v1/github/prs/create",
+        json={"title": "Deploy", "body": "Body", "head": "feature", "change_type": "deploy"},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+def test_record_pull_request_after_webhook(session):
+    """Test a PR the webhook recorded first is completed instead of inserted twice"""
+    session.add(PullRequest(github_pr_number=77, github_pr_url="url", title="From webhook", change_type="external"))
+    session.commit()
+    
+    pr = SimpleNamespace(number=77, html_url="https://github.com/acme/infra/pull/77")
+    payload = {"title": "Deploy", "body": "Body", "change_type": "deploy", "change_target": "acme", "change_data": {"env": "dev"}}
+    pr_model = _record_pull_request(session, pr, payload)
+    
+    rows = session.exec(select(PullRequest).where(PullRequest.github_pr_number == 77)).all()
+    assert [row.id for row in rows] == [pr_model.id]
+    assert (pr_model.title, pr_model.change_type, pr_model.change_target) == ("From webhook", "deploy", "acme")
+    assert json.loads(pr_model.change_data) == {"env": "dev"}
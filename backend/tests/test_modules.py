@@ -0,0 +1,156 @@
+"""Tests for modules"""
+
+from fastapi import status
+from sqlmodel import select
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.module import Module, ClientModule
+from forgeerp.core.services.module_loader import ModuleLoader
+
+
+def _client_with_modules(session, count, code="test-client"):
+    """Create a client with `count` installed modules (plus one uninstalled), return its id"""
+    client = Client(name="Test Client", code=code)
+    session.add(client)
+    session.commit()
+    session.refresh(client)
+    
+    for i in range(count + 1):
+        module = Module(name=f"{code}-module-{i}", display_name=f"Module {i}")
+        session.add(module)
+        session.commit()
+        session.refresh(module)
+        session.add(ClientModule(client_id=client.id, module_id=module.id, is_active=i < count))
+    session.commit()
+    return client.id
+
+
+def test_list_client_modules(client, auth_headers_admin, session):
+    """Test listing modules installed for a client"""
+    client_id = _client_with_modules(session, 3)
+    
+    response = client.get(f"/api/v1/modules/clients/{client_id}", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] == 3
+    assert [m["name"] for m in data["modules"]] == [f"test-client-module-{i}" for i in range(3)]
+    assert all(m["is_installed"] for m in data["modules"])
+
+
+def test_list_client_modules_query_count(client, auth_headers_admin, session, query_counter):
+    """Test the query count does not grow with the number of installed modules (no N+1)"""
+    small_id = _client_with_modules(session, 1, code="small")
+    large_id = _client_with_modules(session, 8, code="large")
+    client.get("/api/v1/auth/me", headers=auth_headers_admin)  # Warm the principal cache
+    
+    query_counter.reset()
+    client.get(f"/api/v1/modules/clients/{small_id}", headers=auth_headers_admin)
+    small_queries = query_counter.count
+    
+    query_counter.reset()
+    response = client.get(f"/api/v1/modules/clients/{large_id}", headers=auth_headers_admin)
+    assert len(response.json()["modules"]) == 8
+    
+    assert query_counter.count == small_queries
+    assert query_counter.count <= 3  # client, count, page
+
+
+def test_generate_workflows_query_count(client, auth_headers_admin, session, query_counter, tmp_path):
+    """Test workflow generation loads installed modules with one query"""
+    client_id = _client_with_modules(session, 5)
+    
+    query_counter.reset()
+    response = client.post(
+        "/api/v1/github/workflows/generate",
+        json={"client_id": client_id, "repo_dir": str(tmp_path / "repo")},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.json()["installed_modules"] == [f"test-client-module-{i}" for i in range(5)]
+    assert query_counter.count <= 5  # user, client, modules, job insert + refresh
+
+
+def test_module_loader_installed_modules_query_count(session, query_counter):
+    """Test ModuleLoader resolves installed modules in a single query"""
+    client_id = _client_with_modules(session, 5)
+    
+    query_counter.reset()
+    modules = ModuleLoader().get_installed_modules_for_client(session, client_id)
+    
+    assert [m.name for m in modules] == [f"test-client-module-{i}" for i in range(5)]
+    assert query_counter.count == 1
+
+
+def test_module_graph(client, auth_headers_admin):
+    """Test a module's dependencies and dependents come from the addon manifests"""
+    response = client.get("/api/v1/modules/graph/diagnosis", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"module": "diagnosis", "depends": [], "dependencies": [], "dependents": ["fix"]}
+    
+    response = client.get("/api/v1/modules/graph/missing", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_install_plan_applies_dependencies(client, auth_headers_admin, session):
+    """Test an install plan resolves dependencies and applies them together"""
+    db_client = Client(name="Test Client", code="test-client")
+    session.add(db_client)
+    session.commit()
+    session.refresh(db_client)
+    url = f"/api/v1/modules/clients/{db_client.id}/install-plan"
+    
+    response = client.post(url, json={"modules": ["fix", "postgresql"]}, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    plan = response.json()["plan"]
+    assert sorted(plan) == ["database", "diagnosis", "fix", "postgresql"]
+    assert plan.index("diagnosis") < plan.index("fix") and plan.index("database") < plan.index("postgresql")
+    assert response.json()["applied"] is False
+    
+    response = client.post(url, json={"modules": ["fix"], "apply": True}, headers=auth_headers_admin)
+    assert response.json()["plan"] == ["diagnosis", "fix"]
+    assert response.json()["applied"] is True
+    
+    response = client.post(url, json={"modules": ["fix"]}, headers=auth_headers_admin)
+    assert response.json()["plan"] == []
+    
+    response = client.get(
+        f"/api/v1/modules/clients/{db_client.id}/uninstall-impact/diagnosis", headers=auth_headers_admin
+    )
+    assert response.json()["breaks"] == ["fix"]
+    
+    response = client.post(url, json={"modules": ["nope"]}, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_fleet_dependency_queries(client, auth_headers_admin, session):
+    """Test reverse-dependency and missing-dependency lookups over stored edges"""
+    db_client = Client(name="Test Client", code="test-client")
+    session.add(db_client)
+    session.commit()
+    session.refresh(db_client)
+    ModuleLoader().install_modules(session, ["fix"], client_id=db_client.id)
+    
+    response = client.get("/api/v1/modules/graph/diagnosis/clients", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["clients"] == [{
+        "client_id": db_client.id,
+        "client_code": "test-client",
+        "modules": [{"name": "fix", "is_direct": True}],
+    }]
+    
+    response = client.get("/api/v1/modules/missing-dependencies", headers=auth_headers_admin)
+    assert response.json() == {"installs": [], "total": 0}
+    
+    diagnosis = session.exec(
+        select(ClientModule).join(Module).where(Module.name == "diagnosis")
+    ).one()
+    diagnosis.is_active = False
+    session.add(diagnosis)
+    session.commit()
+    response = client.get(
+        f"/api/v1/modules/missing-dependencies?client_id={db_client.id}", headers=auth_headers_admin
+    )
+    assert response.json()["installs"] == [{"client_id": db_client.id, "module": "fix", "missing": ["diagnosis"]}]
+    
+    response = client.post("/api/v1/modules/dependencies/sync", headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"added": 0, "updated": 0, "removed": 0}
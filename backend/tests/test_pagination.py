@@ -0,0 +1,130 @@
+"""Tests for list pagination"""
+
+from datetime import datetime, timedelta
+from fastapi import status
+from sqlalchemy import literal, text, tuple_
+from sqlmodel import select
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.permission import PullRequest
+
+
+def _seed_clients(session, count):
+    """Create active clients with increasing updated_at"""
+    base = datetime(2025, 1, 1)
+    for i in range(count):
+        session.add(Client(
+            name=f"Client {i}",
+            code=f"client-{i}",
+            updated_at=base + timedelta(minutes=i),
+        ))
+    session.add(Client(name="Inactive", code="inactive", is_active=False))
+    session.commit()
+
+
+def _walk(client, url, headers, **params):
+    """Follow next_cursor until the last page, returning all pages"""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params)
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(url, params=query, headers=headers)
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        pages.append(data)
+        cursor = data["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_list_clients_total_counts_active_only(client, auth_headers_admin, session):
+    """Test total comes from COUNT over the filtered query, not the page size"""
+    _seed_clients(session, 7)
+    response = client.get("/api/v1/clients", params={"limit": 3}, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] == 7
+    assert data["total_estimated"] is False
+    assert len(data["clients"]) == 3
+    assert data["next_cursor"] is not None
+
+
+def test_list_clients_keyset_cursor(client, auth_headers_admin, session):
+    """Test walking every page by cursor returns each client exactly once"""
+    _seed_clients(session, 7)
+    pages = _walk(client, "/api/v1/clients", auth_headers_admin, limit=3)
+    codes = [c["code"] for page in pages for c in page["clients"]]
+    assert [len(page["clients"]) for page in pages] == [3, 3, 1]
+    assert codes == [f"client-{i}" for i in range(7)]
+
+
+def test_list_clients_keyset_cursor_updated_at_descending(client, auth_headers_admin, session):
+    """Test cursors on (updated_at, id) in descending order"""
+    _seed_clients(session, 5)
+    pages = _walk(client, "/api/v1/clients", auth_headers_admin, limit=2, order_by="-updated_at")
+    codes = [c["code"] for page in pages for c in page["clients"]]
+    assert codes == [f"client-{i}" for i in reversed(range(5))]
+
+
+def test_list_clients_skip_still_supported(client, auth_headers_admin, session):
+    """Test offset paging keeps working without a cursor"""
+    _seed_clients(session, 5)
+    response = client.get("/api/v1/clients", params={"skip": 4}, headers=auth_headers_admin)
+    data = response.json()
+    assert [c["code"] for c in data["clients"]] == ["client-4"]
+    assert data["next_cursor"] is None
+
+
+def test_list_clients_invalid_cursor(client, auth_headers_admin, session):
+    """Test tampered or mismatched cursors are rejected"""
+    _seed_clients(session, 3)
+    response = client.get("/api/v1/clients", params={"cursor": "not-a-cursor"}, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    first = client.get("/api/v1/clients", params={"limit": 1}, headers=auth_headers_admin).json()
+    response = client.get(
+        "/api/v1/clients",
+        params={"cursor": first["next_cursor"], "order_by": "updated_at"},
+        headers=auth_headers_admin
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_list_clients_invalid_order_by(client, auth_headers_admin):
+    """Test only keyset columns can be used for ordering"""
+    response = client.get("/api/v1/clients", params={"order_by": "name"}, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_list_pull_requests_total_is_not_page_size(client, auth_headers_admin, session):
+    """Test PR list total counts all matching PRs"""
+    for number in range(1, 6):
+        session.add(PullRequest(
+            github_pr_number=number,
+            github_pr_url=f"https://github.com/forgeerp/forgeerp/pull/{number}",
+            title=f"PR {number}",
+            change_type="deploy",
+        ))
+    session.commit()
+    
+    response = client.get("/api/v1/github/prs", params={"limit": 2}, headers=auth_headers_admin)
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["total"] == 5
+    assert len(data["prs"]) == 2
+
+
+def test_keyset_order_uses_composite_index(session):
+    """Test keyset pages on updated_at are served by the (updated_at, id) index"""
+    boundary = tuple_(literal(datetime(2025, 1, 1)), literal(10))
+    statement = (
+        select(PullRequest)
+        .where(tuple_(PullRequest.updated_at, PullRequest.id) < boundary)
+        .order_by(PullRequest.updated_at.desc(), PullRequest.id.desc())
+        .limit(10)
+    )
+    compiled = statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = " ".join(row[-1] for row in session.exec(text(f"EXPLAIN QUERY PLAN {compiled}")))
+    assert "ix_pull_requests_updated_at_id" in plan
+    assert "TEMP B-TREE" not in plan
@@ -1,7 +1,11 @@
 """Tests for permissions"""
 
 from fastapi import status
+from sqlmodel import Session, select
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.permission import Permission
 from forgeerp.core.services.authentication import check_permission
+from forgeerp.core.services.permissions import permission_engine
 
 
 def test_check_permission_superuser(session, admin_user):
@@ -37,8 +41,157 @@ def test_check_permission_user(session, regular_user):
     session.add(regular_user)
     session.commit()
     
-    # User role should have basic permissions
+    # User role has only the permissions granted in the Permission table
+    assert check_permission(regular_user, "client_create") is False
+    
+    session.add(Permission(user_id=regular_user.id, permission_type="client_create"))
+    session.commit()
+    
     assert check_permission(regular_user, "client_create") is True
-    # But restricted for certain operations
-    # TODO: Implement specific permission checks
+    assert check_permission(regular_user, "client_delete") is False
+
+
+def test_check_permission_scoped(session, regular_user):
+    """Test client and environment scoped grants"""
+    session.add(Permission(user_id=regular_user.id, permission_type="client_modify", client_id=1))
+    session.add(Permission(user_id=regular_user.id, permission_type="deploy", client_id=1, environment="dev"))
+    session.add(Permission(user_id=regular_user.id, permission_type="deploy", environment="hml"))
+    session.add(Permission(user_id=regular_user.id, permission_type="client_delete", client_id=1, is_active=False))
+    session.commit()
+    
+    assert check_permission(regular_user, "client_modify", client_id=1) is True
+    assert check_permission(regular_user, "client_modify", client_id=2) is False
+    assert check_permission(regular_user, "deploy", client_id=1, environment="dev") is True
+    assert check_permission(regular_user, "deploy", client_id=1, environment="prod") is False
+    assert check_permission(regular_user, "deploy", client_id=2, environment="hml") is True
+    assert check_permission(regular_user, "client_delete", client_id=1) is False
+
+
+def test_check_permission_compiled_once(session, regular_user, query_counter):
+    """Test repeated checks are served from the compiled matrix"""
+    session.add(Permission(user_id=regular_user.id, permission_type="client_modify", client_id=1))
+    session.commit()
+    session.refresh(regular_user)
+    
+    query_counter.reset()
+    for client_id in range(100):
+        check_permission(regular_user, "client_modify", client_id=client_id)
+    
+    assert query_counter.count == 1
+    assert permission_engine.stats()["loads"] == 1
+
+
+def test_check_permission_invalidated_on_revoke(session, regular_user):
+    """Test revoking a permission drops the cached matrix"""
+    permission = Permission(user_id=regular_user.id, permission_type="client_create")
+    session.add(permission)
+    session.commit()
+    assert check_permission(regular_user, "client_create") is True
+    
+    permission.is_active = False
+    session.add(permission)
+    session.commit()
+    assert check_permission(regular_user, "client_create") is False
+
+
+def test_scope_clause(session, regular_user, admin_user):
+    """Test bulk scope filtering in SQL"""
+    clients = [Client(name=f"Client {i}", code=f"client-{i}") for i in range(4)]
+    session.add_all(clients)
+    session.commit()
+    ids = [client.id for client in clients]
+    
+    session.add(Permission(user_id=regular_user.id, permission_type="client_modify", client_id=ids[0]))
+    session.add(Permission(user_id=regular_user.id, permission_type="client_modify", client_id=ids[2]))
+    session.commit()
+    
+    statement = select(Client.id).where(
+        permission_engine.scope_clause(regular_user, "client_modify", Client.id)
+    )
+    assert sorted(session.exec(statement).all()) == [ids[0], ids[2]]
+    
+    statement = select(Client.id).where(
+        permission_engine.scope_clause(regular_user, "client_delete", Client.id)
+    )
+    assert session.exec(statement).all() == []
+    
+    statement = select(Client.id).where(
+        permission_engine.scope_clause(admin_user, "client_modify", Client.id)
+    )
+    assert len(session.exec(statement).all()) == 4
+
+
+def test_list_clients_by_permission(client, session, regular_user, auth_headers_user, auth_headers_admin):
+    """Test the client list can be narrowed to the clients the user holds a permission on"""
+    clients = [Client(name=f"Client {i}", code=f"client-{i}") for i in range(3)]
+    session.add_all(clients)
+    session.commit()
+    session.add(Permission(user_id=regular_user.id, permission_type="client_modify", client_id=clients[1].id))
+    session.commit()
+    
+    response = client.get("/api/v1/clients?permission=client_modify", headers=auth_headers_user)
+    assert [item["code"] for item in response.json()["clients"]] == ["client-1"]
+    assert response.json()["total"] == 1
+    response = client.get("/api/v1/clients", headers=auth_headers_user)
+    assert response.json()["total"] == 3
+    response = client.get("/api/v1/clients?permission=client_modify", headers=auth_headers_admin)
+    assert response.json()["total"] == 3
+
 
+def test_request_keeps_its_matrix_when_the_cache_drops_it(client, session, regular_user, auth_headers_user, monkeypatch):
+    """Test a cache eviction between the auth dependency and a check does not deny the request"""
+    session.add(Permission(user_id=regular_user.id, permission_type="client_create"))
+    session.commit()
+    load_async = permission_engine.load_async
+    
+    async def load_then_evict(db_session, user):
+        matrix = await load_async(db_session, user)
+        permission_engine.clear()  # TTL expiry or LRU eviction right after the dependency ran
+        return matrix
+    
+    monkeypatch.setattr(permission_engine, "load_async", load_then_evict)
+    for code in ("evicted-1", "evicted-2"):
+        response = client.post("/api/v1/clients", json={"name": code, "code": code}, headers=auth_headers_user)
+        assert response.status_code == 201
+
+
+def test_create_client_requires_granted_permission(client, session, regular_user, auth_headers_user):
+    """Test write endpoints enforce Permission rows for the user role"""
+    payload = {"name": "Scoped Client", "code": "scoped"}
+    response = client.post("/api/v1/clients", json=payload, headers=auth_headers_user)
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    
+    session.add(Permission(user_id=regular_user.id, permission_type="client_create"))
+    session.commit()
+    
+    response = client.post("/api/v1/clients", json=payload, headers=auth_headers_user)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["code"] == "scoped"
+
+
+def test_detached_user_miss_fails_closed(session, regular_user, query_counter):
+    """Test a miss for a session-less (cached) principal denies instead of querying elsewhere"""
+    session.add(Permission(user_id=regular_user.id, permission_type="client_create"))
+    session.commit()
+    session.refresh(regular_user)
+    session.expunge(regular_user)
+    permission_engine.invalidate(regular_user.id)
+    
+    query_counter.reset()
+    assert check_permission(regular_user, "client_create") is False
+    assert query_counter.count == 0
+    assert permission_engine.get(regular_user.id) is None
+
+
+def test_grant_invalidates_after_commit(session, engine, regular_user):
+    """Test a matrix re-cached between the flush and the commit is dropped at commit"""
+    session.add(Permission(user_id=regular_user.id, permission_type="client_create"))
+    session.flush()
+    
+    # A concurrent request still sees the committed grants and caches them
+    with Session(engine) as other:
+        assert permission_engine.load(other, regular_user.id).allows("client_create") is False
+    
+    session.commit()
+    assert check_permission(regular_user, "client_create") is True
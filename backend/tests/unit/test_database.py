@@ -0,0 +1,159 @@
+"""Unit tests for database configuration"""
+
+import asyncio
+from sqlalchemy import inspect, text
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from forgeerp.core.database.database import (
+    get_async_database_url,
+    create_database_engine,
+    create_async_database_engine,
+    get_pool_stats,
+)
+from forgeerp.core.database.migrations import upgrade_schema
+from forgeerp.core.database.models.user import User
+
+
+def test_async_database_url_sqlite():
+    """Test SQLite URLs map to aiosqlite"""
+    assert get_async_database_url("sqlite:///app/data/forgeerp.db") == "sqlite+aiosqlite:///app/data/forgeerp.db"
+    assert get_async_database_url("sqlite:///:memory:") == "sqlite+aiosqlite:///:memory:"
+
+
+def test_async_database_url_postgres():
+    """Test Postgres URLs map to asyncpg"""
+    assert get_async_database_url("postgresql://u:p@db/forgeerp") == "postgresql+asyncpg://u:p@db/forgeerp"
+    assert get_async_database_url("postgres://u:p@db/forgeerp") == "postgresql+asyncpg://u:p@db/forgeerp"
+    assert get_async_database_url("postgresql+psycopg2://u:p@db/forgeerp") == "postgresql+asyncpg://u:p@db/forgeerp"
+
+
+def test_async_database_url_already_async():
+    """Test URLs that already name an async driver are kept"""
+    assert get_async_database_url("postgresql+asyncpg://db/forgeerp") == "postgresql+asyncpg://db/forgeerp"
+
+
+def test_async_session_reads_sync_writes(async_engine, admin_user):
+    """Test the async session sees rows written through the sync session"""
+    async def load_usernames():
+        async with AsyncSession(async_engine) as session:
+            return (await session.exec(select(User.username))).all()
+    
+    assert asyncio.run(load_usernames()) == ["admin"]
+
+
+def _pragmas(connection):
+    return {
+        name: connection.execute(text(f"PRAGMA {name}")).scalar()
+        for name in ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store")
+    }
+
+
+def test_sqlite_profile_applied(tmp_path):
+    """Test the SQLite profile is applied on connect"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    with engine.connect() as connection:
+        pragmas = _pragmas(connection)
+    engine.dispose()
+    
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["busy_timeout"] == 5000
+    assert pragmas["mmap_size"] == 256 * 1024 * 1024
+    assert pragmas["cache_size"] == -65536
+    assert pragmas["temp_store"] == 2  # MEMORY
+
+
+def test_sqlite_profile_applied_async(tmp_path):
+    """Test the SQLite profile is applied on aiosqlite connections"""
+    engine = create_async_database_engine(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}")
+    
+    async def read_pragmas():
+        async with engine.connect() as connection:
+            pragmas = await connection.run_sync(_pragmas)
+        await engine.dispose()
+        return pragmas
+    
+    pragmas = asyncio.run(read_pragmas())
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["busy_timeout"] == 5000
+
+
+def test_sqlite_profile_disabled(tmp_path):
+    """Test an empty pragma profile keeps SQLite defaults"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'plain.db'}", sqlite_pragmas={})
+    with engine.connect() as connection:
+        assert _pragmas(connection)["journal_mode"] == "delete"
+    engine.dispose()
+
+
+def test_postgres_pool_profile():
+    """Test Postgres engines get a pre-pinged, recycled, sized pool (no connection needed)"""
+    engine = create_async_database_engine("postgresql+asyncpg://forgeerp@localhost/forgeerp")
+    pool = engine.pool
+    
+    assert pool.size() == 10
+    assert pool._max_overflow == 20
+    assert pool._pre_ping is True
+    assert pool._recycle == 1800
+
+
+def test_pool_stats(tmp_path):
+    """Test pool statistics report checked-out connections"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'stats.db'}")
+    with engine.connect():
+        stats = get_pool_stats(engine)
+    engine.dispose()
+    
+    assert stats["pool_class"] == "QueuePool"
+    assert stats["checkedout"] == 1
+    assert stats["size"] == 5
+
+
+# pull_requests / pull_request_approvals as the first release created them
+OLD_PULL_REQUEST_TABLES = [
+    """CREATE TABLE pull_requests (
+        id INTEGER PRIMARY KEY, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+        github_pr_number INTEGER NOT NULL, github_pr_url VARCHAR NOT NULL, title VARCHAR NOT NULL,
+        description VARCHAR, status VARCHAR NOT NULL, is_approved BOOLEAN NOT NULL, is_merged BOOLEAN NOT NULL,
+        change_type VARCHAR NOT NULL, change_target VARCHAR, change_data VARCHAR,
+        merged_at DATETIME, closed_at DATETIME
+    )""",
+    "CREATE UNIQUE INDEX ix_pull_requests_github_pr_number ON pull_requests (github_pr_number)",
+    """CREATE TABLE pull_request_approvals (
+        id INTEGER PRIMARY KEY, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL,
+        pull_request_id INTEGER NOT NULL REFERENCES pull_requests (id),
+        approver_id INTEGER NOT NULL REFERENCES users (id),
+        approved BOOLEAN NOT NULL, comment VARCHAR
+    )""",
+    "CREATE INDEX ix_pull_request_approvals_approver_id ON pull_request_approvals (approver_id)",
+]
+
+
+def test_upgrade_schema_alters_existing_tables(tmp_path):
+    """Test tables created by older versions get the new columns, keeping their rows"""
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        for statement in OLD_PULL_REQUEST_TABLES:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(
+            "INSERT INTO pull_requests VALUES (1, '2024-01-01', '2024-01-01', 7, 'url', 'PR', NULL, "
+            "'open', 0, 0, 'deploy', NULL, NULL, NULL, NULL)"
+        )
+        connection.exec_driver_sql("INSERT INTO pull_request_approvals VALUES (1, '2024-01-01', '2024-01-01', 1, 3, 1, 'ok')")
+    SQLModel.metadata.create_all(engine)
+    
+    applied = upgrade_schema(engine)
+    assert applied["pull_requests.added"] == ["synced_at", "github_updated_at"]
+    assert applied["pull_request_approvals.nullable"] == ["approver_id"]
+    assert sorted(applied["pull_requests.indexes"]) == ["ix_pull_requests_created_at_id", "ix_pull_requests_updated_at_id"]
+    assert upgrade_schema(engine) == {}
+    
+    inspector = inspect(engine)
+    approvals = {column["name"]: column for column in inspector.get_columns("pull_request_approvals")}
+    assert approvals["approver_id"]["nullable"] is True
+    assert "github_review_id" in approvals
+    assert "ix_pull_request_approvals_github_review_id" in {index["name"] for index in inspector.get_indexes("pull_request_approvals")}
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT approver_id, comment FROM pull_request_approvals").all() == [(3, "ok")]
+        assert connection.exec_driver_sql("SELECT github_pr_number, synced_at FROM pull_requests").all() == [(7, None)]
+    engine.dispose()
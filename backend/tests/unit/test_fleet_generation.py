@@ -0,0 +1,84 @@
+"""Unit tests for fleet-wide workflow generation"""
+
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.module import ClientModule, Module
+from forgeerp.core.engine.github_generator.fleet import generate_fleet, load_fleet
+
+
+def _fleet(session, count):
+    hetzner = Module(name="hetzner", display_name="Hetzner")
+    session.add(hetzner)
+    session.commit()
+    for i in range(count):
+        client = Client(name=f"Client {i}", code=f"client-{i:02d}", is_active=i != count - 1)
+        session.add(client)
+        session.commit()
+        if i % 2 == 0:
+            session.add(ClientModule(client_id=client.id, module_id=hetzner.id))
+    session.commit()
+
+
+def test_load_fleet_filters_in_three_queries(session, query_counter):
+    """Test fleet inputs are loaded with one query each for clients, modules and settings"""
+    _fleet(session, 5)
+    query_counter.reset()
+    
+    items = load_fleet(session)
+    
+    assert query_counter.count == 3
+    assert [item["client_code"] for item in items] == [f"client-{i:02d}" for i in range(4)]
+    assert items[0]["installed_modules"] == ["hetzner"]
+    assert items[1]["installed_modules"] == []
+    assert [item["client_code"] for item in load_fleet(session, module="hetzner")] == ["client-00", "client-02"]
+    assert len(load_fleet(session, client_codes=["client-04"], include_inactive=True)) == 1
+
+
+def test_generate_fleet_inline(session, tmp_path):
+    """Test each client gets its own tree and a rerun is a no-op"""
+    _fleet(session, 5)
+    items = load_fleet(session)
+    updates = []
+    
+    report = generate_fleet(items, str(tmp_path), workers=1, progress=updates.append)
+    
+    assert (report.total, report.succeeded, report.failed) == (4, 4, 0)
+    assert (tmp_path / "client-00" / ".github" / "workflows" / "disaster-recovery.yml").exists()
+    assert not (tmp_path / "client-01" / ".github" / "workflows" / "disaster-recovery.yml").exists()
+    assert updates[-1]["done"] == 4
+    
+    again = generate_fleet(items, str(tmp_path), workers=1)
+    assert again.up_to_date == 4
+    assert again.written == 0
+
+
+def test_generate_fleet_process_pool(session, tmp_path):
+    """Test the process pool produces the same trees and reports per-client errors"""
+    _fleet(session, 5)
+    items = load_fleet(session)
+    # A client whose tree cannot be created
+    (tmp_path / "broken").write_text("not a directory")
+    items.append({**items[0], "client_code": "broken"})
+    
+    report = generate_fleet(items, str(tmp_path), workers=2)
+    
+    assert report.workers == 2
+    assert (report.succeeded, report.failed) == (4, 1)
+    assert "broken" in report.errors
+    assert sorted(result["client_code"] for result in report.clients) == sorted(item["client_code"] for item in items)
+    assert (tmp_path / "client-03" / ".github" / "workflows" / "deploy-client.yml").exists()
+
+
+def test_generate_fleet_rejects_escaping_client_codes(session, tmp_path):
+    """Test a hostile client code fails that client instead of writing outside the output directory"""
+    _fleet(session, 2)
+    items = load_fleet(session)
+    output_dir = tmp_path / "fleet"
+    hostile = ["../escaped", str(tmp_path / "absolute"), ".", ""]
+    items += [{**items[0], "client_code": code} for code in hostile]
+    
+    report = generate_fleet(items, str(output_dir), workers=1)
+    
+    assert (report.succeeded, report.failed) == (1, 4)
+    assert all("escapes" in report.errors[code] for code in hostile)
+    assert not (tmp_path / "escaped").exists() and not (tmp_path / "absolute").exists()
+    assert [path.name for path in output_dir.iterdir()] == ["client-00"]
@@ -0,0 +1,207 @@
+"""Tests for the batched git writer"""
+
+import json
+import subprocess
+import pytest
+from sqlmodel import select
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.permission import PullRequest
+from forgeerp.core.engine.github_generator.archive import MANIFEST_PATH, render_tree
+from forgeerp.core.engine.github_generator.git_writer import WORKFLOWS_GIT_LAYOUT, GitBatchWriter, GitWriterError, blob_sha
+from forgeerp.core.services.job_queue import job_queue
+
+IDENTITY = ["-c", "user.name=Test", "-c", "user.email=test@example.com"]
+
+
+def git(repo, *args):
+    return subprocess.run(
+        ["git", "--git-dir", str(repo), *IDENTITY, *args], check=True, capture_output=True
+    ).stdout.decode()
+
+
+@pytest.fixture(name="origin")
+def origin_fixture(tmp_path):
+    """Bare repository with one commit on main"""
+    origin = tmp_path / "origin.git"
+    subprocess.run(["git", "init", "--bare", "--quiet", "-b", "main", str(origin)], check=True)
+    blob = subprocess.run(
+        ["git", "--git-dir", str(origin), "hash-object", "-w", "--stdin"],
+        input=b"# Clients\n", check=True, capture_output=True
+    ).stdout.decode().strip()
+    tree = subprocess.run(
+        ["git", "--git-dir", str(origin), "mktree"],
+        input=f"100644 blob {blob}\tREADME.md\n".encode(), check=True, capture_output=True
+    ).stdout.decode().strip()
+    commit = git(origin, "commit-tree", tree, "-m", "Initial").strip()
+    git(origin, "update-ref", "refs/heads/main", commit)
+    return origin
+
+
+@pytest.fixture(name="writer")
+def writer_fixture(origin, tmp_path):
+    writer = GitBatchWriter(tmp_path / "mirror.git")
+    writer.fetch(str(origin), "main")
+    return writer
+
+
+def trees(*codes, modules=("sale",)):
+    return {
+        f"{code}/": render_tree({"client_name": code, "environments": ["dev", "prod"]}, list(modules))
+        for code in codes
+    }
+
+
+def test_blob_sha_matches_git():
+    """Test blob ids are computed like git hash-object"""
+    output = subprocess.run(["git", "hash-object", "--stdin"], input=b"hello\n", check=True, capture_output=True)
+    assert blob_sha(b"hello\n") == output.stdout.decode().strip()
+
+
+def test_many_clients_in_one_commit(writer, tmp_path):
+    """Test every client's tree lands in a single commit on top of the base"""
+    result = writer.commit_trees(trees("acme", "globex"), "workflows", "Regenerate")
+
+    assert result.changed
+    assert git(writer.repo_path, "rev-list", "--count", f"{result.base}..workflows").strip() == "1"
+    assert git(writer.repo_path, "rev-parse", "workflows^").strip() == result.base
+    files = git(writer.repo_path, "ls-tree", "-r", "--name-only", "workflows").split()
+    assert "README.md" in files
+    assert "acme/.github/workflows/deploy-client.yml" in files
+    assert f"globex/{MANIFEST_PATH}" in files
+    assert sorted(result.written) == sorted(path for path in files if path != "README.md")
+    # Bare repository: nothing is ever checked out
+    assert not (tmp_path / "mirror.git" / "acme").exists()
+
+
+def test_unchanged_trees_make_no_commit(writer):
+    """Test regenerating identical files does not commit"""
+    first = writer.commit_trees(trees("acme"), "workflows", "Regenerate")
+
+    again = writer.commit_trees(trees("acme"), "workflows-2", "Regenerate", base="workflows")
+
+    assert not again.changed
+    assert again.unchanged == len(first.written)
+    assert writer.resolve("refs/heads/workflows-2") is None
+
+
+def test_only_changed_files_and_stale_workflows(writer):
+    """Test a new commit carries changed files and deletes workflows no longer generated"""
+    writer.commit_trees(trees("acme"), "workflows", "Regenerate")
+    git(writer.repo_path, "update-ref", "refs/heads/main", "workflows")
+    old = trees("acme")["acme/"]
+    new = {path: content for path, content in old.items() if not path.endswith("setup-client.yml")}
+    new[MANIFEST_PATH] = render_tree({"client_name": "acme", "environments": ["dev", "prod"]}, ["sale"])[MANIFEST_PATH].replace(
+        '"setup-client.yml"', '"setup-client-renamed.yml"'
+    )
+
+    result = writer.commit_trees({"acme/": new}, "workflows", "Drop setup")
+
+    assert result.written == [f"acme/{MANIFEST_PATH}"]
+    assert result.removed == ["acme/.github/workflows/setup-client.yml"]
+    files = git(writer.repo_path, "ls-tree", "-r", "--name-only", "workflows").split()
+    assert "acme/.github/workflows/setup-client.yml" not in files
+
+
+def test_stale_policy_files_are_removed(writer):
+    """Test a policy file the old manifest lists is deleted once the client's tree no longer has it"""
+    writer.commit_trees(trees("acme"), "workflows", "Regenerate")
+    git(writer.repo_path, "update-ref", "refs/heads/main", "workflows")
+    renamed = render_tree({"client_name": "acme-renamed", "environments": ["dev", "prod"]}, ["sale"])
+
+    result = writer.commit_trees({"acme/": renamed}, "workflows", "Rename")
+
+    assert result.removed == ["acme/clients/acme/deploy-concurrency.json"]
+    assert "acme/clients/acme-renamed/deploy-concurrency.json" in result.written
+
+
+def test_rejects_unsafe_paths(writer):
+    """Test paths escaping the tree are refused"""
+    with pytest.raises(ValueError):
+        writer.commit_trees({"../": {"x.yml": "x"}}, "workflows", "Bad")
+
+
+@pytest.mark.parametrize("branch", ["x\nreset refs/heads/main", "x:refs/heads/main", "+main", "a..b", "x.lock", ""])
+def test_rejects_unsafe_branch_names(writer, branch):
+    """Test branch names that would inject fast-import commands or change refspecs are refused"""
+    with pytest.raises(ValueError):
+        writer.commit_trees(trees("acme"), branch, "Regenerate")
+    with pytest.raises(ValueError):
+        writer.commit_trees(trees("acme"), "workflows", "Regenerate", base=branch)
+    with pytest.raises(ValueError):
+        writer.push("/nonexistent", branch)
+    with pytest.raises(ValueError):
+        writer.fetch("/nonexistent", branch)
+
+
+def test_missing_base(writer):
+    """Test an unknown base ref is an error"""
+    with pytest.raises(GitWriterError):
+        writer.commit_trees(trees("acme"), "workflows", "Regenerate", base="nope")
+
+
+def test_publish_job_pushes_and_opens_pr(session, origin, tmp_path, fake_github, github_service):
+    """Test the publish job commits once, pushes the branch and records the PR"""
+    for code in ("acme", "globex"):
+        session.add(Client(name=code, code=code))
+    session.commit()
+    fake_github.add("GET", "/repos/forgeerp/clients/pulls", [])
+    fake_github.add("POST", "/repos/forgeerp/clients/pulls", {
+        "number": 12,
+        "html_url": "https://github.com/forgeerp/clients/pull/12",
+        "url": f"{fake_github.url}/repos/forgeerp/clients/pulls/12",
+    }, status=201)
+
+    job_queue.enqueue(session, "workflows.publish", {
+        "owner": "forgeerp",
+        "repo": "clients",
+        "remote_url": str(origin),
+        "mirror_dir": str(tmp_path / "mirror.git"),
+        "layout": "{client_code}/",
+        "head": "forgeerp/workflows",
+        "base": "main",
+        "title": "Regenerate client workflows",
+        "body": "Regenerated",
+    })
+    assert job_queue.run_pending(session) == 1
+
+    files = git(origin, "ls-tree", "-r", "--name-only", "refs/heads/forgeerp/workflows").split()
+    assert "acme/.github/workflows/deploy-client.yml" in files
+    assert "globex/.github/workflows/deploy-client.yml" in files
+    assert git(origin, "rev-list", "--count", "main..forgeerp/workflows").strip() == "1"
+    request = [r for r in fake_github.requests if r["method"] == "POST"][0]
+    assert b'"head": "forgeerp/workflows"' in request["body"]
+    pr = session.exec(select(PullRequest)).one()
+    assert pr.github_pr_number == 12
+    assert pr.change_type == "workflows"
+
+
+def test_republish_reuses_open_pr(session, origin, tmp_path, fake_github, github_service):
+    """Test the default root layout commits at the repository root and a republish reuses the open PR"""
+    session.add(Client(name="acme", code="acme"))
+    session.commit()
+    fake_github.add_pull("forgeerp", "acme", 7)
+    payload = {
+        "owner": "forgeerp",
+        "repo": "acme",
+        "remote_url": str(origin),
+        "mirror_dir": str(tmp_path / "mirror.git"),
+        "layout": WORKFLOWS_GIT_LAYOUT,
+        "client_codes": ["acme"],
+        "head": "forgeerp/workflows",
+        "base": "main",
+        "title": "Regenerate client workflows",
+        "body": "Regenerated",
+    }
+
+    job = job_queue.enqueue(session, "workflows.publish", payload)
+    assert job_queue.run_pending(session) == 1
+
+    session.refresh(job)
+    assert job.status == "succeeded"
+    assert json.loads(job.result)["pr_number"] == 7
+    files = git(origin, "ls-tree", "-r", "--name-only", "refs/heads/forgeerp/workflows").split()
+    assert ".github/workflows/deploy-client.yml" in files
+    lookup = [r for r in fake_github.requests if r["path"] == "/repos/forgeerp/acme/pulls"][0]
+    assert "head=forgeerp%3Aforgeerp%2Fworkflows" in lookup["query"]
+    assert not [r for r in fake_github.requests if r["method"] == "POST"]
+    assert session.exec(select(PullRequest)).one().github_pr_number == 7
@@ -0,0 +1,60 @@
+"""Unit tests for the shared GitHub client"""
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import HTTPException
+from forgeerp.core.services.github_client import (
+    close_github_client,
+    get_github_service,
+    github_transport,
+    require_github_service,
+)
+
+
+def test_service_is_shared(github_service):
+    """Test every caller gets the same application-scoped service"""
+    assert get_github_service() is github_service
+    assert require_github_service() is github_service
+
+
+def test_require_github_service_without_token(monkeypatch):
+    """Test the dependency answers 503 when GitHub is not configured"""
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    close_github_client()
+    with pytest.raises(HTTPException) as exc_info:
+        require_github_service()
+    assert exc_info.value.status_code == 503
+
+
+def test_connections_are_reused(github_service, fake_github):
+    """Test repeated calls reuse one keep-alive connection"""
+    fake_github.add("GET", "/repos/forgeerp/forgeerp", {"full_name": "forgeerp/forgeerp", "url": f"{fake_github.url}/repos/forgeerp/forgeerp"})
+    fake_github.add_pull("forgeerp", "forgeerp", 1)
+    
+    for _ in range(3):
+        pr = github_service.get_pull_request("forgeerp", "forgeerp", 1)
+        assert pr.number == 1
+    
+    assert len(fake_github.connections) == 1
+    assert fake_github.requests[0]["headers"]["Authorization"] == "token test-token"
+    stats = github_transport.stats()
+    assert stats["calls"] == len(fake_github.requests)
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == stats["requests_sent"] - 1
+    assert stats["latency_ms"]["max"] > 0
+
+
+def test_concurrent_calls_are_isolated(github_service, fake_github):
+    """Test threads sharing the client never see each other's responses"""
+    fake_github.add("GET", "/repos/forgeerp/forgeerp", {"full_name": "forgeerp/forgeerp", "url": f"{fake_github.url}/repos/forgeerp/forgeerp"})
+    for number in range(1, 9):
+        fake_github.add_pull("forgeerp", "forgeerp", number)
+    
+    def fetch(number):
+        return github_service.get_pull_request("forgeerp", "forgeerp", number).number
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        numbers = list(executor.map(fetch, list(range(1, 9)) * 4))
+    
+    assert numbers == list(range(1, 9)) * 4
+    assert len(fake_github.connections) <= github_transport.pool_size
@@ -0,0 +1,139 @@
+"""Unit tests for the collaborator permission cache"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from forgeerp.core.services.github_permissions import (
+    CollaboratorPermissionCache,
+    apply_permission_event,
+    collaborator_permissions,
+    permission_satisfies,
+)
+
+
+def test_permission_levels():
+    """Test higher levels include lower ones"""
+    assert permission_satisfies("admin", "write")
+    assert permission_satisfies("write", "write")
+    assert not permission_satisfies("triage", "write")
+    assert not permission_satisfies("none", "read")
+    assert not permission_satisfies(None, "read")
+
+
+def test_hits_and_negative_ttl():
+    """Test positive answers are cached and "none" expires sooner"""
+    cache = CollaboratorPermissionCache(ttl_seconds=60, negative_ttl_seconds=0.05)
+    calls = []
+    
+    def fetch(permission):
+        def inner():
+            calls.append(permission)
+            return permission
+        return inner
+    
+    assert cache.get_or_fetch("forgeerp", "forgeerp", "octocat", fetch("write")) == "write"
+    assert cache.get_or_fetch("ForgeERP", "forgeerp", "Octocat", fetch("admin")) == "write"
+    assert cache.get_or_fetch("forgeerp", "forgeerp", "hubot", fetch("none")) == "none"
+    assert cache.get_or_fetch("forgeerp", "forgeerp", "hubot", fetch("none")) == "none"
+    time.sleep(0.06)
+    assert cache.get_or_fetch("forgeerp", "forgeerp", "hubot", fetch("read")) == "read"
+    
+    assert calls == ["write", "none", "read"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+
+
+def test_errors_are_not_cached():
+    """Test a failed fetch is raised and retried on the next lookup"""
+    cache = CollaboratorPermissionCache()
+    
+    def fail():
+        raise RuntimeError("GitHub unavailable")
+    
+    with pytest.raises(RuntimeError):
+        cache.get_or_fetch("forgeerp", "forgeerp", "octocat", fail)
+    assert cache.get_or_fetch("forgeerp", "forgeerp", "octocat", lambda: "write") == "write"
+
+
+def test_concurrent_misses_share_one_fetch():
+    """Test a stampede on one key makes a single fetch"""
+    cache = CollaboratorPermissionCache()
+    calls = []
+    release = threading.Event()
+    
+    def slow_fetch():
+        calls.append(1)
+        release.wait(5)
+        return "maintain"
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [
+            executor.submit(cache.get_or_fetch, "forgeerp", "forgeerp", "octocat", slow_fetch)
+            for _ in range(8)
+        ]
+        while cache.stats()["misses"] < 8:
+            time.sleep(0.01)
+        release.set()
+        results = [future.result() for future in futures]
+    
+    assert results == ["maintain"] * 8
+    assert len(calls) == 1
+    assert cache.stats()["shared_fetches"] == 7
+
+
+def test_invalidation_during_fetch_is_not_stored():
+    """Test an answer fetched before an invalidation is not cached"""
+    cache = CollaboratorPermissionCache()
+    
+    def fetch():
+        cache.invalidate("forgeerp", "forgeerp", "octocat")
+        return "write"
+    
+    assert cache.get_or_fetch("forgeerp", "forgeerp", "octocat", fetch) == "write"
+    assert cache.stats()["size"] == 0
+
+
+def test_failed_fetch_after_invalidation_releases_followers():
+    """Test a fetch that fails after an invalidation raises its own error to the leader and followers"""
+    cache = CollaboratorPermissionCache()
+    started = threading.Event()
+    release = threading.Event()
+    
+    def failing_fetch():
+        started.set()
+        release.wait(5)
+        cache.invalidate("forgeerp", "forgeerp", "octocat")
+        raise ConnectionError("GitHub unreachable")
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(cache.get_or_fetch, "forgeerp", "forgeerp", "octocat", failing_fetch)
+        started.wait(5)
+        follower = executor.submit(cache.get_or_fetch, "forgeerp", "forgeerp", "octocat", lambda: "write")
+        while cache.stats()["shared_fetches"] < 1:
+            time.sleep(0.01)
+        release.set()
+        with pytest.raises(ConnectionError):
+            leader.result(timeout=5)
+        with pytest.raises(ConnectionError):
+            follower.result(timeout=5)
+    
+    assert cache.stats()["in_flight"] == 0
+    assert cache.get_or_fetch("forgeerp", "forgeerp", "octocat", lambda: "read") == "read"
+
+
+def test_webhook_invalidation():
+    """Test member events drop one user and team events drop the repository"""
+    collaborator_permissions.clear()
+    for repo, username in [("forgeerp", "octocat"), ("forgeerp", "hubot"), ("other", "octocat")]:
+        collaborator_permissions.get_or_fetch("forgeerp", repo, username, lambda: "write")
+    
+    member = {"action": "removed", "member": {"login": "octocat"}, "repository": {"full_name": "forgeerp/forgeerp"}}
+    assert apply_permission_event("member", member) == 1
+    
+    team = {"action": "added_to_repository", "team": {"slug": "ops"}, "repository": {"full_name": "forgeerp/forgeerp"}}
+    assert apply_permission_event("team", team) == 1
+    
+    assert apply_permission_event("team", {"action": "deleted", "team": {"slug": "ops"}}) == 1
+    assert collaborator_permissions.stats()["size"] == 0
+    collaborator_permissions.clear()
@@ -0,0 +1,144 @@
+"""Unit tests for conditional requests and rate limit scheduling of GitHub calls"""
+
+import threading
+import time
+from datetime import datetime
+import pytest
+from forgeerp.core.services.github_client import (
+    BACKGROUND,
+    INTERACTIVE,
+    GitHubRateLimited,
+    PriorityGate,
+    github_priority,
+    github_transport,
+)
+from forgeerp.core.services.job_queue import job_queue
+
+
+def _pull_requests(fake_github, number=1):
+    return [r for r in fake_github.requests if r["path"] == f"/repos/forgeerp/forgeerp/pulls/{number}"]
+
+
+def test_not_modified_is_served_from_cache(github_service, fake_github):
+    """Test repeated GETs are conditional and 304s replay the cached body"""
+    fake_github.set_rate_limit(remaining=100)
+    fake_github.add_pull("forgeerp", "forgeerp", 1, title="Cached")
+    
+    first = github_service.get_pull_request("forgeerp", "forgeerp", 1)
+    second = github_service.get_pull_request("forgeerp", "forgeerp", 1)
+    
+    assert first.title == second.title == "Cached"
+    requests = _pull_requests(fake_github)
+    assert "If-None-Match" not in requests[0]["headers"]
+    assert requests[1]["headers"]["If-None-Match"].startswith('W/"')
+    stats = github_transport.stats()
+    assert stats["not_modified"] == 1
+    # The 304 did not count against the quota
+    assert stats["budget"]["core"]["remaining"] == 99
+
+
+def test_changed_resource_is_refetched(github_service, fake_github):
+    """Test a new ETag replaces the cached body"""
+    fake_github.add_pull("forgeerp", "forgeerp", 1, title="Before")
+    github_service.get_pull_request("forgeerp", "forgeerp", 1)
+    
+    fake_github.add_pull("forgeerp", "forgeerp", 1, title="After")
+    assert github_service.get_pull_request("forgeerp", "forgeerp", 1).title == "After"
+    assert github_transport.stats()["not_modified"] == 0
+
+
+def test_background_calls_keep_reserve(github_service, fake_github, monkeypatch):
+    """Test background calls stop at the reserve while interactive calls continue"""
+    monkeypatch.setattr(github_transport, "background_reserve", 10)
+    fake_github.set_rate_limit(remaining=11)
+    fake_github.add_pull("forgeerp", "forgeerp", 1)
+    fake_github.add_pull("forgeerp", "forgeerp", 2)
+    
+    with github_priority(BACKGROUND):
+        github_service.get_pull_request("forgeerp", "forgeerp", 1)
+        with pytest.raises(GitHubRateLimited) as exc_info:
+            github_service.get_pull_request("forgeerp", "forgeerp", 2)
+    
+    assert 0 < exc_info.value.delay_seconds <= 3600
+    assert _pull_requests(fake_github, 2) == []
+    assert github_service.get_pull_request("forgeerp", "forgeerp", 2).number == 2
+    assert github_transport.stats()["rate_limited"] == 1
+
+
+def test_sync_job_is_deferred_when_budget_is_low(github_service, fake_github, session, monkeypatch):
+    """Test a rate limited background job waits for the reset without using an attempt"""
+    monkeypatch.setattr(github_transport, "background_reserve", 10)
+    fake_github.set_rate_limit(remaining=5)
+    fake_github.add_pull("forgeerp", "forgeerp", 1)
+    github_service.get_pull_request("forgeerp", "forgeerp", 1)
+    
+    job = job_queue.enqueue(session, "prs.sync", {"owner": "forgeerp", "repo": "forgeerp", "pr_number": 1})
+    job_queue.run_pending(session)
+    
+    session.refresh(job)
+    assert job.status == "queued"
+    assert job.attempts == 0
+    assert job.run_after > datetime.utcnow()
+    assert len(_pull_requests(fake_github)) == 1
+
+
+def test_interactive_call_waits_out_short_secondary_limit(github_service, fake_github):
+    """Test an interactive call retries once after a short Retry-After"""
+    pull = fake_github.add_pull("forgeerp", "forgeerp", 1)
+    responses = [
+        (403, {"message": "You have exceeded a secondary rate limit"}, {"Retry-After": "1"}),
+        (200, pull, {}),
+    ]
+    fake_github.add("GET", "/repos/forgeerp/forgeerp/pulls/1", lambda handler: responses.pop(0))
+    
+    started = time.monotonic()
+    assert github_service.get_pull_request("forgeerp", "forgeerp", 1).number == 1
+    
+    assert time.monotonic() - started >= 1
+    assert len(_pull_requests(fake_github)) == 2
+    assert github_transport.stats()["secondary_limits"] == 1
+
+
+def test_secondary_limit_blocks_background_calls(github_service, fake_github):
+    """Test a long secondary limit defers background calls without sending them"""
+    fake_github.add(
+        "GET",
+        "/repos/forgeerp/forgeerp/pulls/1",
+        {"message": "You have exceeded a secondary rate limit"},
+        status=403,
+        headers={"Retry-After": "60"},
+    )
+    
+    with github_priority(BACKGROUND):
+        with pytest.raises(GitHubRateLimited):
+            github_service.get_pull_request("forgeerp", "forgeerp", 1)
+        with pytest.raises(GitHubRateLimited) as exc_info:
+            github_service.get_pull_request("forgeerp", "forgeerp", 1)
+    
+    assert 55 < exc_info.value.delay_seconds <= 60
+    assert len(_pull_requests(fake_github)) == 1
+    assert github_transport.stats()["blocked_for_seconds"] > 55
+
+
+def test_priority_gate_serves_interactive_first():
+    """Test waiting interactive calls get a free slot before background ones"""
+    gate = PriorityGate(1)
+    order = []
+    
+    def wait_for(priority):
+        with gate.slot(priority):
+            order.append(priority)
+    
+    with gate.slot(INTERACTIVE):
+        background = threading.Thread(target=wait_for, args=(BACKGROUND,))
+        background.start()
+        while gate.waiting()[BACKGROUND] == 0:
+            time.sleep(0.01)
+        interactive = threading.Thread(target=wait_for, args=(INTERACTIVE,))
+        interactive.start()
+        while gate.waiting()[INTERACTIVE] == 0:
+            time.sleep(0.01)
+    
+    background.join(5)
+    interactive.join(5)
+    assert order == [INTERACTIVE, BACKGROUND]
@@ -0,0 +1,120 @@
+"""Unit tests for the GitHub service"""
+
+from datetime import datetime
+from sqlmodel import select
+from forgeerp.core.database.models.permission import PullRequest, PullRequestApproval
+
+
+def test_sync_fetches_pull_request_once(github_service, fake_github, session, admin_user):
+    """Test a sync makes one PR request and one reviews request, and stores the reviews"""
+    fake_github.add_pull("forgeerp", "forgeerp", 5, state="closed", merged=True, merged_at="2024-01-02T00:00:00Z")
+    fake_github.add_reviews("forgeerp", "forgeerp", 5, [
+        {"id": 1, "login": "admin", "state": "CHANGES_REQUESTED"},
+        {"id": 2, "login": "octocat", "state": "APPROVED"},
+    ])
+    
+    pr_model = github_service.sync_pull_request_to_database(session, "forgeerp", "forgeerp", 5)
+    
+    assert [request["path"] for request in fake_github.requests] == [
+        "/repos/forgeerp/forgeerp/pulls/5",
+        "/repos/forgeerp/forgeerp/pulls/5/reviews",
+    ]
+    assert pr_model.status == "closed"
+    assert pr_model.is_merged is True
+    assert pr_model.is_approved is True
+    assert pr_model.synced_at is not None
+    
+    approvals = session.exec(
+        select(PullRequestApproval).order_by(PullRequestApproval.github_review_id)
+    ).all()
+    assert [(a.reviewer_login, a.state, a.approved) for a in approvals] == [
+        ("admin", "CHANGES_REQUESTED", False),
+        ("octocat", "APPROVED", True),
+    ]
+    assert approvals[0].approver_id == admin_user.id
+    assert approvals[1].approver_id is None
+
+
+def test_resync_updates_reviews(github_service, fake_github, session):
+    """Test re-syncing updates the PR row and replaces dismissed reviews"""
+    fake_github.add_pull("forgeerp", "forgeerp", 6)
+    fake_github.add_reviews("forgeerp", "forgeerp", 6, [{"id": 10, "login": "octocat", "state": "APPROVED"}])
+    github_service.sync_pull_request_to_database(session, "forgeerp", "forgeerp", 6)
+    
+    fake_github.add_reviews("forgeerp", "forgeerp", 6, [{"id": 11, "login": "hubot", "state": "COMMENTED"}])
+    pr_model = github_service.sync_pull_request_to_database(session, "forgeerp", "forgeerp", 6)
+    
+    assert pr_model.is_approved is False
+    assert len(session.exec(select(PullRequest)).all()) == 1
+    approvals = session.exec(select(PullRequestApproval)).all()
+    assert [(a.github_review_id, a.reviewer_login) for a in approvals] == [(11, "hubot")]
+
+
+def test_bulk_sync_lists_once(github_service, fake_github, session):
+    """Test a bulk sync lists PRs once and fetches only reviews, in one transaction"""
+    for number in (1, 2, 3):
+        fake_github.add_pull("forgeerp", "forgeerp", number, updated_at=f"2024-01-0{number}T00:00:00Z")
+        fake_github.add_reviews("forgeerp", "forgeerp", number, [{"id": number * 10, "login": "octocat", "state": "APPROVED"}])
+    fake_github.add_pull("forgeerp", "forgeerp", 3, updated_at="2024-01-03T00:00:00Z", state="closed", merged_at="2024-01-03T00:00:00Z")
+    
+    result = github_service.sync_pull_requests_to_database(session, "forgeerp", "forgeerp")
+    
+    paths = sorted(request["path"] for request in fake_github.requests)
+    assert paths == [
+        "/repos/forgeerp/forgeerp/pulls",
+        "/repos/forgeerp/forgeerp/pulls/1/reviews",
+        "/repos/forgeerp/forgeerp/pulls/2/reviews",
+        "/repos/forgeerp/forgeerp/pulls/3/reviews",
+    ]
+    assert "state=all" in fake_github.requests[0]["query"]
+    assert "sort=updated" in fake_github.requests[0]["query"]
+    assert result["listed"] == 3
+    assert sorted(result["synced"]) == [1, 2, 3]
+    assert result["watermark"] == "2024-01-03T00:00:00"
+    
+    prs = {pr.github_pr_number: pr for pr in session.exec(select(PullRequest)).all()}
+    assert prs[3].is_merged is True and prs[3].status == "closed"
+    assert all(pr.is_approved for pr in prs.values())
+    assert len(session.exec(select(PullRequestApproval)).all()) == 3
+
+
+def test_bulk_sync_resumes_from_watermark(github_service, fake_github, session):
+    """Test a second bulk sync only fetches reviews for PRs updated since the watermark"""
+    for number in (1, 2):
+        fake_github.add_pull("forgeerp", "forgeerp", number, updated_at=f"2024-01-0{number}T00:00:00Z")
+        fake_github.add_reviews("forgeerp", "forgeerp", number, [])
+    github_service.sync_pull_requests_to_database(session, "forgeerp", "forgeerp")
+    
+    fake_github.requests.clear()
+    fake_github.add_pull("forgeerp", "forgeerp", 1, updated_at="2024-01-05T00:00:00Z")
+    fake_github.add_reviews("forgeerp", "forgeerp", 1, [{"id": 7, "login": "octocat", "state": "APPROVED"}])
+    result = github_service.sync_pull_requests_to_database(session, "forgeerp", "forgeerp")
+    
+    assert [request["path"] for request in fake_github.requests] == [
+        "/repos/forgeerp/forgeerp/pulls",
+        "/repos/forgeerp/forgeerp/pulls/1/reviews",
+    ]
+    # PR 2 sits on the watermark: listed again, but its reviews are not refetched
+    assert result["listed"] == 2
+    assert result["synced"] == [1]
+    assert result["unchanged"] == 1
+    assert github_service.get_sync_watermark(session, "forgeerp", "forgeerp") == datetime(2024, 1, 5)
+    pr_model = session.exec(select(PullRequest).where(PullRequest.github_pr_number == 1)).one()
+    assert pr_model.is_approved is True
+
+
+def test_permission_check_is_cached(github_service, fake_github):
+    """Test repeated permission checks make one GitHub call per user, including non-collaborators"""
+    fake_github.add("GET", "/repos/forgeerp/forgeerp/collaborators/octocat/permission", {"permission": "write", "user": None})
+    
+    assert github_service.check_user_permission("forgeerp", "forgeerp", "octocat")
+    assert github_service.check_user_permission("forgeerp", "forgeerp", "octocat")
+    assert not github_service.check_user_permission("forgeerp", "forgeerp", "octocat", permission="admin")
+    assert not github_service.check_user_permission("forgeerp", "forgeerp", "stranger")
+    assert not github_service.check_user_permission("forgeerp", "forgeerp", "stranger")
+    
+    paths = [request["path"] for request in fake_github.requests]
+    assert paths == [
+        "/repos/forgeerp/forgeerp/collaborators/octocat/permission",
+        "/repos/forgeerp/forgeerp/collaborators/stranger/permission",
+    ]
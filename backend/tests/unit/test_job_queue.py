@@ -0,0 +1,200 @@
+"""Unit tests for the job queue"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import Session
+from forgeerp.core.database.models.job import Job
+from forgeerp.core.services.job_queue import JobQueue, RetryLater, UnknownJobType
+
+
+@pytest.fixture(name="queue")
+def queue_fixture():
+    queue = JobQueue(workers=2, poll_interval=0.05)
+    yield queue
+    queue.stop()
+
+
+def test_enqueue_unknown_type(session, queue):
+    """Test enqueuing a job type without a handler is rejected"""
+    with pytest.raises(UnknownJobType):
+        queue.enqueue(session, "missing", {})
+
+
+def test_run_pending(session, queue):
+    """Test jobs run with their payload and store the result"""
+    @queue.register("add")
+    def add(job_session, payload):
+        return {"sum": payload["a"] + payload["b"]}
+    
+    job = queue.enqueue(session, "add", {"a": 1, "b": 2})
+    assert queue.run_pending(session) == 1
+    
+    session.refresh(job)
+    assert job.status == "succeeded"
+    assert job.result == '{"sum": 3}'
+    assert job.leased_by is None
+
+
+def test_retry_with_backoff_then_fail(session, queue):
+    """Test failed jobs are retried after a backoff until max_attempts"""
+    @queue.register("flaky")
+    def flaky(job_session, payload):
+        raise RuntimeError("boom")
+    
+    job = queue.enqueue(session, "flaky", {}, max_attempts=2)
+    queue.run_pending(session)
+    
+    session.refresh(job)
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.run_after > datetime.utcnow()
+    assert "boom" in job.error
+    
+    # Backoff elapsed
+    job.run_after = datetime.utcnow() - timedelta(seconds=1)
+    session.add(job)
+    session.commit()
+    queue.run_pending(session)
+    
+    session.refresh(job)
+    assert job.status == "failed"
+    assert job.attempts == 2
+    assert queue.stats()["failed"] == 1
+
+
+def test_retry_later_keeps_attempts(session, queue):
+    """Test a deferred job is requeued without using up an attempt"""
+    @queue.register("deferred")
+    def deferred(job_session, payload):
+        raise RetryLater(30, "rate limited")
+    
+    job = queue.enqueue(session, "deferred", {}, max_attempts=1)
+    queue.run_pending(session)
+    
+    session.refresh(job)
+    assert job.status == "queued"
+    assert job.attempts == 0
+    assert job.run_after > datetime.utcnow() + timedelta(seconds=25)
+    assert job.error == "rate limited"
+    assert queue.stats()["deferred"] == 1
+
+
+def test_claim_is_exclusive(engine, queue):
+    """Test only one worker can lease a job"""
+    queue.register("noop")(lambda job_session, payload: None)
+    other = JobQueue()
+    
+    with Session(engine) as first, Session(engine) as second:
+        queue.enqueue(first, "noop", {})
+        claimed = queue.claim(first)
+        assert claimed is not None
+        assert other.claim(second) is None
+
+
+def test_expired_lease_is_reclaimed(session, queue):
+    """Test a job whose worker died is leased again"""
+    queue.register("noop")(lambda job_session, payload: None)
+    job = queue.enqueue(session, "noop", {})
+    assert queue.claim(session) is not None
+    
+    job = session.get(Job, job.id, populate_existing=True)
+    job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    session.add(job)
+    session.commit()
+    
+    reclaimed = queue.claim(session)
+    assert reclaimed.id == job.id
+    assert reclaimed.attempts == 2
+
+
+@pytest.mark.parametrize("fails", [False, True])
+def test_lost_lease_does_not_overwrite_new_owner(engine, session, queue, fails):
+    """Test a worker whose lease was taken over cannot complete the job"""
+    other = JobQueue()
+    
+    @queue.register("stale")
+    def stale(job_session, payload):
+        with Session(engine) as other_session:
+            job = other_session.get(Job, 1)
+            job.lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+            other_session.add(job)
+            other_session.commit()
+            assert other.claim(other_session) is not None
+        if fails:
+            raise RuntimeError("boom")
+        return {"done": True}
+    
+    job = queue.enqueue(session, "stale", {})
+    assert queue.run_pending(session) == 1
+    
+    session.refresh(job)
+    assert (job.status, job.leased_by, job.result, job.error) == ("running", other.worker_id, None, None)
+    assert queue.stats()["lost"] == 1
+
+
+def test_heartbeat_keeps_long_job_leased(engine, session):
+    """Test a job running past its lease is neither re-claimed nor swept as expired"""
+    queue = JobQueue(lease_seconds=1, heartbeat_seconds=0.1)
+    other = JobQueue()
+    seen = {}
+    
+    @queue.register("slow")
+    def slow(job_session, payload):
+        time.sleep(1.5)
+        with Session(engine) as other_session:
+            seen["claimed"] = other.claim(other_session)
+            seen["status"] = other_session.get(Job, job.id).status
+        queue.report_progress(job_session, {"step": 1})
+        return {"done": True}
+    
+    job = queue.enqueue(session, "slow", {}, max_attempts=1)
+    assert queue.run_pending(session) == 1
+    
+    session.refresh(job)
+    assert seen == {"claimed": None, "status": "running"}
+    assert (job.status, job.attempts, job.error) == ("succeeded", 1, None)
+    assert job.progress == '{"step": 1}'
+
+
+def test_report_progress_extends_lease(session):
+    """Test progress reports push the lease forward"""
+    queue = JobQueue(lease_seconds=60, heartbeat_seconds=3600)
+    leases = []
+    
+    @queue.register("report")
+    def report(job_session, payload):
+        leases.append(job_session.get(Job, 1, populate_existing=True).lease_expires_at)
+        time.sleep(0.01)
+        queue.report_progress(job_session, {"step": 1})
+        leases.append(job_session.get(Job, 1, populate_existing=True).lease_expires_at)
+    
+    queue.enqueue(session, "report", {})
+    queue.run_pending(session)
+    assert leases[1] > leases[0]
+
+
+def test_dispatcher_bounds_concurrency(engine, session, queue):
+    """Test the runner never executes more than `workers` jobs at once"""
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+    
+    @queue.register("slow")
+    def slow(job_session, payload):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= 1
+    
+    jobs = [queue.enqueue(session, "slow", {}) for _ in range(6)]
+    queue.start(engine)
+    
+    deadline = time.monotonic() + 10
+    while queue.stats()["succeeded"] < len(jobs) and time.monotonic() < deadline:
+        time.sleep(0.02)
+    
+    assert queue.stats()["succeeded"] == len(jobs)
+    assert active["max"] == 2
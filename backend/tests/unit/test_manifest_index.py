@@ -0,0 +1,83 @@
+"""Unit tests for the addon manifest index"""
+
+import os
+import pytest
+import yaml
+from forgeerp.core.services.manifest_index import ManifestIndex, get_manifest_index
+from forgeerp.core.services.module_loader import ModuleLoader
+
+
+def write_manifest(addons_dir, name, manifest):
+    path = addons_dir / name / "manifest.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(manifest))
+    return path
+
+
+@pytest.fixture(name="addons_dir")
+def addons_dir_fixture(tmp_path):
+    addons = tmp_path / "addons"
+    write_manifest(addons, "base", {"name": "Base"})
+    write_manifest(addons, "sale", {"name": "Sales", "depends": ["base"]})
+    (addons / "_template").mkdir()
+    (addons / "no_manifest").mkdir()
+    return addons
+
+
+def test_lookups_do_not_touch_disk(addons_dir):
+    """Test manifests are parsed once and served from memory between checks"""
+    index = ManifestIndex(addons_dir, check_seconds=3600)
+    
+    assert index.names() == ["base", "sale"]
+    for _ in range(100):
+        assert index.get("sale")["depends"] == ["base"]
+    assert index.get("missing") is None
+    
+    stats = index.stats()
+    assert (stats["scans"], stats["parses"]) == (1, 2)
+
+
+def test_revalidation_reparses_only_changes(addons_dir):
+    """Test a check picks up edited, added and removed manifests"""
+    index = ManifestIndex(addons_dir, check_seconds=0)
+    assert index.get("base") == {"name": "Base"}
+    version = index.version
+    
+    path = write_manifest(addons_dir, "base", {"name": "Base 2", "version": "2.0"})
+    # An older mtime is still a change (size/inode/mtime are compared, not ordered)
+    os.utime(path, ns=(0, 0))
+    write_manifest(addons_dir, "stock", {"name": "Stock"})
+    (addons_dir / "sale" / "manifest.yaml").unlink()
+    
+    assert index.get("base")["name"] == "Base 2"
+    assert index.names() == ["base", "stock"]
+    assert index.stats()["parses"] == 4
+    assert index.version == version + 1
+    
+    # Nothing changed: no parse, same version
+    index.refresh()
+    assert index.stats()["parses"] == 4
+    assert index.version == version + 1
+
+
+def test_invalid_manifest_raises_on_lookup(addons_dir):
+    """Test a manifest that does not parse is listed but raises when loaded"""
+    (addons_dir / "broken").mkdir()
+    (addons_dir / "broken" / "manifest.yaml").write_text("name: [unclosed")
+    index = ManifestIndex(addons_dir, check_seconds=0)
+    
+    assert "broken" in index.names()
+    with pytest.raises(yaml.YAMLError):
+        index.get("broken")
+    assert index.get("base") == {"name": "Base"}
+
+
+def test_module_loader_uses_shared_index(addons_dir):
+    """Test ModuleLoader instances share one index per directory"""
+    first, second = ModuleLoader(addons_dir), ModuleLoader(addons_dir)
+    
+    assert first.index is second.index is get_manifest_index(addons_dir)
+    assert first.get_available_modules() == ["base", "sale"]
+    assert first.get_module_dependencies("sale") == ["base"]
+    with pytest.raises(FileNotFoundError):
+        first.load_module_manifest("no_manifest")
@@ -0,0 +1,131 @@
+"""Unit tests for the stored module dependency edges"""
+
+from sqlmodel import select
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.module import ClientModule, Module, ModuleDependency
+from forgeerp.core.services.module_dependencies import (
+    clients_depending_on,
+    missing_dependencies,
+    sync_module_dependencies,
+)
+from forgeerp.core.services.module_graph import DependencyGraph
+
+
+GRAPH = DependencyGraph({
+    "base": [],
+    "diagnosis": ["base"],
+    "fix": ["diagnosis"],
+    "broken": ["ghost"],
+})
+
+
+def make_fleet(session, installs):
+    """Create the graph's modules and clients with `installs` (code -> module names)"""
+    modules = {}
+    for name in GRAPH.order:
+        module = Module(name=name, display_name=name)
+        session.add(module)
+        modules[name] = module
+    session.add(Module(name="custom", display_name="No manifest"))
+    session.commit()
+    
+    clients = {}
+    for code, names in installs.items():
+        client = Client(name=code, code=code)
+        session.add(client)
+        session.commit()
+        session.refresh(client)
+        clients[code] = client.id
+        for name in names:
+            session.add(ClientModule(client_id=client.id, module_id=modules[name].id))
+    session.commit()
+    return clients
+
+
+def edges(session):
+    return {
+        (module, edge.depends_on, edge.is_direct)
+        for edge, module in session.exec(
+            select(ModuleDependency, Module.name).join(Module, Module.id == ModuleDependency.module_id)
+        ).all()
+    }
+
+
+def test_sync_stores_transitive_edges(session):
+    """Test every manifest edge is stored once, flagged direct or transitive"""
+    make_fleet(session, {})
+    
+    assert sync_module_dependencies(session, GRAPH) == {"added": 4, "updated": 0, "removed": 0}
+    session.commit()
+    assert edges(session) == {
+        ("diagnosis", "base", True),
+        ("fix", "diagnosis", True),
+        ("fix", "base", False),
+        ("broken", "ghost", True),
+    }
+    assert sync_module_dependencies(session, GRAPH) == {"added": 0, "updated": 0, "removed": 0}
+
+
+def test_sync_follows_manifest_changes(session):
+    """Test changed manifests update and remove stored edges"""
+    make_fleet(session, {})
+    sync_module_dependencies(session, GRAPH)
+    session.commit()
+    
+    changed = DependencyGraph({"base": [], "diagnosis": [], "fix": ["base", "diagnosis"], "broken": []})
+    assert sync_module_dependencies(session, changed) == {"added": 0, "updated": 1, "removed": 2}
+    session.commit()
+    assert edges(session) == {("fix", "diagnosis", True), ("fix", "base", True)}
+
+
+def test_clients_depending_on_is_one_query(session, query_counter):
+    """Test reverse lookups over the whole fleet run as a single query"""
+    clients = make_fleet(session, {
+        "acme": ["base", "diagnosis", "fix"],
+        "globex": ["base", "diagnosis"],
+        "initech": ["base"],
+    })
+    sync_module_dependencies(session, GRAPH)
+    session.commit()
+    
+    query_counter.reset()
+    result = clients_depending_on(session, "base")
+    assert query_counter.count == 1
+    assert result == [
+        {"client_id": clients["acme"], "client_code": "acme", "modules": [
+            {"name": "diagnosis", "is_direct": True},
+            {"name": "fix", "is_direct": False},
+        ]},
+        {"client_id": clients["globex"], "client_code": "globex", "modules": [
+            {"name": "diagnosis", "is_direct": True},
+        ]},
+    ]
+    assert [c["client_code"] for c in clients_depending_on(session, "base", direct_only=True)] == ["acme", "globex"]
+    assert clients_depending_on(session, "fix") == []
+
+
+def test_missing_dependencies_is_one_query(session, query_counter):
+    """Test installs missing (transitive or manifest-less) dependencies are found in one query"""
+    clients = make_fleet(session, {
+        "acme": ["base", "diagnosis", "fix"],
+        "globex": ["fix"],
+        "initech": ["broken"],
+    })
+    sync_module_dependencies(session, GRAPH)
+    inactive = session.exec(
+        select(ClientModule).join(Module).where(ClientModule.client_id == clients["acme"], Module.name == "base")
+    ).one()
+    inactive.is_active = False
+    session.add(inactive)
+    session.commit()
+    
+    query_counter.reset()
+    result = missing_dependencies(session)
+    assert query_counter.count == 1
+    assert result == [
+        {"client_id": clients["acme"], "module": "diagnosis", "missing": ["base"]},
+        {"client_id": clients["acme"], "module": "fix", "missing": ["base"]},
+        {"client_id": clients["globex"], "module": "fix", "missing": ["base", "diagnosis"]},
+        {"client_id": clients["initech"], "module": "broken", "missing": ["ghost"]},
+    ]
+    assert missing_dependencies(session, client_id=clients["initech"]) == result[3:]
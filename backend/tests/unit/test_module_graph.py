@@ -0,0 +1,148 @@
+"""Unit tests for the module dependency graph"""
+
+import json
+import pytest
+import yaml
+from sqlmodel import select
+from forgeerp.core.database.models.client import Client
+from forgeerp.core.database.models.module import Module, ClientModule
+from forgeerp.core.services.module_graph import (
+    DependencyCycleError,
+    DependencyGraph,
+    MissingDependencyError,
+    UnknownModuleError,
+)
+from forgeerp.core.services.module_loader import ModuleLoader
+
+
+def make_graph():
+    return DependencyGraph({
+        "base": [],
+        "diagnosis": ["base"],
+        "fix": ["diagnosis"],
+        "report": ["diagnosis", "base"],
+        "suite": ["fix", "report"],
+        "broken": ["ghost"],
+        "above_broken": ["broken"],
+        "ping": ["pong"],
+        "pong": ["ping"],
+        "above_cycle": ["ping", "base"],
+    })
+
+
+def test_transitive_dependencies_in_install_order():
+    """Test closures are complete and listed dependencies first"""
+    graph = make_graph()
+    
+    assert graph.dependencies("base") == []
+    assert graph.dependencies("fix", transitive=False) == ["diagnosis"]
+    assert graph.dependencies("fix") == ["base", "diagnosis"]
+    suite = graph.dependencies("suite")
+    assert set(suite) == {"base", "diagnosis", "fix", "report"}
+    assert suite.index("base") < suite.index("diagnosis") < suite.index("fix")
+    assert suite.index("diagnosis") < suite.index("report")
+
+
+def test_dependents_are_transitive():
+    """Test reverse lookups answer what breaks on uninstall"""
+    graph = make_graph()
+    
+    assert graph.dependents("diagnosis") == {"fix", "report", "suite"}
+    assert graph.dependents("diagnosis", transitive=False) == {"fix", "report"}
+    assert graph.dependents("suite") == frozenset()
+    assert graph.uninstall_impact("diagnosis", ["base", "diagnosis", "fix"]) == ["fix"]
+    with pytest.raises(UnknownModuleError):
+        graph.dependents("ghost")
+
+
+def test_install_plan_skips_installed_modules():
+    """Test a plan covers every dependency once, in order, minus what is installed"""
+    graph = make_graph()
+    
+    plan = graph.install_plan(["fix", "report"])
+    assert plan[0] == "base" and plan[1] == "diagnosis"
+    assert sorted(plan[2:]) == ["fix", "report"]
+    assert graph.install_plan(["fix"], installed=["base", "diagnosis"]) == ["fix"]
+    assert graph.install_plan(["fix"], installed=["base", "diagnosis", "fix"]) == []
+
+
+def test_cycles_and_missing_dependencies_are_reported():
+    """Test modules in or above a cycle or a missing dependency cannot be planned"""
+    graph = make_graph()
+    
+    assert graph.problems() == {"cycles": [["ping", "pong"]], "missing": {"broken": ["ghost"]}}
+    with pytest.raises(DependencyCycleError) as cycle:
+        graph.install_plan(["above_cycle"])
+    assert cycle.value.cycle == ["ping", "pong"]
+    with pytest.raises(MissingDependencyError) as missing:
+        graph.dependencies("above_broken")
+    assert missing.value.missing == ["ghost"]
+    with pytest.raises(UnknownModuleError):
+        graph.install_plan(["ghost"])
+    # Reverse lookups still work for modules with broken closures
+    assert graph.dependents("ping") == {"pong", "above_cycle"}
+
+
+def test_deep_chain_does_not_recurse():
+    """Test long dependency chains resolve without hitting the recursion limit"""
+    graph = DependencyGraph({f"m{i}": [f"m{i - 1}"] if i else [] for i in range(5000)})
+    
+    assert graph.dependencies("m4999")[:3] == ["m0", "m1", "m2"]
+    assert len(graph.dependents("m0")) == 4999
+
+
+def write_manifest(addons_dir, name, manifest):
+    path = addons_dir / name / "manifest.yaml"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(manifest))
+
+
+@pytest.fixture(name="loader")
+def loader_fixture(tmp_path):
+    addons = tmp_path / "addons"
+    write_manifest(addons, "base", {"name": "Base"})
+    write_manifest(addons, "diagnosis", {"name": "Diagnosis", "depends": ["base"]})
+    write_manifest(addons, "fix", {"name": "Fix", "depends": ["diagnosis"]})
+    write_manifest(addons, "broken", {"name": "Broken", "depends": ["ghost"]})
+    return ModuleLoader(addons)
+
+
+def test_graph_follows_manifest_changes(loader):
+    """Test the shared graph is rebuilt only after the index changes"""
+    graph = loader.dependency_graph()
+    assert loader.dependency_graph() is graph
+    
+    write_manifest(loader.addons_dir, "fix", {"name": "Fix", "depends": ["base"]})
+    loader.index.refresh()
+    assert loader.dependency_graph() is not graph
+    assert loader.get_module_dependencies("fix", transitive=True) == ["base"]
+
+
+def test_install_applies_whole_plan_in_one_transaction(loader, session, query_counter):
+    """Test dependencies are installed with the module and depends_on is JSON"""
+    client = Client(name="Test Client", code="test-client")
+    session.add(client)
+    session.commit()
+    session.refresh(client)
+    
+    query_counter.reset()
+    module = loader.install_module_in_database(session, "fix", client_id=client.id)
+    assert module.name == "fix"
+    # modules, 3 inserts, edges, 3 edge inserts, client modules, 3 inserts, reload
+    assert query_counter.count <= 13
+    
+    modules = {m.name: m for m in session.exec(select(Module)).all()}
+    assert set(modules) == {"base", "diagnosis", "fix"}
+    assert json.loads(modules["fix"].depends_on) == ["diagnosis"]
+    assert modules["base"].depends_on is None
+    assert loader.installed_module_names(session, client.id) == ["base", "diagnosis", "fix"]
+    assert loader.install_plan(session, ["fix"], client_id=client.id) == []
+
+
+def test_failed_plan_writes_nothing(loader, session):
+    """Test an unresolvable plan leaves the database untouched"""
+    with pytest.raises(MissingDependencyError):
+        loader.install_modules(session, ["base", "broken"])
+    
+    assert session.exec(select(Module)).all() == []
+    assert session.exec(select(ClientModule)).all() == []
@@ -0,0 +1,69 @@
+"""Unit tests for the password hasher pool"""
+
+import asyncio
+import threading
+import pytest
+from forgeerp.core.services.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
+def test_hash_and_verify():
+    """Test hashing and verification run on the pool"""
+    hasher = PasswordHasher(workers=2, max_pending=4)
+    try:
+        hashed = asyncio.run(hasher.hash("secret"))
+        assert asyncio.run(hasher.verify("secret", hashed)) is True
+        assert asyncio.run(hasher.verify("wrong", hashed)) is False
+        assert hasher.stats()["completed"] == 3
+        assert hasher.stats()["pending"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_rejects_when_saturated():
+    """Test calls fail fast once max_pending operations are in flight"""
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(hasher._submit(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.verify("secret", "hash")
+        release.set()
+        await blocked
+
+    try:
+        asyncio.run(scenario())
+        stats = hasher.stats()
+        assert stats["rejected"] == 1
+        assert stats["pending"] == 0
+    finally:
+        hasher.shutdown()
+
+
+def test_cancelled_call_keeps_its_slot():
+    """Test a cancelled caller does not free the slot while the hash still runs"""
+    hasher = PasswordHasher(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(hasher._submit(release.wait))
+        await asyncio.sleep(0.05)
+        blocked.cancel()
+        await asyncio.sleep(0.05)
+        try:
+            assert hasher.stats()["pending"] == 1
+            with pytest.raises(PasswordHasherBusy):
+                await hasher.verify("secret", "hash")
+        finally:
+            release.set()
+
+    try:
+        asyncio.run(scenario())
+        for _ in range(100):
+            if hasher.stats()["pending"] == 0:
+                break
+            threading.Event().wait(0.01)
+        assert hasher.stats()["pending"] == 0
+    finally:
+        hasher.shutdown()
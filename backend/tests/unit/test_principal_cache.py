@@ -0,0 +1,60 @@
+"""Unit tests for the principal cache"""
+
+import time
+from forgeerp.core.database.models.user import User
+from forgeerp.core.services.principal_cache import PrincipalCache
+
+
+def _user(username: str) -> User:
+    return User(id=1, username=username, email=f"{username}@test.com", password_hash="x")
+
+
+def test_principal_cache_hit_returns_copy():
+    """Test hits return a fresh User with the cached fields"""
+    cache = PrincipalCache(ttl_seconds=60, max_size=10)
+    user = _user("admin")
+    cache.set("admin", user)
+    
+    cached = cache.get("admin")
+    assert cached is not user
+    assert cached.username == "admin"
+    assert cached.id == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_principal_cache_ttl_expiry():
+    """Test entries expire after the TTL"""
+    cache = PrincipalCache(ttl_seconds=0.01, max_size=10)
+    cache.set("admin", _user("admin"))
+    time.sleep(0.02)
+    
+    assert cache.get("admin") is None
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["size"] == 0
+
+
+def test_principal_cache_lru_eviction():
+    """Test least recently used entries are evicted first"""
+    cache = PrincipalCache(ttl_seconds=60, max_size=2)
+    cache.set("a", _user("a"))
+    cache.set("b", _user("b"))
+    cache.get("a")
+    cache.set("c", _user("c"))
+    
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_principal_cache_invalidate():
+    """Test explicit invalidation and hit rate"""
+    cache = PrincipalCache(ttl_seconds=60, max_size=10)
+    cache.set("admin", _user("admin"))
+    cache.get("admin")
+    cache.invalidate("admin")
+    
+    assert cache.get("admin") is None
+    stats = cache.stats()
+    assert stats["invalidations"] == 1
+    assert stats["hit_rate"] == 0.5
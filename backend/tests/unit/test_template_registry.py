@@ -0,0 +1,84 @@
+"""Unit tests for the workflow template registry"""
+
+import os
+import time
+import pytest
+from jinja2 import TemplateNotFound
+from forgeerp.core.engine.github_generator.registry import TemplateRegistry
+
+
+@pytest.fixture(name="addons_dir")
+def addons_dir_fixture(tmp_path):
+    templates = tmp_path / "addons" / "hetzner" / "templates"
+    templates.mkdir(parents=True)
+    (templates / "snapshot.yml.j2").write_text("name: Snapshot {{ client_name }}")
+    return tmp_path / "addons"
+
+
+def _registry(tmp_path, **kwargs):
+    kwargs.setdefault("addons_dir", None)
+    return TemplateRegistry(bytecode_cache_dir=str(tmp_path / "bytecode"), **kwargs)
+
+
+def test_templates_are_compiled_once(tmp_path):
+    """Test a registered template is compiled once and its bytecode stored on disk"""
+    registry = _registry(tmp_path)
+    
+    first = registry.get_template("diagnose-services.yml.j2")
+    assert registry.get_template("diagnose-services.yml.j2") is first
+    assert "Diagnose Services" in registry.render("diagnose-services.yml.j2")
+    assert list((tmp_path / "bytecode").iterdir())
+    
+    # A fresh registry (new worker process) loads the stored bytecode
+    other = _registry(tmp_path)
+    assert other.render("diagnose-services.yml.j2") == registry.render("diagnose-services.yml.j2")
+
+
+def test_github_expressions_are_kept(tmp_path):
+    """Test ${{ }} expressions reach the workflow untouched"""
+    registry = _registry(tmp_path)
+    assert "${{ inputs.action }}" in registry.render("disaster-recovery.yml.j2")
+
+
+def test_string_templates_are_cached(tmp_path):
+    """Test ad-hoc sources are compiled once per distinct source"""
+    registry = _registry(tmp_path)
+    
+    assert registry.render_string("name: {{ name }}", name="a") == "name: a"
+    assert registry.render_string("name: {{ name }}", name="b") == "name: b"
+    
+    stats = registry.stats()
+    assert (stats["string_hits"], stats["string_misses"]) == (1, 1)
+
+
+def test_file_and_addon_templates(tmp_path, addons_dir):
+    """Test files override built-ins and addon templates are namespaced"""
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "diagnose-services.yml.j2").write_text("name: Custom")
+    registry = _registry(tmp_path, templates_dir=str(templates_dir), addons_dir=addons_dir)
+    
+    assert registry.render("diagnose-services.yml.j2") == "name: Custom"
+    assert registry.render("hetzner/snapshot.yml.j2", client_name="acme") == "name: Snapshot acme"
+    assert "hetzner/snapshot.yml.j2" in registry.list_templates()
+    with pytest.raises(TemplateNotFound):
+        registry.get_template("kubernetes/missing.yml.j2")
+
+
+@pytest.mark.parametrize("auto_reload", [True, False])
+def test_reload_only_in_dev(tmp_path, addons_dir, auto_reload):
+    """Test edited template files are picked up only with auto_reload"""
+    registry = _registry(tmp_path, addons_dir=addons_dir, auto_reload=auto_reload)
+    digest = registry.digest()
+    assert registry.render("hetzner/snapshot.yml.j2", client_name="acme") == "name: Snapshot acme"
+    
+    path = addons_dir / "hetzner" / "templates" / "snapshot.yml.j2"
+    time.sleep(0.01)
+    path.write_text("name: Backup {{ client_name }}")
+    stat = path.stat()
+    # Make the change visible on file systems with coarse mtimes
+    os.utime(path, (stat.st_atime, stat.st_mtime + 2))
+    
+    rendered = registry.render("hetzner/snapshot.yml.j2", client_name="acme")
+    assert rendered == ("name: Backup acme" if auto_reload else "name: Snapshot acme")
+    assert (registry.digest() != digest) is auto_reload
@@ -0,0 +1,113 @@
+"""Tests for in-memory workflow archives and diffs"""
+
+import io
+import tarfile
+import zipfile
+import pytest
+from forgeerp.core.engine.github_generator import archive as archive_module
+from forgeerp.core.engine.github_generator.archive import (
+    MANIFEST_PATH,
+    ArchiveError,
+    diff_trees,
+    read_archive,
+    render_tree,
+    stream_tar_gz,
+    stream_zip,
+)
+
+CLIENT_DATA = {"client_name": "acme", "environments": ["dev", "hml", "prod"]}
+
+
+@pytest.fixture(name="tree")
+def tree_fixture():
+    return render_tree(CLIENT_DATA, ["sale"])
+
+
+def test_render_tree_touches_no_disk(tree, tmp_path, monkeypatch):
+    """Test rendering builds the whole tree in memory"""
+    monkeypatch.chdir(tmp_path)
+    tree = render_tree(CLIENT_DATA, ["sale"])
+    assert ".github/workflows/deploy-client.yml" in tree
+    assert MANIFEST_PATH in tree
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize("stream", [stream_zip, stream_tar_gz])
+def test_archive_round_trip(tree, stream):
+    """Test streamed archives read back to the same tree"""
+    chunks = list(stream(tree))
+    assert len(chunks) > 1
+    assert read_archive(b"".join(chunks)) == tree
+
+
+def test_read_archive_strips_single_root(tree):
+    """Test a GitHub-style "<repo>-<ref>/" root directory is dropped"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for path, content in tree.items():
+            archive.writestr(f"repo-main/{path}", content)
+    assert read_archive(buffer.getvalue()) == tree
+
+
+def test_read_archive_strips_dot_prefix():
+    """Test "./" member names from `tar -C repo .` are normalized"""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        data = b"name: x\n"
+        info = tarfile.TarInfo("./.github/workflows/x.yml")
+        info.size = len(data)
+        archive.addfile(info, io.BytesIO(data))
+    assert read_archive(buffer.getvalue()) == {".github/workflows/x.yml": "name: x\n"}
+
+
+def test_read_archive_rejects_garbage():
+    """Test unreadable uploads raise ArchiveError"""
+    with pytest.raises(ArchiveError):
+        read_archive(b"not an archive")
+
+
+@pytest.mark.parametrize("sizes", [[2 * 1024 * 1024], [600 * 1024, 600 * 1024]])
+@pytest.mark.parametrize("kind", ["zip", "tar.gz"])
+def test_read_archive_rejects_inflating_beyond_limit(kind, sizes, monkeypatch):
+    """Test a small archive that inflates past the limit is rejected, in one entry or across several"""
+    monkeypatch.setattr(archive_module, "MAX_ARCHIVE_BYTES", 1024 * 1024)
+    buffer = io.BytesIO()
+    if kind == "zip":
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for number, size in enumerate(sizes):
+                archive.writestr(f"bomb-{number}.yml", b"\0" * size)
+    else:
+        with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+            for number, size in enumerate(sizes):
+                info = tarfile.TarInfo(f"bomb-{number}.yml")
+                info.size = size
+                archive.addfile(info, io.BytesIO(b"\0" * size))
+    assert len(buffer.getvalue()) < 64 * 1024
+    
+    with pytest.raises(ArchiveError, match="once extracted"):
+        read_archive(buffer.getvalue())
+
+
+def test_diff_identical_trees_is_empty(tree):
+    """Test an up-to-date tree has no diff"""
+    assert diff_trees(dict(tree), tree) == ""
+
+
+def test_diff_added_changed_removed(tree):
+    """Test diffs of new, edited and no-longer-generated workflows"""
+    existing = dict(tree)
+    del existing[".github/workflows/deploy-client.yml"]
+    existing[".github/workflows/setup-client.yml"] = "edited by hand"
+    existing[".github/workflows/old.yml"] = "name: old\n"
+    existing[".github/workflows/custom.yml"] = "name: custom\n"
+    manifest = render_tree(CLIENT_DATA, ["sale"])[MANIFEST_PATH]
+    existing[MANIFEST_PATH] = manifest.replace('"outputs": {', '"outputs": {\n    "old.yml": "x",', 1)
+
+    diff = diff_trees(existing, tree)
+
+    assert "--- /dev/null\n+++ b/.github/workflows/deploy-client.yml" in diff
+    assert "--- a/.github/workflows/setup-client.yml\n+++ b/.github/workflows/setup-client.yml" in diff
+    assert "-edited by hand\n\\ No newline at end of file\n" in diff
+    assert "--- a/.github/workflows/old.yml\n+++ /dev/null" in diff
+    # Files the generator never produced are left alone
+    assert "custom.yml" not in diff
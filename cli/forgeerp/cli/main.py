@@ -194,6 +194,45 @@ def test(
         sys.exit(returncode)
 
 
+@app.command()
+def generate(
+    client: Optional[List[str]] = typer.Option(None, "--client", "-c", help="Código do cliente (pode repetir)"),
+    module: Optional[str] = typer.Option(None, "--module", "-m", help="Apenas clientes com este módulo"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Processos paralelos (0 = um por CPU)"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Diretório raiz das árvores por cliente"),
+    include_inactive: bool = typer.Option(False, "--include-inactive", help="Incluir clientes inativos"),
+):
+    """Gerar workflows de todos os clientes em paralelo"""
+    console.print("[green]⚙️  Gerando workflows da frota...[/green]")
+    
+    cmd = [
+        "docker", "compose", "exec", "-T", "backend",
+        "python", "scripts/generate_fleet_workflows.py",
+        "--workers", str(workers)
+    ]
+    for code in client or []:
+        cmd.extend(["--client", code])
+    if module:
+        cmd.extend(["--module", module])
+    if output:
+        cmd.extend(["--output", output])
+    if include_inactive:
+        cmd.append("--include-inactive")
+    
+    # Sem captura: o progresso aparece enquanto os clientes são gerados
+    try:
+        returncode = subprocess.run(cmd).returncode
+    except FileNotFoundError:
+        console.print("[red]Erro: docker compose não encontrado. Instale o Docker primeiro.[/red]")
+        sys.exit(1)
+    
+    if returncode == 0:
+        console.print("[green]✅ Workflows gerados![/green]")
+    else:
+        console.print("[red]❌ Falha ao gerar workflows de alguns clientes[/red]")
+        sys.exit(returncode)
+
+
 @app.command()
 def update():
     """Atualizar aplicação"""